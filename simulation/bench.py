@@ -0,0 +1,148 @@
+import argparse
+import bz2
+import json
+import platform
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from .model import CommunicationNetwork, CompactCommunicationNetwork, np
+from .minimal_paths import DistanceType, multi_source_minimal_distances, single_source_dijkstra_hyperedges, single_source_dijkstra_vertices
+from .results import ResultShards, distance_columns
+from .telemetry import peak_rss
+
+START = datetime(2020, 1, 1)
+CHUNK_SIZE = 1 << 16  # channels generated at once
+MAX_CHANNEL_SIZE = 32
+VARIANTS = ('hyperedges', 'vertices', 'minimal_distances', 'assembly')
+
+
+def generate_channels(num_channels: int, num_participants: int, alpha=1.2, mean_gap=timedelta(minutes=10), seed=0):
+    """
+    Yields `num_channels` synthetic code review channels as (channel ID, participants, end) triples in time order.
+
+    The participants of a channel are drawn with a power-law preference, so their degrees follow a power law with
+    exponent `alpha` like in real code review networks. Channel sizes are geometric, so most channels are pairwise
+    and some are multi-party. The gaps between channels are Pareto distributed around `mean_gap`, so channels come
+    in bursts separated by quiet periods.
+    """
+    rng = np.random.default_rng(seed)
+    cumulative_weights = np.cumsum(np.arange(1, num_participants + 1, dtype=np.float64) ** -alpha)
+    cumulative_weights /= cumulative_weights[-1]
+    shape = 1.5  # a Pareto distribution with a finite mean and an infinite variance
+    end = START
+    for first in range(0, num_channels, CHUNK_SIZE):
+        count = min(CHUNK_SIZE, num_channels - first)
+        sizes = np.minimum(rng.geometric(0.6, size=count) + 1, MAX_CHANNEL_SIZE)
+        members = cumulative_weights.searchsorted(rng.random(sizes.sum()), side='right')
+        gaps = (rng.pareto(shape, size=count) * (shape - 1) * mean_gap.total_seconds()).round()
+        offsets = np.cumsum(sizes) - sizes
+        for index, (offset, size, gap) in enumerate(zip(offsets.tolist(), sizes.tolist(), gaps.tolist())):
+            end += timedelta(seconds=gap)
+            yield str(first + index), [f'p{member}' for member in dict.fromkeys(members[offset:offset + size].tolist())], end
+
+
+def write_network(file_path, channels) -> int:
+    """
+    Writes channels as a network file in the format of from_json, one channel per line, compressed if the file ends
+    with .bz2. Returns the number of channels.
+    """
+    file_path = Path(file_path)
+    count = 0
+    with (bz2.open if file_path.suffix == '.bz2' else open)(file_path, 'wt', encoding='utf-8') as file:
+        file.write('{')
+        for chan_id, participants, end in channels:
+            file.write(f'{"," if count else ""}\n{json.dumps(chan_id)}: {json.dumps({"participants": participants, "end": end.isoformat()})}')
+            count += 1
+        file.write('\n}\n')
+    return count
+
+
+class Benchmark:
+    """Times the steps of a benchmark run and collects them as machine-readable records."""
+
+    def __init__(self):
+        self.records: list = []
+
+    def measure(self, name, function, num_sources=None, **parameters):
+        started = time.perf_counter()
+        result = function()
+        seconds = time.perf_counter() - started
+        record = {'name': name, **parameters, 'seconds': seconds}
+        if num_sources is not None:
+            record['sources'] = num_sources
+            record['sources_per_second'] = num_sources / seconds if seconds else None
+        self.records += [record]
+        return result
+
+
+def run_benchmarks(file_path, num_sources=8, num_hubs=0, variants=VARIANTS, dict_backend=True, seed=0) -> list:
+    """
+    Benchmarks loading a network file, the Dijkstra variants for each distance type, and the result assembly from
+    `num_sources` sources: the `num_hubs` participants of highest degree, the most expensive sources of a run, and
+    randomly drawn ones. Returns one record per step.
+    """
+    benchmark = Benchmark()
+    if dict_backend:
+        benchmark.measure('from_json', lambda: CommunicationNetwork.from_json(file_path), backend='dict')
+    network = benchmark.measure('from_json', lambda: CompactCommunicationNetwork.from_json(file_path), backend='compact')
+    participants = sorted(network.participants(), key=network.vertex_index)
+    degrees = np.diff(network.vertex_offsets)
+    hubs = np.argsort(-degrees, kind='stable')[:min(num_hubs, num_sources)].tolist()
+    drawn = np.random.default_rng(seed).permutation(len(participants)).tolist()
+    sources = [participants[index] for index in dict.fromkeys(hubs + drawn)][:num_sources]
+
+    for name, single_source_dijkstra in (('hyperedges', single_source_dijkstra_hyperedges), ('vertices', single_source_dijkstra_vertices)):
+        if name in variants:
+            for distance_type in DistanceType:
+                benchmark.measure(f'dijkstra_{name}', lambda: [single_source_dijkstra(network, source, distance_type) for source in sources],
+                                  num_sources=len(sources), distance_type=distance_type.name.lower())
+    if 'minimal_distances' in variants:
+        benchmark.measure('multi_source_minimal_distances', lambda: multi_source_minimal_distances(network, sources), num_sources=len(sources))
+    if 'assembly' in variants:
+        with tempfile.TemporaryDirectory() as directory:
+            shards = ResultShards(Path(directory)/'shards')
+            benchmark.measure('distance_columns', lambda: shards.write('000000', distance_columns(network, sources)), num_sources=len(sources))
+            shards.record('000000', sources)
+            benchmark.measure('to_frame', lambda: shards.to_frame(network, tuple(sorted(participants))), num_sources=len(sources))
+    return benchmark.records
+
+
+def bench():
+    parser = argparse.ArgumentParser(description='Benchmarking the simulation on synthetic code review communication networks')
+    parser.add_argument('--channels', type=int, default=100_000, help='Number of channels of the synthetic network (default 100000)')
+    parser.add_argument('--participants', type=int, help='Number of participants of the synthetic network (default a tenth of the channels)')
+    parser.add_argument('--alpha', type=float, default=1.2, help='Power-law exponent of the participant degrees (default 1.2)')
+    parser.add_argument('--sources', type=int, default=8, help='Number of sources to run the Dijkstra variants from (default 8)')
+    parser.add_argument('--hubs', type=int, default=0, help='Number of the sources that are the participants of highest degree instead of random ones (default 0)')
+    parser.add_argument('--variants', type=str, nargs='+', choices=VARIANTS, default=VARIANTS, help='Variants to benchmark (default all)')
+    parser.add_argument('--skip_dict', action='store_true', help='Do not load the network with the dict-based backend, which needs much more memory')
+    parser.add_argument('--network', type=Path, help='Benchmark an existing network file instead of a synthetic one')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic network and the sources (default 0)')
+    parser.add_argument('--output', type=Path, help='Write the results as JSON to a file instead of stdout')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        network_info: dict = {'file': str(args.network)} if args.network else {}
+        if args.network is None:
+            args.network = Path(directory)/'network.json'
+            participants = args.participants or max(2, args.channels // 10)
+            started = time.perf_counter()
+            write_network(args.network, generate_channels(args.channels, participants, alpha=args.alpha, seed=args.seed))
+            network_info = {'channels': args.channels, 'participants': participants, 'alpha': args.alpha, 'seed': args.seed,
+                            'generation_seconds': time.perf_counter() - started}
+        network_info['file_bytes'] = args.network.stat().st_size
+        records = run_benchmarks(args.network, args.sources, args.hubs, args.variants, dict_backend=not args.skip_dict, seed=args.seed)
+
+    # the peak memory only grows within a process, so it is reported for the whole run rather than per step
+    report = json.dumps({'network': network_info, 'python': platform.python_version(), 'numpy': np.__version__,
+                         'created': datetime.now().isoformat(timespec='seconds'), 'peak_rss_bytes': peak_rss(), 'benchmarks': records}, indent=2)
+    if args.output:
+        args.output.write_text(report + '\n')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    bench()
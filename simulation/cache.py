@@ -0,0 +1,126 @@
+import hashlib
+import os
+import pickle
+from pathlib import Path
+
+from .model import np
+
+MAX_BYTES = 8 << 30
+EVICTION_INTERVAL = 16  # written fractions of the maximal size between evictions
+
+_active_cache = None  # the cache that the single-source searches consult, see use_cache()
+_written: dict = {}  # bytes written to each cache directory by this process since its last eviction, across tasks
+
+
+class ResultCache:
+    """
+    An on-disk, content-addressed cache of single-source results with least-recently-used eviction.
+
+    Each entry is a pickle file named by the SHA-256 digest of its key, which is made of the fingerprint of the
+    hypergraph, the source, the distance type, and the algorithm with its version, so results of changed networks or
+    algorithms are never returned. Entries are written atomically, so the processes of a simulation can share one
+    cache directory. Reading an entry touches it, and once the cache grows beyond `max_bytes`, the least recently
+    used entries are removed.
+    """
+
+    def __init__(self, directory, max_bytes=MAX_BYTES):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(*parts) -> str:
+        """Returns the key of an entry identified by the given parts, e.g., fingerprint, source, distance type, algorithm."""
+        return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory/key[:2]/f'{key}.pickle'
+
+    def get(self, key: str, default=None):
+        """Returns the value of an entry and marks it as recently used, or `default` if there is no such entry."""
+        path = self._path(key)
+        try:
+            with path.open('rb') as file:
+                value = pickle.load(file)
+            os.utime(path)
+        except (OSError, EOFError, pickle.UnpicklingError):  # missing, evicted in the meantime, or incomplete
+            return default
+        return value
+
+    def put(self, key: str, value):
+        """Writes an entry; every written 1/EVICTION_INTERVAL of the maximal size, the cache is trimmed."""
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        partial_path = path.with_name(f'{path.stem}.{os.getpid()}.partial')
+        with partial_path.open('wb') as file:
+            pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+        _written[self.directory] = _written.get(self.directory, 0) + partial_path.stat().st_size
+        os.replace(partial_path, path)
+        if _written[self.directory] * EVICTION_INTERVAL > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> int:
+        """Removes the least recently used entries until the cache fits into its maximal size; returns their number."""
+        entries: list = []
+        for path in self.directory.glob('*/*.pickle'):
+            try:
+                stat = path.stat()
+            except OSError:  # removed by another process
+                continue
+            entries += [(stat.st_mtime, stat.st_size, path)]
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        _written[self.directory] = 0
+        return removed
+
+
+def use_cache(cache: ResultCache = None):
+    """
+    Makes the single-source searches of this process consult a cache, or none if None; returns the previous one.
+    """
+    global _active_cache  # pylint: disable=global-statement
+    previous, _active_cache = _active_cache, cache
+    return previous
+
+
+def active_cache() -> ResultCache:
+    """Returns the cache that the single-source searches of this process consult, if any."""
+    return _active_cache
+
+
+def cached_columns(cache: ResultCache, hypergraph, source_vertices, algorithm: str, compute) -> dict:
+    """
+    Returns the distance columns of distinct source vertices like compute(source_vertices), e.g., distance_columns,
+    but takes the rows of each source from the cache if present and computes the others in one call.
+
+    The rows of each computed source are put into the cache under the fingerprint of the hypergraph and the
+    `algorithm`. The columns are the same as from `compute`, provided it returns the rows grouped by source in the
+    order of the sources, with the source column holding vertex indices.
+    """
+    if not source_vertices:
+        return compute(source_vertices)
+    fingerprint = hypergraph.fingerprint()
+    source_indices = np.array([hypergraph.vertex_index(source_vertex) for source_vertex in source_vertices], dtype=np.int32)
+    keys = [cache.key(fingerprint, source_vertex, 'all', algorithm) for source_vertex in source_vertices]
+    parts = [cache.get(key) for key in keys]
+    missing = [row for row, part in enumerate(parts) if part is None]
+    if missing:
+        computed = compute([source_vertices[row] for row in missing])
+        positions = np.full(hypergraph.num_vertices, -1, dtype=np.int64)
+        positions[source_indices[missing]] = np.arange(len(missing))
+        offsets = np.zeros(len(missing) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(positions[computed['source']], minlength=len(missing)), out=offsets[1:])
+        for position, row in enumerate(missing):
+            parts[row] = {column: values[offsets[position]:offsets[position + 1]] for column, values in computed.items() if column != 'source'}
+            cache.put(keys[row], parts[row])
+
+    lengths = [len(part['target']) for part in parts]
+    columns = {'source': np.repeat(source_indices, lengths)}
+    columns.update((column, np.concatenate([part[column] for part in parts])) for column in parts[0])
+    return columns
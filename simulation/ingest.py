@@ -0,0 +1,197 @@
+import bz2
+import io
+import json
+import mmap
+import re
+from datetime import datetime
+from pathlib import Path
+
+try:
+    from orjson import loads
+except ImportError:
+    from json import loads
+
+CHUNK_SIZE = 1 << 20
+PART_SIZE = 4 << 20
+NDJSON_SUFFIXES = ('.ndjson', '.jsonl')
+_WHITESPACE = ' \t\n\r'
+_BZ2_STREAM_HEADER = re.compile(rb'BZh[1-9]1AY&SY')  # stream magic, block size, and the magic of the first block
+
+
+class _StreamReader:
+    """Reads JSON values one at a time from a text stream, holding only a chunk of the stream in memory."""
+
+    def __init__(self, stream, chunk_size=CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def peek(self) -> str:
+        """Skips whitespace and returns the next character, or an empty string at the end of the stream."""
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in _WHITESPACE:
+                self.position += 1
+            if self.position < len(self.buffer) or not self.fill():
+                return self.buffer[self.position:self.position + 1]
+
+    def expect(self, characters: str) -> str:
+        character = self.peek()
+        if not character or character not in characters:
+            raise json.JSONDecodeError(f'Expecting one of {characters!r}', self.buffer, self.position)
+        self.position += 1
+        return character
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # a value that ends with the buffer may continue in the next chunk, e.g., a number
+            if end < len(self.buffer) or not self.fill():
+                self.position = end
+                return value
+
+
+def iter_json_object(stream, chunk_size=CHUNK_SIZE):
+    """
+    Yields the (key, value) pairs of a JSON object from a text stream, one at a time.
+
+    Only the current chunk of the stream and the current value are held in memory, not the whole document.
+    """
+    reader = _StreamReader(stream, chunk_size)
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        key = reader.value()
+        if not isinstance(key, str):
+            raise json.JSONDecodeError('Expecting property name', reader.buffer, reader.position)
+        reader.expect(':')
+        yield key, reader.value()
+        if reader.expect(',}') == '}':
+            return
+
+
+def iter_ndjson_objects(stream):
+    """Yields the (key, value) pairs of newline-delimited JSON objects from a text stream, line by line."""
+    for line in stream:
+        if line.strip():
+            yield from loads(line).items()
+
+
+def is_ndjson(file_path) -> bool:
+    file_path = Path(file_path)
+    if file_path.suffix == '.bz2':
+        file_path = file_path.with_suffix('')
+    return file_path.suffix in NDJSON_SUFFIXES
+
+
+def network_files(file_path) -> list:
+    """Returns the files of a network: the file itself, or the files of a directory of shards in sorted order."""
+    file_path = Path(file_path)
+    if file_path.is_dir():
+        return sorted(path for path in file_path.iterdir() if path.is_file() and not path.name.startswith('.'))
+    return [file_path]
+
+
+def _validate(channels):
+    for line, (chan_id, channel) in enumerate(channels):
+        if len(channel['participants']) == 0:
+            raise SystemExit(f"Line: {line}, Chan_id: {chan_id}. Participants column empty.")
+        try:
+            end = datetime.fromisoformat(channel['end'])
+        except ValueError as exc:
+            raise SystemExit(f"Line: {line}, Chan_id: {chan_id}. End column not compatible datetime format.") from exc
+        yield str(chan_id), channel['participants'], end
+
+
+def read_channels(file_path):
+    """
+    Streams the channels of a network file, or of a directory of network files, as (channel ID, participants, end)
+    triples.
+
+    The file maps channel IDs to channels, i.e., `{chan_id: {"participants": [...], "end": ...}}`, as one JSON
+    object or as newline-delimited JSON objects (.ndjson or .jsonl), optionally compressed with bz2.
+    """
+    for path in network_files(file_path):
+        open_file = bz2.open if path.suffix == '.bz2' else open
+        with open_file(path, 'rt', encoding='utf-8') as stream:
+            yield from _validate(iter_ndjson_objects(stream) if is_ndjson(path) else iter_json_object(stream))
+
+
+def _bz2_part_offsets(path, part_size):
+    offsets = [0]
+    with path.open('rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        position = part_size
+        while position < len(data):
+            match = _BZ2_STREAM_HEADER.search(data, position)
+            if match is None:
+                break
+            offsets += [match.start()]
+            position = match.start() + part_size
+    return offsets
+
+
+def split_network(file_path, part_size=PART_SIZE) -> list:
+    """
+    Splits the files of a network into parts of about `part_size` bytes that can be read independently, as
+    (file, start, stop) byte ranges.
+
+    Only newline-delimited JSON can be split: plain files at any byte, bz2 files where one of their streams starts
+    (as written by parallel compressors like pbzip2 or lbzip2). Other files are one part each, with start and stop
+    set to None.
+    """
+    parts: list = []
+    for path in network_files(file_path):
+        size = path.stat().st_size
+        if not is_ndjson(path) or size <= part_size:
+            parts += [(path, None, None)]
+            continue
+        offsets = _bz2_part_offsets(path, part_size) if path.suffix == '.bz2' else list(range(0, size, part_size))
+        parts += [(path, start, stop) for start, stop in zip(offsets, offsets[1:] + [size])]
+    return parts
+
+
+def _part_lines(path, start, stop) -> list:
+    with path.open('rb') as file:
+        file.seek(start)
+        data = file.read(stop - start)
+        rest = file
+        if path.suffix == '.bz2':
+            data = bz2.decompress(data)
+            rest = bz2.BZ2File(file) if stop < path.stat().st_size else io.BytesIO()
+        # a part holds the lines that start in it: the line around its start belongs to the previous part, and
+        # its own last line may continue in the next part
+        if start > 0:
+            first_newline = data.find(b'\n')
+            if first_newline < 0:
+                return []
+            data = data[first_newline + 1:]
+        data += rest.readline()
+    return data.decode('utf-8').split('\n')
+
+
+def read_part(part):
+    """Streams the channels of a part from split_network like read_channels."""
+    path, start, stop = part
+    if start is None:
+        return read_channels(path)
+    return _validate(iter_ndjson_objects(_part_lines(path, start, stop)))
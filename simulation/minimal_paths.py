@@ -1,8 +1,12 @@
+import functools
 import heapq
+import time
+from bisect import bisect_left, bisect_right
 from enum import Enum
 from datetime import datetime
 
-from .model import TimeVaryingHypergraph
+from .cache import active_cache
+from .model import TimeVaryingHypergraph, CompactTimeVaryingHypergraph, np
 
 
 class DistanceType(Enum):
@@ -11,9 +15,65 @@ class DistanceType(Enum):
     FOREMOST = 2
 
 
-def single_source_dijkstra_hyperedges(hypergraph: TimeVaryingHypergraph, source_vertex, distance_type: DistanceType, min_timing=datetime.min):
+UNREACHED = 2**63 - 1
+_EARLIEST = -2**63
+BATCH_SIZE = 256  # sources per traversal; each source holds four int64 rows per vertex
+COUNTERS = ('pushes', 'pops', 'relaxed')
+SWEEP_COUNTERS = ('relaxed', )  # the counters of the sweeps, which use no heap
+ALGORITHM_VERSION = 1  # part of the keys of cached results; to be increased with every change of the results
+
+
+def _count(counters, pushes, pops, relaxed):
+    """Adds the heap pushes and pops and the relaxed hyperedges of a search to the optional counters dictionary."""
+    if counters is not None:
+        for counter, count in zip(COUNTERS, (pushes, pops, relaxed)):
+            counters[counter] = counters.get(counter, 0) + count
+
+
+def _cached(single_source_dijkstra):
+    """
+    Makes a single-source search consult the active cache of the process, see cache.use_cache, under the fingerprint
+    of the hypergraph (or window), the source, the distance type, the search with ALGORITHM_VERSION, and `min_timing`.
+    Searches with counters are always run, as their counts are wanted, and so are searches for a target or within a
+    bound, which stop early.
+    """
+    @functools.wraps(single_source_dijkstra)
+    def search(hypergraph, source_vertex, distance_type: DistanceType, min_timing=datetime.min, window=None, counters=None,
+               target_vertex=None, max_distance=None):
+        cache = active_cache()
+        if cache is None or counters is not None or target_vertex is not None or max_distance is not None:
+            return single_source_dijkstra(hypergraph, source_vertex, distance_type, min_timing, window, counters, target_vertex, max_distance)
+        hypergraph.fingerprint()  # stored by the hypergraph, so that a view of a window copies it and adds its bounds
+        if window is not None:
+            hypergraph = hypergraph.window(*window)
+        key = cache.key(hypergraph.fingerprint(), source_vertex, distance_type.name, f'{single_source_dijkstra.__name__}:{ALGORITHM_VERSION}', min_timing)
+        distances = cache.get(key)
+        if distances is None:
+            distances = single_source_dijkstra(hypergraph, source_vertex, distance_type, min_timing)
+            cache.put(key, distances)
+        return distances
+    return search
+
+
+@_cached
+def single_source_dijkstra_hyperedges(hypergraph: TimeVaryingHypergraph, source_vertex, distance_type: DistanceType, min_timing=datetime.min,
+                                      window=None, counters=None, target_vertex=None, max_distance=None):
+    """
+    Returns the minimal distances from a source vertex to all vertices reachable from it.
+
+    With a `target_vertex`, the search stops as soon as the distance of the target is settled and only returns that
+    one, if reachable. With a `max_distance` (hops, a duration, or a timing, by distance type), the search does not
+    follow paths beyond it and only returns the vertices within it.
+    """
+    if window is not None:  # a (start, end) pair of timings; only the hyperedges in [start, end) are used
+        hypergraph = hypergraph.window(*window)
+    if isinstance(hypergraph, CompactTimeVaryingHypergraph):
+        return _single_source_dijkstra_hyperedges_compact(hypergraph, source_vertex, distance_type, min_timing, counters, target_vertex, max_distance)
+
     hedge_distances: dict = {}
     queue: list = []
+    target_hedges = set() if target_vertex is None else hypergraph.hyperedges(target_vertex)
+    target_distance = None  # the smallest distance of a hyperedge of the target so far
 
     for source_hedge in hypergraph.hyperedges(source_vertex):
         match distance_type:
@@ -23,39 +83,199 @@ def single_source_dijkstra_hyperedges(hypergraph: TimeVaryingHypergraph, source_
                 init_value = min_timing - min_timing
             case DistanceType.FOREMOST:
                 init_value = hypergraph.timings(source_hedge)
+        if max_distance is not None and init_value > max_distance:
+            continue
         heapq.heappush(queue, (init_value, source_hedge))
         hedge_distances[source_hedge] = init_value
+        if source_hedge in target_hedges and (target_distance is None or init_value < target_distance):
+            target_distance = init_value
+    if target_vertex == source_vertex:
+        return {}
 
+    pushes, pops, relaxed = len(queue), 0, 0
+    scanned_from: dict = {}
     while queue:
         prior_distance, source_hedge = heapq.heappop(queue)
+        pops += 1
+        if target_distance is not None and prior_distance >= target_distance:
+            break  # all later paths are no shorter, so the distance of the target is settled
         source_hedge_timing = hypergraph.timings(source_hedge)
         for vertex in hypergraph.vertices(source_hedge):
-            for next_hedge in hypergraph.hyperedges(vertex):
+            until = None
+            if distance_type == DistanceType.FOREMOST:
+                # a foremost scan reaches all later hyperedges of a vertex, so only those up to its earliest scan are new
+                if vertex in scanned_from:
+                    if scanned_from[vertex] <= source_hedge_timing:
+                        continue
+                    until = scanned_from[vertex]
+                scanned_from[vertex] = source_hedge_timing
+            for next_hedge in hypergraph.hyperedges_after(vertex, source_hedge_timing, until):
+                relaxed += 1
                 next_hedge_timing = hypergraph.timings(next_hedge)
-                if source_hedge_timing < next_hedge_timing:
-                    match distance_type:
-                        case DistanceType.SHORTEST:
-                            new_distance = prior_distance + 1
-                        case DistanceType.FASTEST:
-                            new_distance = prior_distance + (next_hedge_timing - source_hedge_timing)
-                        case DistanceType.FOREMOST:
-                            new_distance = next_hedge_timing
-                    if next_hedge not in hedge_distances or new_distance < hedge_distances[next_hedge]:
-                        hedge_distances[next_hedge] = new_distance
-                        heapq.heappush(queue, (new_distance, next_hedge))
+                match distance_type:
+                    case DistanceType.SHORTEST:
+                        new_distance = prior_distance + 1
+                    case DistanceType.FASTEST:
+                        new_distance = prior_distance + (next_hedge_timing - source_hedge_timing)
+                    case DistanceType.FOREMOST:
+                        new_distance = next_hedge_timing
+                if max_distance is not None and new_distance > max_distance:
+                    continue
+                if next_hedge not in hedge_distances or new_distance < hedge_distances[next_hedge]:
+                    hedge_distances[next_hedge] = new_distance
+                    heapq.heappush(queue, (new_distance, next_hedge))
+                    pushes += 1
+                    if next_hedge in target_hedges and (target_distance is None or new_distance < target_distance):
+                        target_distance = new_distance
+    _count(counters, pushes, pops, relaxed)
 
+    if target_vertex is not None:
+        return {} if target_distance is None else {target_vertex: target_distance}
     vertex_distances: dict = {}
     for source_hedge, distance in hedge_distances.items():
         for vertex in hypergraph.vertices(source_hedge):
             if vertex not in vertex_distances or distance < vertex_distances[vertex]:
                 vertex_distances[vertex] = distance
-    vertex_distances.pop(source_vertex)
+    vertex_distances.pop(source_vertex, None)
     return vertex_distances
 
 
-def single_source_dijkstra_vertices(hypergraph: TimeVaryingHypergraph, source_vertex, distance_type: DistanceType, min_timing=datetime.min):
+def _encode_distance(hypergraph: CompactTimeVaryingHypergraph, distance, distance_type: DistanceType) -> int:
+    """Converts a distance of a type to a raw int64 distance: a hop count, a duration, or an epoch."""
+    match distance_type:
+        case DistanceType.SHORTEST:
+            return int(distance)
+        case DistanceType.FASTEST:
+            return hypergraph.codec.encode_delta(distance)
+        case DistanceType.FOREMOST:
+            return hypergraph.codec.encode(distance)
+
+
+def _single_source_dijkstra_hyperedges_compact(hypergraph: CompactTimeVaryingHypergraph, source_vertex, distance_type: DistanceType, min_timing,
+                                               counters=None, target_vertex=None, max_distance=None):
+    epochs = hypergraph.epochs
+    hedge_offsets, hedge_vertices = hypergraph.hedge_offsets, hypergraph.hedge_vertices
+    hedge_distances = np.full(hypergraph.num_hyperedges, UNREACHED, dtype=np.int64)
+    queue: list = []
+    bound = UNREACHED if max_distance is None else _encode_distance(hypergraph, max_distance, distance_type)
+    target_index = None if target_vertex is None else hypergraph.vertex_index(target_vertex)
+    target_hedges = set() if target_index is None else set(hypergraph.vertex_incidence(target_index).tolist())
+
+    source_index = hypergraph.vertex_index(source_vertex)
+    if target_index == source_index:
+        return {}
+    source_hedges = hypergraph.vertex_incidence(source_index)
+    match distance_type:
+        case DistanceType.SHORTEST:
+            source_distances = np.ones(len(source_hedges), dtype=np.int64)
+        case DistanceType.FASTEST:
+            source_distances = np.zeros(len(source_hedges), dtype=np.int64)
+        case DistanceType.FOREMOST:
+            source_distances = epochs[source_hedges]
+    source_hedges = source_hedges[source_distances <= bound]
+    hedge_distances[source_hedges] = source_distances[source_distances <= bound]
+    for source_hedge in source_hedges.tolist():
+        heapq.heappush(queue, (int(hedge_distances[source_hedge]), source_hedge))
+    target_distance = min((int(hedge_distances[hedge]) for hedge in target_hedges), default=UNREACHED)
+
+    pushes, pops, relaxed = len(queue), 0, 0
+    scanned_from = np.full(hypergraph.num_vertices, UNREACHED, dtype=np.int64)
+    while queue:
+        prior_distance, source_hedge = heapq.heappop(queue)
+        pops += 1
+        if prior_distance >= target_distance:
+            break  # all later paths are no shorter, so the distance of the target is settled
+        if prior_distance > hedge_distances[source_hedge]:
+            continue  # stale entry, the hyperedge has been settled with a smaller distance already
+        source_hedge_timing = epochs[source_hedge]
+        for vertex in hedge_vertices[hedge_offsets[source_hedge]:hedge_offsets[source_hedge + 1]]:
+            until = None
+            if distance_type == DistanceType.FOREMOST:
+                # a foremost scan reaches all later hyperedges of a vertex, so only those up to its earliest scan are new
+                if scanned_from[vertex] <= source_hedge_timing:
+                    continue
+                if scanned_from[vertex] != UNREACHED:
+                    until = scanned_from[vertex]
+                scanned_from[vertex] = source_hedge_timing
+            next_hedges = hypergraph.incidence_after(vertex, source_hedge_timing, until)
+            relaxed += len(next_hedges)
+            next_hedge_timings = epochs[next_hedges]
+            match distance_type:
+                case DistanceType.SHORTEST:
+                    new_distances = np.full(len(next_hedges), prior_distance + 1, dtype=np.int64)
+                case DistanceType.FASTEST:
+                    new_distances = prior_distance + (next_hedge_timings - source_hedge_timing)
+                case DistanceType.FOREMOST:
+                    new_distances = next_hedge_timings
+            improved = (new_distances < hedge_distances[next_hedges]) & (new_distances <= bound)
+            improved_hedges = next_hedges[improved].tolist()
+            pushes += len(improved_hedges)
+            for next_hedge, new_distance in zip(improved_hedges, new_distances[improved].tolist()):
+                hedge_distances[next_hedge] = new_distance
+                heapq.heappush(queue, (new_distance, next_hedge))
+                if next_hedge in target_hedges and new_distance < target_distance:
+                    target_distance = new_distance
+    _count(counters, pushes, pops, relaxed)
+
+    if target_index is not None:
+        vertex_distances = np.full(hypergraph.num_vertices, UNREACHED, dtype=np.int64)
+        vertex_distances[target_index] = target_distance
+        return _decode_vertex_distances(hypergraph, vertex_distances, distance_type, min_timing)
+    return _compact_vertex_distances(hypergraph, hedge_distances, source_index, distance_type, min_timing)
+
+
+def _compact_vertex_distances(hypergraph: CompactTimeVaryingHypergraph, hedge_distances, source_index, distance_type: DistanceType, min_timing):
+    member_distances = np.repeat(hedge_distances, np.diff(hypergraph.hedge_offsets))
+    vertex_distances = np.full(hypergraph.num_vertices, UNREACHED, dtype=np.int64)
+    np.minimum.at(vertex_distances, hypergraph.hedge_vertices, member_distances)
+    vertex_distances[source_index] = UNREACHED
+    return _decode_vertex_distances(hypergraph, vertex_distances, distance_type, min_timing)
+
+
+def _decode_vertex_distances(hypergraph: CompactTimeVaryingHypergraph, vertex_distances, distance_type: DistanceType, min_timing):
+    reached = np.flatnonzero(vertex_distances != UNREACHED)
+    match distance_type:
+        case DistanceType.SHORTEST:
+            decode = int
+        case DistanceType.FASTEST:
+            zero = min_timing - min_timing
+
+            def decode(delta):
+                return hypergraph.codec.decode_delta(delta) if delta else zero
+        case DistanceType.FOREMOST:
+            decode = hypergraph.codec.decode
+    return {hypergraph.vertex_id(vertex): decode(distance)
+            for vertex, distance in zip(reached.tolist(), vertex_distances[reached].tolist())}
+
+
+@_cached
+def single_source_dijkstra_vertices(hypergraph: TimeVaryingHypergraph, source_vertex, distance_type: DistanceType, min_timing=datetime.min,
+                                    window=None, counters=None, target_vertex=None, max_distance=None):
+    """
+    Returns the minimal distances from a source vertex to all vertices reachable from it, like
+    single_source_dijkstra_hyperedges, including the early stop at a `target_vertex` and the `max_distance` bound.
+    """
+    if window is not None:  # a (start, end) pair of timings; only the hyperedges in [start, end) are used
+        hypergraph = hypergraph.window(*window)
+    if isinstance(hypergraph, CompactTimeVaryingHypergraph):
+        source_index = hypergraph.vertex_index(source_vertex)
+        target_index = None if target_vertex is None else hypergraph.vertex_index(target_vertex)
+        if target_index == source_index:
+            return {}
+        bound = UNREACHED if max_distance is None else _encode_distance(hypergraph, max_distance, distance_type)
+        vertex_distances = _compact_vertex_dijkstra(hypergraph, source_index, distance_type, counters, target_index, bound)
+        if target_index is not None:  # the distances of the other vertices are not settled
+            target_distance, vertex_distances = vertex_distances[target_index], np.full(hypergraph.num_vertices, UNREACHED, dtype=np.int64)
+            vertex_distances[target_index] = target_distance
+        return _decode_vertex_distances(hypergraph, vertex_distances, distance_type, min_timing)
+
     distances: dict = {}
     queue: list = []
+    if target_vertex is not None:
+        hypergraph.hyperedges(target_vertex)  # raises EntityNotFound for an unknown target
+        if target_vertex == source_vertex:
+            return {}
+    target_distance = None  # the smallest distance of a state of the target so far
 
     source_hedge = None
     source_reachable = (source_vertex, source_hedge)
@@ -71,8 +291,12 @@ def single_source_dijkstra_vertices(hypergraph: TimeVaryingHypergraph, source_ve
     distances[source_reachable] = init_distance
     heapq.heappush(queue, (init_distance, source_reachable))
 
+    pushes, pops, relaxed = 1, 0, 0
     while queue:
         distance, (vertex, source_hedge) = heapq.heappop(queue)
+        pops += 1
+        if target_distance is not None and distance >= target_distance:
+            break  # all later paths are no shorter, so the distance of the target is settled
         for next_hedge in hypergraph.hyperedges(vertex):
             if source_hedge:
                 source_hedge_timing = hypergraph.timings(source_hedge)
@@ -80,6 +304,7 @@ def single_source_dijkstra_vertices(hypergraph: TimeVaryingHypergraph, source_ve
                 source_hedge_timing = hypergraph.timings(next_hedge)
             next_hedge_timing = hypergraph.timings(next_hedge)
             if not source_hedge or source_hedge_timing < next_hedge_timing:
+                relaxed += 1
                 for next_vertex in hypergraph.vertices(next_hedge):
                     new_reachable = (next_vertex, next_hedge)
                     match distance_type:
@@ -89,13 +314,434 @@ def single_source_dijkstra_vertices(hypergraph: TimeVaryingHypergraph, source_ve
                             new_distance = distance + (next_hedge_timing - source_hedge_timing)
                         case DistanceType.FOREMOST:
                             new_distance = next_hedge_timing
+                    if max_distance is not None and new_distance > max_distance:
+                        continue
                     if new_reachable not in distances or new_distance < distances[new_reachable]:
                         distances[new_reachable] = new_distance
                         heapq.heappush(queue, (new_distance, new_reachable))
+                        pushes += 1
+                        if next_vertex == target_vertex and (target_distance is None or new_distance < target_distance):
+                            target_distance = new_distance
+    _count(counters, pushes, pops, relaxed)
+    if target_vertex is not None:
+        return {} if target_distance is None else {target_vertex: target_distance}
     minimal_distances: dict = {}
     for (vertex, _), distance in distances.items():
         if vertex not in minimal_distances or distance < minimal_distances[vertex]:
             minimal_distances[vertex] = distance
-    minimal_distances.pop(source_vertex)
+    minimal_distances.pop(source_vertex, None)
 
     return minimal_distances
+
+
+def _compact_vertex_dijkstra(hypergraph: CompactTimeVaryingHypergraph, source_index, distance_type: DistanceType, counters=None, target_index=None,
+                             bound=UNREACHED):
+    """
+    Runs single_source_dijkstra_vertices on the compact backend with raw int64 distances: hop counts, durations, and
+    epochs. Returns the minimal distance of each vertex, UNREACHED for unreachable vertices and the source itself.
+    The search stops once the distance of `target_index` is settled, and does not follow paths beyond `bound`.
+
+    Instead of a state per (vertex, hyperedge), a path that has reached a vertex is a label (arrival, rank): the
+    timing of its last hyperedge, after which it can continue, and how good it is for its continuations, the more
+    the better: minus its hops (SHORTEST), its start (FASTEST), or nothing (FOREMOST). A label dominates another one
+    at the same vertex with no earlier arrival and no higher rank, as every continuation of the latter is one of the
+    former with no larger distance. Each vertex keeps the Pareto frontier of its settled labels, dominated labels
+    are discarded, and a settled label only scans the hyperedges of its vertex up to the earliest arrival of a
+    settled label of at least its rank, as the later ones have been scanned from that label already. The results are
+    identical to those of the state-based search on the dict backend.
+    """
+    epochs, hedge_offsets, hedge_vertices = hypergraph.epochs, hypergraph.hedge_offsets, hypergraph.hedge_vertices
+    distances = [UNREACHED] * hypergraph.num_vertices
+    frontiers: dict = {}  # per vertex, the arrivals and ranks of its settled labels, both ascending
+    source_rank = UNREACHED if distance_type == DistanceType.FASTEST else 0
+    queue: list = [(_EARLIEST if distance_type == DistanceType.FOREMOST else 0, _EARLIEST, source_rank, source_index)]
+
+    pushes, pops, relaxed = 1, 0, 0
+    while queue:
+        distance, arrival, rank, vertex = heapq.heappop(queue)
+        pops += 1
+        if target_index is not None and distances[target_index] <= distance:
+            break  # all later paths are no shorter, so the distance of the target is settled
+        arrivals, ranks = frontiers.setdefault(vertex, ([], []))
+        position = bisect_left(ranks, rank)
+        until = arrivals[position] if position < len(ranks) else None
+        if until is not None and until <= arrival:
+            continue  # dominated by a settled label
+        # the new label replaces the settled labels it dominates: those with no earlier arrival and no higher rank
+        first, last = bisect_left(arrivals, arrival), bisect_right(ranks, rank)
+        arrivals[first:last], ranks[first:last] = [arrival], [rank]
+
+        next_hedges = hypergraph.incidence_after(vertex, arrival, until)
+        relaxed += len(next_hedges)
+        for next_hedge, next_hedge_timing in zip(next_hedges.tolist(), epochs[next_hedges].tolist()):
+            match distance_type:
+                case DistanceType.SHORTEST:
+                    next_rank = rank - 1
+                    new_distance = -next_rank
+                case DistanceType.FASTEST:
+                    next_rank = min(rank, next_hedge_timing)  # a path from the source starts with its first hyperedge
+                    new_distance = next_hedge_timing - next_rank
+                case DistanceType.FOREMOST:
+                    next_rank = 0
+                    new_distance = next_hedge_timing
+            if new_distance > bound:
+                continue
+            for next_vertex in hedge_vertices[hedge_offsets[next_hedge]:hedge_offsets[next_hedge + 1]].tolist():
+                if new_distance < distances[next_vertex]:
+                    distances[next_vertex] = new_distance
+                frontier = frontiers.get(next_vertex)
+                if frontier is not None:
+                    position = bisect_left(frontier[1], next_rank)
+                    if position < len(frontier[1]) and frontier[0][position] <= next_hedge_timing:
+                        continue
+                heapq.heappush(queue, (new_distance, next_hedge_timing, next_rank, next_vertex))
+                pushes += 1
+    _count(counters, pushes, pops, relaxed)
+
+    vertex_distances = np.array(distances, dtype=np.int64)
+    vertex_distances[source_index] = UNREACHED
+    return vertex_distances
+
+
+def bidirectional_shortest(hypergraph: CompactTimeVaryingHypergraph, source_vertex, target_vertex, window=None, counters=None) -> dict:
+    """
+    Returns the shortest distance from a source vertex to a target vertex as {target_vertex: hops}, or {} if the
+    target is unreachable, like single_source_dijkstra_hyperedges(..., DistanceType.SHORTEST, target_vertex=...).
+
+    As all hops count the same, the hyperedges are searched breadth-first from both ends: forward in time from the
+    hyperedges of the source, and backward in time from those of the target. The smaller frontier is expanded by
+    one level at a time, until no path can be shorter than the shortest one through a hyperedge reached from both
+    sides. Like the foremost scans, each side scans the hyperedges of a vertex only once: forward only those up to
+    its earliest scan, backward only those from its latest one.
+
+    The search takes milliseconds where converting a network takes seconds, so it requires the compact backend: a
+    dict-based hypergraph is to be converted once, e.g., via CompactTimeVaryingHypergraph.from_hypergraph.
+    """
+    if not isinstance(hypergraph, CompactTimeVaryingHypergraph):
+        raise TypeError('bidirectional_shortest requires a CompactTimeVaryingHypergraph; convert the hypergraph once via CompactTimeVaryingHypergraph.from_hypergraph')
+    if window is not None:  # a (start, end) pair of timings; only the hyperedges in [start, end) are used
+        hypergraph = hypergraph.window(*window)
+    source_index, target_index = hypergraph.vertex_index(source_vertex), hypergraph.vertex_index(target_vertex)
+    if source_index == target_index:
+        return {}
+    epochs, hedge_offsets, hedge_vertices = hypergraph.epochs, hypergraph.hedge_offsets, hypergraph.hedge_vertices
+
+    # per side: the hops of the reached hyperedges, the current frontier and its hops, and the scanned epochs per vertex
+    forward, backward = (dict.fromkeys(hypergraph.vertex_incidence(index).tolist(), 1) for index in (source_index, target_index))
+    frontiers, depths, scanned = [list(forward), list(backward)], [1, 1], [{}, {}]
+    shortest = 1 if any(hedge in backward for hedge in forward) else UNREACHED
+
+    pushes, pops, relaxed = len(forward) + len(backward), 0, 0
+    while shortest > depths[0] + depths[1] - 1 and frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        reached, other, side_scanned = (forward, backward, scanned[0]) if side == 0 else (backward, forward, scanned[1])
+        hops = depths[side] + 1
+        next_frontier: list = []
+        for hedge in frontiers[side]:
+            pops += 1
+            hedge_timing = int(epochs[hedge])
+            for vertex in hedge_vertices[hedge_offsets[hedge]:hedge_offsets[hedge + 1]].tolist():
+                previous = side_scanned.get(vertex)
+                if side == 0:
+                    if previous is not None and previous <= hedge_timing:
+                        continue
+                    next_hedges = hypergraph.incidence_after(vertex, hedge_timing, previous)
+                else:
+                    if previous is not None and previous >= hedge_timing:
+                        continue
+                    next_hedges = hypergraph.incidence_before(vertex, hedge_timing, previous)
+                side_scanned[vertex] = hedge_timing
+                relaxed += len(next_hedges)
+                for next_hedge in next_hedges.tolist():
+                    if next_hedge not in reached:
+                        reached[next_hedge] = hops
+                        next_frontier += [next_hedge]
+                        if next_hedge in other:
+                            shortest = min(shortest, hops + other[next_hedge] - 1)
+        pushes += len(next_frontier)
+        frontiers[side], depths[side] = next_frontier, hops
+    _count(counters, pushes, pops, relaxed)
+    return {} if shortest == UNREACHED else {target_vertex: shortest}
+
+
+def single_source_foremost_sweep(hypergraph: TimeVaryingHypergraph, source_vertex):
+    """
+    Computes the foremost distances from a source vertex in one pass over the hyperedges in time order.
+
+    A hyperedge is reached if it contains the source vertex or any vertex that has been reached strictly before its
+    timing; the foremost distance of a vertex is the timing of the first reached hyperedge it belongs to. The result
+    is identical to single_source_dijkstra_hyperedges(..., DistanceType.FOREMOST).
+    """
+    if isinstance(hypergraph, CompactTimeVaryingHypergraph):
+        return multi_source_foremost_sweep(hypergraph, [source_vertex])[source_vertex]
+
+    source_hedges = hypergraph.hyperedges(source_vertex)
+    if not source_hedges:  # e.g., in a window without hyperedges of the source vertex
+        return {}
+    hedges, timings = hypergraph.hyperedges_by_timing()
+    arrivals: dict = {}
+    num_vertices = len(hypergraph.vertices())
+    start = bisect_left(timings, min(hypergraph.timings(source_hedge) for source_hedge in source_hedges))
+    for hedge, timing in zip(hedges[start:], timings[start:]):
+        vertices = hypergraph.vertices(hedge)
+        if hedge in source_hedges or any(arrivals.get(vertex, timing) < timing for vertex in vertices):
+            for vertex in vertices:
+                arrivals.setdefault(vertex, timing)
+            if len(arrivals) == num_vertices:
+                break
+    arrivals.pop(source_vertex)
+    return arrivals
+
+
+def _first_epoch(hypergraph: CompactTimeVaryingHypergraph, source_indices):
+    """
+    Returns the earliest epoch of the hyperedges of the source vertices, or None if none of them has a hyperedge, e.g.,
+    participants whose channels have all been pruned.
+    """
+    offsets = hypergraph.vertex_offsets
+    return min((int(hypergraph.vertex_epochs[offsets[index]]) for index in source_indices if offsets[index] < offsets[index + 1]), default=None)
+
+
+def multi_source_foremost_sweep(hypergraph: TimeVaryingHypergraph, source_vertices):
+    """
+    Computes the foremost distances of many source vertices together in one pass over the hyperedges in time order.
+
+    Returns a dictionary mapping each source vertex to its foremost distances. On the compact backend, the arrivals of
+    all sources are kept in one sources x vertices epoch matrix, so each hyperedge is visited once per batch.
+    """
+    if not isinstance(hypergraph, CompactTimeVaryingHypergraph):
+        return {source_vertex: single_source_foremost_sweep(hypergraph, source_vertex) for source_vertex in source_vertices}
+
+    source_vertices = list(dict.fromkeys(source_vertices))
+    if not source_vertices:
+        return {}
+    source_indices = np.array([hypergraph.vertex_index(source_vertex) for source_vertex in source_vertices], dtype=np.int64)
+    arrivals = np.full((len(source_indices), hypergraph.num_vertices), UNREACHED, dtype=np.int64)
+    # every hyperedge of a source vertex is reached, as if the source had been reached before all timings
+    arrivals[np.arange(len(source_indices)), source_indices] = np.iinfo(np.int64).min
+
+    epochs, hedge_offsets, hedge_vertices = hypergraph.epochs, hypergraph.hedge_offsets, hypergraph.hedge_vertices
+    hedge_order = hypergraph.hedge_order
+    earliest = _first_epoch(hypergraph, source_indices.tolist())
+    start = len(hedge_order) if earliest is None else epochs[hedge_order].searchsorted(earliest, side='left')
+    for hedge in hedge_order[start:].tolist():
+        members = hedge_vertices[hedge_offsets[hedge]:hedge_offsets[hedge + 1]]
+        timing = epochs[hedge]
+        member_arrivals = arrivals[:, members]
+        reached = (member_arrivals < timing).any(axis=1)
+        if reached.any():
+            arrivals[np.ix_(reached, members)] = np.minimum(member_arrivals[reached], timing)
+
+    distances: dict = {}
+    for row, (source_vertex, source_index) in enumerate(zip(source_vertices, source_indices.tolist())):
+        source_arrivals = arrivals[row]
+        source_arrivals[source_index] = UNREACHED
+        reached = np.flatnonzero(source_arrivals != UNREACHED)
+        distances[source_vertex] = {hypergraph.vertex_id(vertex): hypergraph.codec.decode(epoch)
+                                    for vertex, epoch in zip(reached.tolist(), source_arrivals[reached].tolist())}
+    return distances
+
+
+def single_source_minimal_distances(hypergraph: TimeVaryingHypergraph, source_vertex, min_timing=datetime.min) -> dict:
+    """
+    Computes the shortest, fastest, and foremost distances from a source vertex in one traversal.
+
+    Minimal paths respect time, so every predecessor of a hyperedge has an earlier timing. One pass over the hyperedges
+    in time order therefore settles all three metrics at once: per vertex, it keeps the fewest hops, the latest start
+    of a path, and the earliest arrival. Hyperedges with the same timing are settled together, so they do not pass
+    information to each other. Returns a dictionary mapping each DistanceType to the result of
+    single_source_dijkstra_hyperedges(..., distance_type), which it matches exactly.
+    """
+    if isinstance(hypergraph, CompactTimeVaryingHypergraph):
+        return multi_source_minimal_distances(hypergraph, [source_vertex], min_timing)[source_vertex]
+
+    source_hedges = hypergraph.hyperedges(source_vertex)
+    if not source_hedges:  # e.g., in a window without hyperedges of the source vertex
+        return {distance_type: {} for distance_type in DistanceType}
+    hedges, timings = hypergraph.hyperedges_by_timing()
+    zero = min_timing - min_timing
+    hops: dict = {}
+    starts: dict = {}
+    durations: dict = {}
+    arrivals: dict = {}
+
+    def settle(group):
+        for vertices, timing, hop, start, duration in group:
+            for vertex in vertices:
+                if vertex not in arrivals:
+                    arrivals[vertex], hops[vertex], starts[vertex], durations[vertex] = timing, hop, start, duration
+                else:
+                    hops[vertex] = min(hops[vertex], hop)
+                    starts[vertex] = max(starts[vertex], start)
+                    durations[vertex] = min(durations[vertex], duration)
+
+    group: list = []
+    first = bisect_left(timings, min(hypergraph.timings(source_hedge) for source_hedge in source_hedges))
+    for hedge, timing in zip(hedges[first:], timings[first:]):
+        if group and group[0][1] != timing:
+            settle(group)
+            group = []
+        vertices = hypergraph.vertices(hedge)
+        if hedge in source_hedges:
+            group += [(vertices, timing, 1, timing, zero)]
+            continue
+        predecessors = [vertex for vertex in vertices if vertex in arrivals]
+        if predecessors:
+            start = max(starts[vertex] for vertex in predecessors)
+            group += [(vertices, timing, 1 + min(hops[vertex] for vertex in predecessors), start, timing - start)]
+    settle(group)
+
+    for distances in (hops, durations, arrivals):
+        distances.pop(source_vertex)
+    return {DistanceType.SHORTEST: hops, DistanceType.FASTEST: durations, DistanceType.FOREMOST: arrivals}
+
+
+def multi_source_minimal_distances(hypergraph: TimeVaryingHypergraph, source_vertices, min_timing=datetime.min, batch_size=BATCH_SIZE) -> dict:
+    """
+    Computes the shortest, fastest, and foremost distances of many source vertices in one traversal per batch.
+
+    Returns a dictionary mapping each source vertex to the result of single_source_minimal_distances. On the compact
+    backend, the per-vertex states of up to `batch_size` sources are kept in sources x vertices matrices, so each
+    hyperedge is visited once per batch.
+    """
+    if not isinstance(hypergraph, CompactTimeVaryingHypergraph):
+        return {source_vertex: single_source_minimal_distances(hypergraph, source_vertex, min_timing) for source_vertex in source_vertices}
+
+    source_vertices = list(dict.fromkeys(source_vertices))
+    distances: dict = {}
+    for start in range(0, len(source_vertices), batch_size):
+        batch = source_vertices[start:start + batch_size]
+        matrices = minimal_distance_matrices(hypergraph, batch)
+        distances.update((source_vertex, {distance_type: _decode_vertex_distances(hypergraph, matrices[distance_type][row], distance_type, min_timing)
+                                          for distance_type in DistanceType})
+                         for row, source_vertex in enumerate(batch))
+    return distances
+
+
+def multi_source_dijkstra_hyperedges(hypergraph: TimeVaryingHypergraph, source_vertices, distance_type: DistanceType, min_timing=datetime.min,
+                                     batch_size=BATCH_SIZE) -> dict:
+    """
+    Runs single_source_dijkstra_hyperedges for many source vertices together and returns a dictionary mapping each
+    source vertex to its result.
+
+    A minimal path only continues with later hyperedges, so the hyperedges in time order are a topological order of
+    every search, and the searches of a batch can relax each hyperedge together instead of each rediscovering it. On
+    the compact backend, blocks of `batch_size` sources share one sweep of minimal_distance_matrices, which relaxes a
+    hyperedge for all sources of the block with one set of array operations.
+    """
+    if not isinstance(hypergraph, CompactTimeVaryingHypergraph):
+        return {source_vertex: single_source_dijkstra_hyperedges(hypergraph, source_vertex, distance_type, min_timing) for source_vertex in source_vertices}
+
+    source_vertices = list(dict.fromkeys(source_vertices))
+    distances: dict = {}
+    for start in range(0, len(source_vertices), batch_size):
+        batch = source_vertices[start:start + batch_size]
+        matrix = minimal_distance_matrices(hypergraph, batch)[distance_type]
+        distances.update((source_vertex, _decode_vertex_distances(hypergraph, matrix[row], distance_type, min_timing))
+                         for row, source_vertex in enumerate(batch))
+    return distances
+
+
+def minimal_distance_matrices(hypergraph: CompactTimeVaryingHypergraph, source_vertices) -> dict:
+    """
+    Computes the raw shortest, fastest, and foremost distances of distinct source vertices on the compact backend.
+
+    Returns a dictionary mapping each DistanceType to a sources x vertices int64 matrix of hop counts, durations, or
+    epochs, respectively; unreachable vertices and the sources themselves hold UNREACHED.
+    """
+    state = minimal_path_state(hypergraph, source_vertices)
+    rows = np.arange(len(source_vertices))
+    source_indices = [hypergraph.vertex_index(source_vertex) for source_vertex in source_vertices]
+    for matrix in (state['hops'], state['durations'], state['arrivals']):
+        matrix[rows, source_indices] = UNREACHED
+    return {DistanceType.SHORTEST: state['hops'], DistanceType.FASTEST: state['durations'], DistanceType.FOREMOST: state['arrivals']}
+
+
+def vertex_dijkstra_matrices(hypergraph: CompactTimeVaryingHypergraph, source_vertices, counters=None) -> dict:
+    """
+    Computes the raw distances of single_source_dijkstra_vertices for distinct source vertices on the compact backend,
+    in the format of minimal_distance_matrices.
+
+    Given `counters`, a dictionary of arrays with one entry per source like from telemetry.source_counters, the wall
+    time of the searches of each source is added to 'seconds', and their heap pushes and pops and relaxed hyperedges
+    to the arrays of COUNTERS.
+    """
+    source_indices = [hypergraph.vertex_index(source_vertex) for source_vertex in source_vertices]
+    matrices = {distance_type: np.empty((len(source_indices), hypergraph.num_vertices), dtype=np.int64) for distance_type in DistanceType}
+    for row, source_index in enumerate(source_indices):
+        source_counters: dict = {}
+        started = time.perf_counter()
+        for distance_type in DistanceType:
+            matrices[distance_type][row] = _compact_vertex_dijkstra(hypergraph, source_index, distance_type, source_counters)
+        if counters is not None:
+            counters['seconds'][row] += time.perf_counter() - started
+            for counter, count in source_counters.items():
+                counters[counter][row] += count
+    return matrices
+
+
+def initial_path_state(hypergraph: CompactTimeVaryingHypergraph, source_vertices) -> dict:
+    """Returns the state of minimal_path_state before any hyperedge has been swept."""
+    source_indices = np.array([hypergraph.vertex_index(source_vertex) for source_vertex in source_vertices], dtype=np.int64)
+    shape = (len(source_indices), hypergraph.num_vertices)
+    state = {'hops': np.full(shape, UNREACHED, dtype=np.int64), 'starts': np.full(shape, _EARLIEST, dtype=np.int64),
+             'durations': np.full(shape, UNREACHED, dtype=np.int64), 'arrivals': np.full(shape, UNREACHED, dtype=np.int64)}
+    # the source itself is reached before all timings with no hops; a path starting at its hyperedge starts there
+    rows = np.arange(len(source_indices))
+    state['hops'][rows, source_indices] = 0
+    state['starts'][rows, source_indices] = UNREACHED
+    state['arrivals'][rows, source_indices] = _EARLIEST
+    return state
+
+
+def minimal_path_state(hypergraph: CompactTimeVaryingHypergraph, source_vertices, state=None, after=None, counters=None) -> dict:
+    """
+    Sweeps the hyperedges in time order for distinct source vertices and returns the per-vertex state of the sweep
+    behind minimal_distance_matrices: sources x vertices int64 matrices of the fewest hops ('hops'), the latest start
+    ('starts'), the shortest duration ('durations'), and the earliest arrival ('arrivals') of the paths to each vertex.
+
+    Paths only grow by later hyperedges, so a sweep can be continued: given the `state` of a sweep over all hyperedges
+    up to epoch `after`, e.g., before new hyperedges were appended, only the later hyperedges are swept.
+
+    Given `counters`, a dictionary of arrays with one entry per source like from telemetry.source_counters, the
+    hyperedges that each source reaches, i.e., that are relaxed for it, are counted in 'relaxed'. The sweep uses no
+    heap, so the other counters are left as they are, see SWEEP_COUNTERS.
+    """
+    if state is None:
+        state = initial_path_state(hypergraph, source_vertices)
+    hops, starts, durations, arrivals = state['hops'], state['starts'], state['durations'], state['arrivals']
+
+    def settle(group):
+        for members, timing, reached, hop, start in group:
+            block = np.ix_(reached, members)
+            hops[block] = np.minimum(hops[block], hop[:, None])
+            starts[block] = np.maximum(starts[block], start[:, None])
+            durations[block] = np.minimum(durations[block], timing - start[:, None])
+            arrivals[block] = np.minimum(arrivals[block], timing)
+
+    epochs, hedge_offsets, hedge_vertices = hypergraph.epochs, hypergraph.hedge_offsets, hypergraph.hedge_vertices
+    hedge_order = hypergraph.hedge_order
+    if after is None:
+        source_indices = [hypergraph.vertex_index(source_vertex) for source_vertex in source_vertices]
+        earliest = _first_epoch(hypergraph, source_indices)
+        first = len(hedge_order) if earliest is None else epochs[hedge_order].searchsorted(earliest, side='left')
+    else:
+        first = epochs[hedge_order].searchsorted(after, side='right')
+    group: list = []
+    for hedge in hedge_order[first:].tolist():
+        timing = int(epochs[hedge])
+        if group and group[0][1] != timing:
+            settle(group)
+            group = []
+        members = hedge_vertices[hedge_offsets[hedge]:hedge_offsets[hedge + 1]]
+        predecessors = arrivals[:, members] < timing
+        reached = np.flatnonzero(predecessors.any(axis=1))
+        if len(reached):
+            if counters is not None:
+                counters['relaxed'][reached] += 1
+            predecessors = predecessors[reached]
+            hop = np.where(predecessors, hops[np.ix_(reached, members)], UNREACHED).min(axis=1) + 1
+            start = np.minimum(np.where(predecessors, starts[np.ix_(reached, members)], _EARLIEST).max(axis=1), timing)
+            group += [(members, timing, reached, hop, start)]
+    settle(group)
+    return state
@@ -1,17 +1,114 @@
-from datetime import datetime
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
 from collections import defaultdict
+from numbers import Integral
 from pathlib import Path
 import bz2
+import copy
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
 
 try:
     import orjson as json
 except ImportError:
     import json
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .ingest import network_files, read_channels, read_part, split_network
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_INDEX_DTYPE = 'int32'
+_COMPACT_ARRAYS = ('epochs', 'hedge_offsets', 'hedge_vertices', 'vertex_offsets', 'vertex_hedges', 'vertex_epochs', 'hedge_order')
+_IDS_FILE = 'ids.pickle'
+CACHE_DIR = '.cache'
+CACHE_FORMAT_VERSION = 1  # part of the names of cached networks; to be increased with every change of what save writes
+NETWORK_DIR = Path('./data/networks')
+AVAILABLE_DATA_SETS = ('microsoft', )  # other data sets have not been published yet
+
+
 class EntityNotFound(Exception):
     pass
 
+
+def file_digest(file_path, chunk_size=1 << 20) -> str:
+    """
+    Returns the SHA-256 hex digest of a file, e.g., to fingerprint a network file; the digest of a directory of
+    network files covers their names and contents.
+    """
+    digest = hashlib.sha256()
+    file_path = Path(file_path)
+    for path in network_files(file_path):
+        if path != file_path:
+            digest.update(path.name.encode() + b'\0')
+        with path.open('rb') as file:
+            for chunk in iter(lambda: file.read(chunk_size), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _dominated(group) -> set:
+    """
+    Returns the hyperedges of a group of (hyperedge, vertices) pairs with the same timing whose vertices are a subset
+    of the vertices of another hyperedge of the group; of hyperedges with equal vertices, all but the first one are
+    dominated.
+
+    A minimal path through a dominated hyperedge can go through the dominating one instead: it shares every vertex
+    with the previous and the next hyperedge of the path, and has the same timing, so the path has the same hops,
+    start, and arrival. Removing the dominated hyperedges therefore preserves all shortest, fastest, and foremost
+    distances.
+    """
+    dominated: set = set()
+    containing: dict = {}  # the hyperedges of each vertex that have been kept so far
+    for hedge, vertices in sorted(group, key=lambda item: -len(item[1])):
+        candidates = None
+        for vertex in vertices:
+            candidates = containing.get(vertex, set()) if candidates is None else candidates & containing.get(vertex, set())
+            if not candidates:
+                break
+        if candidates:
+            dominated.add(hedge)
+            continue
+        for vertex in vertices:
+            containing.setdefault(vertex, set()).add(hedge)
+    return dominated
+
+
+def _redundant(vertices) -> bool:
+    """
+    Tells if a hyperedge is redundant on its own: a hyperedge with a single vertex reaches no other vertex, so a
+    minimal path through it can skip it, with fewer hops, the same arrival, and no earlier start.
+    """
+    return len(vertices) < 2
+
+
+def reduction(hypergraph, pruned) -> dict:
+    """
+    Reports how much smaller a pruned hypergraph is than the original one: the numbers of hyperedges and of
+    incidences (vertex memberships) before and after, and the ratio of removed hyperedges.
+    """
+    def incidences(graph):
+        if isinstance(graph, CompactTimeVaryingHypergraph):
+            return sum(len(graph.hedge_members(hedge)) for hedge in graph.hedge_order.tolist()) if graph._window is not None else len(graph.hedge_vertices)
+        return sum(len(graph.vertices(hedge)) for hedge in graph.hyperedges_by_timing()[0])
+
+    before, after = len(hypergraph.hyperedges()), len(pruned.hyperedges())
+    return {'hyperedges': before, 'pruned_hyperedges': after, 'incidences': incidences(hypergraph), 'pruned_incidences': incidences(pruned),
+            'reduction_ratio': 1 - after / before if before else 0.0}
+
+
 class TimeVaryingHypergraph:
+    _window = None  # the [start, end) timings of a view created by window()
+    _fingerprint = None
+
     def __init__(self, hedges: dict, timings: dict):
         """ 
         Initializes a TimeVaryingHypergraph instance.
@@ -22,33 +119,170 @@ class TimeVaryingHypergraph:
         """
         self._vertices = defaultdict(list)
         for hedge, _vertices in hedges.items():
+            if hedge not in timings:
+                raise EntityNotFound(f'No timing for hyperedge {hedge}')
             for vertex in _vertices:
                 self._vertices[vertex] += [hedge]
 
+        # the hyperedges of each vertex are kept sorted by timing, so later hyperedges can be found by bisection
+        self._vertex_timings = {}
+        for vertex, _hedges in self._vertices.items():
+            _hedges.sort(key=timings.__getitem__)
+            self._vertex_timings[vertex] = [timings[hedge] for hedge in _hedges]
+
         self._hedges = hedges
         self._timings = timings
+        self._hedges_by_timing = self._fingerprint = None
+
+    def window(self, start=None, end=None):
+        """
+        Returns a view of the hypergraph restricted to the hyperedges with a timing in [start, end); None leaves the
+        window open on that side. The view shares all data with the hypergraph and answers the same API from its time
+        index, so all algorithms find the minimal paths within the window on it.
+        """
+        self.hyperedges_by_timing()  # the view shares the sorted hyperedges
+        if self._window is not None:
+            start = self._window[0] if start is None or (self._window[0] is not None and self._window[0] > start) else start
+            end = self._window[1] if end is None or (self._window[1] is not None and self._window[1] < end) else end
+        view = copy.copy(self)
+        view._window = (start, end)
+        view._window_by_timing = None
+        return view
+
+    def _in_window(self, timing) -> bool:
+        start, end = self._window
+        return (start is None or start <= timing) and (end is None or timing < end)
+
+    def _window_range(self, timings: list):
+        start, end = self._window
+        lower = 0 if start is None else bisect_left(timings, start)
+        return lower, len(timings) if end is None else bisect_left(timings, end, lo=lower)
 
     def timings(self, entity=None):
         if entity is None:
-            return self._timings
-        if entity in self._timings:
+            if self._window is None:
+                return self._timings
+            return dict(zip(*self.hyperedges_by_timing()))
+        if entity in self._timings and (self._window is None or self._in_window(self._timings[entity])):
             return self._timings[entity]
         raise EntityNotFound(f'No hyperedge matches the timing {entity}')
 
     def vertices(self, hedge=None):
         if hedge is None:
-            return set(self._vertices)
-        if hedge in self._hedges:
+            if self._window is None:
+                return set(self._vertices)
+            return {vertex for hedge in self.hyperedges_by_timing()[0] for vertex in self._hedges[hedge]}
+        if hedge in self._hedges and (self._window is None or self._in_window(self._timings[hedge])):
             return set(self._hedges[hedge])
         raise EntityNotFound(f'Unknown hyperedge {hedge}')
 
     def hyperedges(self, vertex=None):
         if vertex is None:
-            return set(self._hedges)
+            if self._window is None:
+                return set(self._hedges)
+            return set(self.hyperedges_by_timing()[0])
         if vertex in self._vertices:
-            return set(self._vertices[vertex])
+            if self._window is None:
+                return set(self._vertices[vertex])
+            start, stop = self._window_range(self._vertex_timings[vertex])
+            return set(self._vertices[vertex][start:stop])
         raise EntityNotFound(f'Unknown vertex {vertex}')
 
+    def hyperedges_after(self, vertex, timing, until=None):
+        """
+        Returns the hyperedges of a vertex with a timing strictly later than `timing` (and not later than `until`),
+        sorted by timing.
+        """
+        if vertex in self._vertices:
+            vertex_timings = self._vertex_timings[vertex]
+            start = bisect_right(vertex_timings, timing)
+            stop = len(vertex_timings) if until is None else bisect_right(vertex_timings, until, lo=start)
+            if self._window is not None:
+                lower, upper = self._window_range(vertex_timings)
+                start, stop = max(start, lower), min(stop, upper)
+            return self._vertices[vertex][start:stop]
+        raise EntityNotFound(f'Unknown vertex {vertex}')
+
+    def append(self, hedges: dict, timings: dict):
+        """
+        Appends hyperedges that are later than all existing ones, e.g., the new channels of a growing network. Time
+        only runs forward on minimal paths, so the minimal paths among the existing hyperedges stay valid. Views of
+        windows taken before keep the hyperedges they had.
+        """
+        if self._window is not None:
+            raise ValueError('Cannot append hyperedges to a window of a hypergraph')
+        latest = max(self._timings[hedge] for hedge in self._hedges) if self._hedges else None
+        for hedge in hedges:
+            if hedge in self._hedges:
+                raise ValueError(f'Hyperedge {hedge} exists already')
+            if hedge not in timings:
+                raise EntityNotFound(f'No timing for hyperedge {hedge}')
+            if latest is not None and timings[hedge] <= latest:
+                raise ValueError(f'Hyperedge {hedge} is not later than all existing hyperedges')
+
+        # the containers are replaced rather than changed, as the views of windows taken before share them
+        self._hedges = {**self._hedges, **hedges}
+        self._timings = {**self._timings, **{hedge: timings[hedge] for hedge in hedges}}
+        appended = defaultdict(list)
+        for hedge in sorted(hedges, key=timings.__getitem__):
+            for vertex in hedges[hedge]:
+                appended[vertex] += [hedge]
+        self._vertices = defaultdict(list, self._vertices)
+        self._vertex_timings = dict(self._vertex_timings)
+        for vertex, vertex_hedges in appended.items():
+            self._vertices[vertex] = self._vertices[vertex] + vertex_hedges
+            self._vertex_timings[vertex] = self._vertex_timings.get(vertex, []) + [timings[hedge] for hedge in vertex_hedges]
+        self._hedges_by_timing = self._fingerprint = None
+
+    def fingerprint(self) -> str:
+        """
+        Returns a SHA-256 hex digest of what minimal paths depend on: the vertices and the timing of each hyperedge,
+        and the window of a view. Hyperedge IDs and the order of the input are not part of it.
+        """
+        if self._fingerprint is None:
+            content = sorted((repr(self._timings[hedge]), sorted(map(repr, vertices))) for hedge, vertices in self._hedges.items())
+            self._fingerprint = hashlib.sha256(pickle.dumps(content, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+        return self._fingerprint if self._window is None else f'{self._fingerprint}:{self._window[0]!r}:{self._window[1]!r}'
+
+    def hyperedges_by_timing(self):
+        """
+        Returns all hyperedges sorted by timing, together with the sorted timings.
+        """
+        if self._hedges_by_timing is None:
+            hedges = sorted(self._hedges, key=self._timings.__getitem__)
+            self._hedges_by_timing = (hedges, [self._timings[hedge] for hedge in hedges])
+        if self._window is None:
+            return self._hedges_by_timing
+        if self._window_by_timing is None:
+            hedges, timings = self._hedges_by_timing
+            start, stop = self._window_range(timings)
+            self._window_by_timing = (hedges[start:stop], timings[start:stop])
+        return self._window_by_timing
+
+    def pruned(self):
+        """
+        Returns a copy of the hypergraph (or of the hyperedges of a window) without redundant hyperedges: those with
+        a single vertex, see _redundant, and those that are dominated by another hyperedge with the same timing, see
+        _dominated. All vertices and all minimal distances stay the same, while every traversal scans fewer
+        hyperedges; reduction() reports by how much.
+        """
+        hedges, timings = self.hyperedges_by_timing()
+        dominated: set = set()
+        first = 0
+        for last in range(1, len(hedges) + 1):
+            if last == len(hedges) or timings[last] != timings[first]:
+                if last - first > 1:
+                    dominated |= _dominated((hedge, self._hedges[hedge]) for hedge in hedges[first:last])
+                first = last
+        kept = [hedge for hedge in hedges if hedge not in dominated and not _redundant(self._hedges[hedge])]
+        pruned = copy.copy(self)
+        pruned._window = None
+        TimeVaryingHypergraph.__init__(pruned, {hedge: self._hedges[hedge] for hedge in kept}, {hedge: self._timings[hedge] for hedge in kept})
+        for vertex in self.vertices():  # vertices of redundant hyperedges only keep no hyperedges
+            if vertex not in pruned._vertices:
+                pruned._vertices[vertex], pruned._vertex_timings[vertex] = [], []
+        return pruned
+
 
 class CommunicationNetwork(TimeVaryingHypergraph):
 
@@ -62,6 +296,9 @@ class CommunicationNetwork(TimeVaryingHypergraph):
     def participants(self, channel=None):
         return self.vertices(channel)
 
+    def append_channels(self, channels: dict, channel_timings: dict):
+        self.append(channels, channel_timings)
+
     @classmethod
     def from_json(cls, file_path, name=None):
         file_path = Path(file_path)
@@ -86,3 +323,523 @@ class CommunicationNetwork(TimeVaryingHypergraph):
             line += 1
 
         return cls(hedges, timings, name=name)
+
+
+class TimingCodec:
+    """
+    Converts hyperedge timings to int64 epochs and back.
+
+    Datetimes are encoded as microseconds since the Unix epoch, integral timings are kept as they are.
+    """
+
+    def __init__(self, sample=None):
+        self.is_datetime = isinstance(sample, datetime)
+        self.epoch = _EPOCH.replace(tzinfo=sample.tzinfo) if self.is_datetime else None
+
+    def encode(self, timing) -> int:
+        if self.is_datetime:
+            return (timing - self.epoch) // _MICROSECOND
+        if not isinstance(timing, Integral):
+            raise TypeError(f'Timing {timing!r} is neither a datetime nor an integer')
+        return int(timing)
+
+    def decode(self, epoch):
+        if self.is_datetime:
+            return self.epoch + timedelta(microseconds=int(epoch))
+        return int(epoch)
+
+    def encode_delta(self, delta) -> int:
+        if self.is_datetime:
+            return delta // _MICROSECOND
+        return int(delta)
+
+    def decode_delta(self, delta):
+        if self.is_datetime:
+            return timedelta(microseconds=int(delta))
+        return int(delta)
+
+    def decode_array(self, epochs):
+        """
+        Converts an int64 epoch array to a datetime64 array, or to a pandas datetime array in the time zone of the
+        timings if they have one; integral timings are left as they are.
+        """
+        if not self.is_datetime:
+            return epochs
+        if self.epoch.tzinfo is None:
+            return epochs.astype('datetime64[us]')
+        # datetime64 has no time zone; pandas is only imported here, as the model itself does not depend on it
+        import pandas as pd  # pylint: disable=import-outside-toplevel
+        return (pd.Timestamp(self.epoch) + pd.to_timedelta(epochs, unit='us')).array
+
+    def decode_delta_array(self, deltas):
+        if self.is_datetime:
+            return deltas.astype('timedelta64[us]')
+        return deltas
+
+
+class CompactTimeVaryingHypergraph:
+    """
+    Integer-indexed alternative backend for TimeVaryingHypergraph.
+
+    Vertex and hyperedge IDs are interned to dense integers, the incidence is stored as NumPy CSR arrays in both
+    directions, and the timings as an int64 epoch array. The dict-based public API is kept as a facade on top.
+    """
+    _window = None  # the [lower, upper) epochs of a view created by window()
+    _sorted_epochs = None
+    _fingerprint = None
+
+    def __init__(self, hedges: dict, timings: dict):
+        """
+        Initializes a CompactTimeVaryingHypergraph instance.
+
+        Args:
+        hedges (dict): A dictionary mapping hyperedges to their associated vertices.
+        timings (dict): A dictionary mapping hyperedges to their timings; timings of unknown hyperedges are ignored.
+        """
+        if np is None:
+            raise ImportError('The compact hypergraph backend requires numpy')
+        missing = [hedge for hedge in hedges if hedge not in timings]
+        if missing:
+            raise EntityNotFound(f'No timing for hyperedge {missing[0]}')
+        self._merge([_intern_incidence((hedge, vertices, timings[hedge]) for hedge, vertices in hedges.items())])
+
+    def _merge(self, interned_parts):
+        """Builds the arrays from parts interned by _intern_incidence, in order."""
+        hedge_ids: list = []
+        vertex_index: dict = {}
+        members: list = []
+        hedge_offsets: list = [np.zeros(1, dtype=np.int64)]
+        epochs: list = []
+        codec = None
+        for part_hedge_ids, part_vertex_ids, part_members, part_offsets, part_epochs, part_codec in interned_parts:
+            if not part_hedge_ids:
+                continue
+            if codec is None:
+                codec = part_codec
+            elif (part_codec.is_datetime, part_codec.epoch) != (codec.is_datetime, codec.epoch):
+                raise TypeError('Timings of different types cannot be mixed')
+            vertex_indices = np.fromiter((vertex_index.setdefault(vertex, len(vertex_index)) for vertex in part_vertex_ids),
+                                         dtype=np.int64, count=len(part_vertex_ids))
+            hedge_offsets += [np.frombuffer(part_offsets, dtype=np.int64)[1:] + hedge_offsets[-1][-1]]
+            members += [vertex_indices[np.frombuffer(part_members, dtype=np.int64)]]
+            epochs += [np.frombuffer(part_epochs, dtype=np.int64)]
+            hedge_ids += part_hedge_ids
+
+        self._hedge_ids = tuple(hedge_ids)
+        self._hedge_index = {hedge: index for index, hedge in enumerate(self._hedge_ids)}
+        # vertices are indexed in sorted order, so their indices depend neither on the iteration order of the input
+        # sets nor on how the input was split into parts
+        try:
+            self._vertex_ids = tuple(sorted(vertex_index))
+        except TypeError:  # vertex IDs of mixed types keep their order of appearance
+            self._vertex_ids = tuple(vertex_index)
+        ranks = np.empty(len(self._vertex_ids), dtype=_INDEX_DTYPE)
+        ranks[[vertex_index[vertex] for vertex in self._vertex_ids]] = np.arange(len(self._vertex_ids), dtype=_INDEX_DTYPE)
+        self._vertex_index = {vertex: index for index, vertex in enumerate(self._vertex_ids)}
+
+        self.codec = codec or TimingCodec()
+        self.epochs = np.concatenate(epochs) if epochs else np.empty(0, dtype=np.int64)
+        self.hedge_offsets = np.concatenate(hedge_offsets)
+        self.hedge_vertices = ranks[np.concatenate(members)] if members else np.empty(0, dtype=_INDEX_DTYPE)
+        self._build_vertex_incidence()
+
+    def _build_vertex_incidence(self):
+        hedge_of_member = np.repeat(np.arange(len(self._hedge_ids), dtype=_INDEX_DTYPE), np.diff(self.hedge_offsets))
+        # the hyperedges of each vertex are sorted by timing, so later hyperedges can be found by bisection
+        order = np.lexsort((self.epochs[hedge_of_member], self.hedge_vertices))
+        self.vertex_hedges = hedge_of_member[order]
+        self.vertex_epochs = self.epochs[self.vertex_hedges]
+        self._hedge_order = self._sorted_epochs = self._fingerprint = None
+        self.vertex_offsets = np.zeros(len(self._vertex_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.hedge_vertices, minlength=len(self._vertex_ids)), out=self.vertex_offsets[1:])
+
+    @classmethod
+    def from_hypergraph(cls, hypergraph: TimeVaryingHypergraph, **kwargs):
+        compact = cls(hypergraph._hedges, hypergraph._timings, **kwargs)
+        return compact if hypergraph._window is None else compact.window(*hypergraph._window)
+
+    @classmethod
+    def from_incidence(cls, incidence):
+        """
+        Creates a hypergraph from an iterable of (hyperedge, vertices, timing) triples, e.g., a stream, without
+        collecting them in dictionaries first.
+        """
+        return cls._from_interned([_intern_incidence(incidence)])
+
+    @classmethod
+    def _from_interned(cls, interned_parts):
+        if np is None:
+            raise ImportError('The compact hypergraph backend requires numpy')
+        hypergraph = cls.__new__(cls)
+        hypergraph._merge(interned_parts)
+        return hypergraph
+
+    def arrays(self) -> dict:
+        """Returns the arrays of the hypergraph by name; together with the IDs and the codec, they describe it fully."""
+        return {name: getattr(self, name) for name in _COMPACT_ARRAYS}
+
+    @classmethod
+    def from_arrays(cls, vertex_ids, hedge_ids, codec: TimingCodec, arrays: dict):
+        """Creates a hypergraph on top of existing arrays without copying them, e.g., memory-mapped ones."""
+        if np is None:
+            raise ImportError('The compact hypergraph backend requires numpy')
+        hypergraph = cls.__new__(cls)
+        hypergraph._vertex_ids = tuple(vertex_ids)
+        hypergraph._hedge_ids = tuple(hedge_ids)
+        hypergraph._vertex_index = {vertex: index for index, vertex in enumerate(hypergraph._vertex_ids)}
+        hypergraph._hedge_index = {hedge: index for index, hedge in enumerate(hypergraph._hedge_ids)}
+        hypergraph.codec = codec
+        for name in _COMPACT_ARRAYS:
+            setattr(hypergraph, f'_{name}' if name == 'hedge_order' else name, arrays.get(name))
+        return hypergraph
+
+    def save(self, directory):
+        """
+        Writes the hypergraph to a directory, one .npy file per array plus the pickled IDs and codec, so that
+        load_hypergraph can map it back without parsing anything.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name, values in self.arrays().items():
+            np.save(directory/f'{name}.npy', values)
+        attributes = {'name': self.name} if hasattr(self, 'name') else {}
+        with (directory/_IDS_FILE).open('wb') as file:
+            pickle.dump((type(self), self._vertex_ids, self._hedge_ids, self.codec, attributes), file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def append(self, hedges: dict, timings: dict):
+        """
+        Appends hyperedges that are later than all existing ones, like TimeVaryingHypergraph.append. The indices of
+        existing vertices do not change; new vertices are indexed after them. Views of windows taken before keep the
+        arrays they had.
+        """
+        if self._window is not None:
+            raise ValueError('Cannot append hyperedges to a window of a hypergraph')
+        for hedge in hedges:
+            if hedge in self._hedge_index:
+                raise ValueError(f'Hyperedge {hedge} exists already')
+            if hedge not in timings:
+                raise EntityNotFound(f'No timing for hyperedge {hedge}')
+        hedge_ids, vertex_ids, members, hedge_offsets, epochs, codec = _intern_incidence(
+            (hedge, hedges[hedge], timings[hedge]) for hedge in hedges)
+        if not hedge_ids:
+            return
+        if self.num_hyperedges == 0:
+            self.codec = codec
+        elif (codec.is_datetime, codec.epoch) != (self.codec.is_datetime, self.codec.epoch):
+            raise TypeError('Timings of different types cannot be mixed')
+        epochs = np.frombuffer(epochs, dtype=np.int64)
+        if self.num_hyperedges and epochs.min() <= self.epochs.max():
+            raise ValueError(f'Hyperedge {hedge_ids[int(epochs.argmin())]} is not later than all existing hyperedges')
+
+        new_vertices = [vertex for vertex in vertex_ids if vertex not in self._vertex_index]
+        try:
+            new_vertices = sorted(new_vertices)
+        except TypeError:  # vertex IDs of mixed types keep their order of appearance
+            pass
+        # the indices are replaced rather than changed, as the views of windows taken before share them
+        self._vertex_index = {**self._vertex_index, **{vertex: index for index, vertex in enumerate(new_vertices, start=self.num_vertices)}}
+        self._vertex_ids += tuple(new_vertices)
+        self._hedge_index = {**self._hedge_index, **{hedge: index for index, hedge in enumerate(hedge_ids, start=self.num_hyperedges)}}
+        self._hedge_ids += tuple(hedge_ids)
+
+        vertex_indices = np.array([self._vertex_index[vertex] for vertex in vertex_ids], dtype=_INDEX_DTYPE)
+        self.hedge_vertices = np.concatenate([self.hedge_vertices, vertex_indices[np.frombuffer(members, dtype=np.int64)]])
+        self.hedge_offsets = np.concatenate([self.hedge_offsets, np.frombuffer(hedge_offsets, dtype=np.int64)[1:] + self.hedge_offsets[-1]])
+        self.epochs = np.concatenate([self.epochs, epochs])
+        self._build_vertex_incidence()
+
+    @property
+    def num_vertices(self) -> int:
+        return len(self._vertex_ids)
+
+    @property
+    def num_hyperedges(self) -> int:
+        return len(self._hedge_ids)
+
+    @property
+    def nbytes(self) -> int:
+        return self.epochs.nbytes + self.hedge_offsets.nbytes + self.hedge_vertices.nbytes + \
+            self.vertex_offsets.nbytes + self.vertex_hedges.nbytes + self.vertex_epochs.nbytes
+
+    @property
+    def hedge_order(self):
+        """Hyperedge indices sorted by epoch."""
+        if self._hedge_order is None:
+            self._hedge_order = np.argsort(self.epochs, kind='stable').astype(_INDEX_DTYPE)
+        return self._hedge_order
+
+    def fingerprint(self) -> str:
+        """
+        Returns a SHA-256 hex digest of what minimal paths depend on: the vertex IDs, the timing type, the epochs and
+        members of the hyperedges, and the window of a view. Hyperedge IDs are not part of it. The digest is computed
+        once per hypergraph, as it reads all arrays.
+        """
+        if self._fingerprint is None:
+            digest = hashlib.sha256(pickle.dumps((self._vertex_ids, self.codec.is_datetime, self.codec.epoch), protocol=pickle.HIGHEST_PROTOCOL))
+            for values in (self.epochs, self.hedge_offsets, self.hedge_vertices):
+                digest.update(str(values.dtype).encode())
+                digest.update(np.ascontiguousarray(values).data)
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint if self._window is None else f'{self._fingerprint}:{self._window[0]}:{self._window[1]}'
+
+    def window(self, start=None, end=None):
+        """
+        Returns a view of the hypergraph restricted to the hyperedges with a timing in [start, end); None leaves the
+        window open on that side.
+
+        The view shares all arrays with the hypergraph, and its hyperedges in time order are a slice of hedge_order, so
+        creating it costs a bisection. Indices are those of the whole hypergraph, and all algorithms find the minimal
+        paths within the window on it.
+        """
+        lower = -2**63 if start is None else self.codec.encode(start)
+        upper = 2**63 - 1 if end is None else self.codec.encode(end)
+        if self._window is not None:
+            lower, upper = max(lower, self._window[0]), min(upper, self._window[1])
+        if self._sorted_epochs is None:
+            self._sorted_epochs = self.epochs[self.hedge_order]
+        first, last = self._sorted_epochs.searchsorted(lower, side='left'), self._sorted_epochs.searchsorted(upper, side='left')
+        view = copy.copy(self)
+        view._window = (lower, upper)
+        view._hedge_order, view._sorted_epochs = self.hedge_order[first:last], self._sorted_epochs[first:last]
+        return view
+
+    def pruned(self):
+        """
+        Returns a copy of the hypergraph (or of the hyperedges of a window) without redundant hyperedges, like
+        TimeVaryingHypergraph.pruned. Only hyperedges that share their epoch with others are compared, and the arrays
+        are rebuilt once. The vertices of a window keep their order, the others are dropped.
+        """
+        order = self.hedge_order
+        sorted_epochs = self.epochs[order]
+        sizes = np.diff(self.hedge_offsets)
+        keep = np.zeros(self.num_hyperedges, dtype=bool)
+        keep[order] = True
+        used = np.zeros(self.num_vertices, dtype=bool)
+        used[self.hedge_vertices[np.repeat(keep, sizes)]] = True
+        keep[order[sizes[order] < 2]] = False  # see _redundant
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(sorted_epochs)) + 1, [len(order)]])
+        for start, stop in zip(starts[:-1].tolist(), starts[1:].tolist()):
+            if stop - start > 1:
+                dominated = _dominated((hedge, self.hedge_members(hedge).tolist()) for hedge in order[start:stop].tolist())
+                keep[list(dominated)] = False
+
+        kept = np.flatnonzero(keep)
+        members = self.hedge_vertices[np.repeat(keep, sizes)]
+        ranks = (np.cumsum(used) - 1).astype(_INDEX_DTYPE)
+
+        pruned = copy.copy(self)
+        pruned._window = None
+        pruned._hedge_ids = tuple(self._hedge_ids[hedge] for hedge in kept.tolist())
+        pruned._hedge_index = {hedge: index for index, hedge in enumerate(pruned._hedge_ids)}
+        pruned._vertex_ids = tuple(vertex for vertex, is_used in zip(self._vertex_ids, used.tolist()) if is_used)
+        pruned._vertex_index = {vertex: index for index, vertex in enumerate(pruned._vertex_ids)}
+        pruned.epochs = self.epochs[kept]
+        pruned.hedge_offsets = np.zeros(len(kept) + 1, dtype=np.int64)
+        np.cumsum(sizes[kept], out=pruned.hedge_offsets[1:])
+        pruned.hedge_vertices = ranks[members]
+        pruned._build_vertex_incidence()
+        return pruned
+
+    def _in_window(self, hedge_index: int) -> bool:
+        return self._window is None or self._window[0] <= self.epochs[hedge_index] < self._window[1]
+
+    def _incidence_range(self, index: int):
+        start, stop = self.vertex_offsets[index], self.vertex_offsets[index + 1]
+        if self._window is not None:
+            vertex_epochs = self.vertex_epochs[start:stop]
+            start, stop = start + vertex_epochs.searchsorted(self._window[0], side='left'), start + vertex_epochs.searchsorted(self._window[1], side='left')
+        return start, stop
+
+    def vertex_id(self, index: int):
+        return self._vertex_ids[index]
+
+    def hedge_id(self, index: int):
+        return self._hedge_ids[index]
+
+    def vertex_index(self, vertex) -> int:
+        if vertex in self._vertex_index:
+            return self._vertex_index[vertex]
+        raise EntityNotFound(f'Unknown vertex {vertex}')
+
+    def hedge_index(self, hedge) -> int:
+        if hedge in self._hedge_index:
+            return self._hedge_index[hedge]
+        raise EntityNotFound(f'Unknown hyperedge {hedge}')
+
+    def hedge_members(self, index: int):
+        """Returns a zero-copy view of the vertex indices of hyperedge `index`."""
+        return self.hedge_vertices[self.hedge_offsets[index]:self.hedge_offsets[index + 1]]
+
+    def vertex_incidence(self, index: int):
+        """Returns a zero-copy view of the hyperedge indices of vertex `index`, sorted by epoch."""
+        start, stop = self._incidence_range(index)
+        return self.vertex_hedges[start:stop]
+
+    def incidence_after(self, index: int, epoch: int, until=None):
+        """
+        Returns a zero-copy view of the hyperedge indices of vertex `index` with an epoch strictly later than `epoch`
+        (and not later than `until`), sorted by epoch.
+        """
+        start, stop = self._incidence_range(index)
+        vertex_epochs = self.vertex_epochs[start:stop]
+        lower = start + vertex_epochs.searchsorted(epoch, side='right')
+        upper = stop if until is None else start + vertex_epochs.searchsorted(until, side='right')
+        return self.vertex_hedges[lower:upper]
+
+    def incidence_before(self, index: int, epoch: int, since=None):
+        """
+        Returns a zero-copy view of the hyperedge indices of vertex `index` with an epoch strictly earlier than `epoch`
+        (and not earlier than `since`), sorted by epoch.
+        """
+        start, stop = self._incidence_range(index)
+        vertex_epochs = self.vertex_epochs[start:stop]
+        lower = start if since is None else start + vertex_epochs.searchsorted(since, side='left')
+        upper = start + vertex_epochs.searchsorted(epoch, side='left')
+        return self.vertex_hedges[lower:upper]
+
+    def timings(self, entity=None):
+        if entity is None:
+            hedges = range(self.num_hyperedges) if self._window is None else np.sort(self.hedge_order).tolist()
+            return {self._hedge_ids[hedge]: self.codec.decode(epoch) for hedge, epoch in zip(hedges, self.epochs[hedges].tolist())}
+        if entity in self._hedge_index and self._in_window(self._hedge_index[entity]):
+            return self.codec.decode(self.epochs[self._hedge_index[entity]])
+        raise EntityNotFound(f'No hyperedge matches the timing {entity}')
+
+    def vertices(self, hedge=None):
+        if hedge is None:
+            if self._window is None:
+                return set(self._vertex_ids)
+            members = np.concatenate([self.hedge_members(index) for index in self.hedge_order.tolist()] or [np.empty(0, dtype=_INDEX_DTYPE)])
+            return {self._vertex_ids[index] for index in np.unique(members).tolist()}
+        if hedge in self._hedge_index and self._in_window(self._hedge_index[hedge]):
+            return {self._vertex_ids[index] for index in self.hedge_members(self._hedge_index[hedge]).tolist()}
+        raise EntityNotFound(f'Unknown hyperedge {hedge}')
+
+    def hyperedges(self, vertex=None):
+        if vertex is None:
+            if self._window is None:
+                return set(self._hedge_ids)
+            return {self._hedge_ids[index] for index in self.hedge_order.tolist()}
+        if vertex in self._vertex_index:
+            return {self._hedge_ids[index] for index in self.vertex_incidence(self._vertex_index[vertex]).tolist()}
+        raise EntityNotFound(f'Unknown vertex {vertex}')
+
+    def hyperedges_after(self, vertex, timing, until=None):
+        index = self.vertex_index(vertex)
+        epoch = self.codec.encode(timing)
+        until = None if until is None else self.codec.encode(until)
+        return [self._hedge_ids[hedge] for hedge in self.incidence_after(index, epoch, until).tolist()]
+
+
+class CompactCommunicationNetwork(CompactTimeVaryingHypergraph):
+
+    def __init__(self, channels, channel_timings, name=None):
+        super().__init__(channels, channel_timings)
+        self.name = name
+
+    @classmethod
+    def from_arrays(cls, vertex_ids, hedge_ids, codec: TimingCodec, arrays: dict, name=None):
+        network = super().from_arrays(vertex_ids, hedge_ids, codec, arrays)
+        network.name = name
+        return network
+
+    def channels(self, participant=None):
+        return self.hyperedges(participant)
+
+    def participants(self, channel=None):
+        return self.vertices(channel)
+
+    def append_channels(self, channels: dict, channel_timings: dict):
+        self.append(channels, channel_timings)
+
+    @classmethod
+    def from_json(cls, file_path, name=None, executor=None):
+        """
+        Loads a network file channel by channel, so peak memory stays close to the size of the loaded network. Besides
+        a JSON object, the file can hold newline-delimited JSON (.ndjson or .jsonl); both may be compressed with bz2.
+        A directory loads all network files in it, in sorted order.
+
+        If an executor is given, e.g., a process pool, the parts of the network from split_network are parsed and
+        interned by its workers and merged in order, so the result does not depend on the split.
+        """
+        if executor is None:
+            network = cls.from_incidence(read_channels(file_path))
+        else:
+            network = cls._from_interned(executor.map(_intern_part, split_network(file_path)))
+        network.name = name
+        return network
+
+    @classmethod
+    def from_cache(cls, file_path, name=None, cache_dir=None, digest=None, executor=None):
+        """
+        Loads a network file via a binary cache keyed by the SHA-256 digest of the file and by CACHE_FORMAT_VERSION.
+
+        On a cache miss, the network is parsed via from_json (on the executor, if given) once and saved to `cache_dir` (by default `.cache` next
+        to the file), replacing the caches of earlier versions of the file. On a hit, the arrays are memory-mapped,
+        so loading takes no parsing and reads pages only on demand.
+        """
+        file_path = Path(file_path)
+        cache_dir = file_path.parent/CACHE_DIR if cache_dir is None else Path(cache_dir)
+        cache_path = cache_dir/f'{file_path.name}.v{CACHE_FORMAT_VERSION}.{digest or file_digest(file_path)}'
+        if not cache_path.is_dir():
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            partial_path = Path(tempfile.mkdtemp(prefix=f'{file_path.name}.', suffix='.partial', dir=cache_dir))
+            cls.from_json(file_path, name=name, executor=executor).save(partial_path)
+            try:
+                os.rename(partial_path, cache_path)
+            except OSError:  # another process has written the same cache in the meantime
+                shutil.rmtree(partial_path, ignore_errors=True)
+            for stale_path in cache_dir.glob(f'{file_path.name}.*'):
+                if stale_path != cache_path and not stale_path.name.endswith('.partial'):
+                    shutil.rmtree(stale_path, ignore_errors=True)
+        network = load_hypergraph(cache_path)
+        network.name = name
+        return network
+
+
+def _intern_incidence(incidence) -> tuple:
+    """
+    Interns the IDs of (hyperedge, vertices, timing) triples in order of appearance. Returns the hyperedge IDs, the
+    vertex IDs, the members as vertex indices, the hyperedge offsets, the epochs, and the timing codec.
+    """
+    hedge_ids: list = []
+    vertex_index: dict = {}
+    members = array('q')
+    hedge_offsets = array('q', [0])
+    epochs = array('q')
+    codec = None
+    for hedge, vertices, timing in incidence:
+        if codec is None:
+            codec = TimingCodec(timing)
+        hedge_ids += [hedge]
+        for vertex in dict.fromkeys(vertices):
+            members.append(vertex_index.setdefault(vertex, len(vertex_index)))
+        hedge_offsets.append(len(members))
+        epochs.append(codec.encode(timing))
+    return hedge_ids, list(vertex_index), members, hedge_offsets, epochs, codec
+
+
+def _intern_part(part) -> tuple:
+    return _intern_incidence(read_part(part))
+
+
+def load_hypergraph(directory, mmap_mode='r') -> CompactTimeVaryingHypergraph:
+    """Loads a compact hypergraph saved to a directory; by default, its arrays are memory-mapped read-only."""
+    directory = Path(directory)
+    with (directory/_IDS_FILE).open('rb') as file:
+        hypergraph_class, vertex_ids, hedge_ids, codec, attributes = pickle.load(file)
+    arrays = {name: np.load(directory/f'{name}.npy', mmap_mode=mmap_mode) for name in _COMPACT_ARRAYS}
+    return hypergraph_class.from_arrays(vertex_ids, hedge_ids, codec, arrays, **attributes)
+
+
+def load_network(name, executor=None, network_dir=NETWORK_DIR) -> tuple:
+    """
+    Loads a data set by its name via the binary cache of from_cache: the network file `<name>.json.bz2` in
+    `network_dir`, or the directory `<name>` of sharded network files. Returns the digest of the network file and the
+    network.
+    """
+    network_path = Path(network_dir)/f'{name}.json.bz2'
+    if not network_path.exists() and network_path.with_name(name).is_dir():  # a directory of sharded network files
+        network_path = network_path.with_name(name)
+    digest = file_digest(network_path)
+    return digest, CompactCommunicationNetwork.from_cache(network_path, name=name, digest=digest, executor=executor)
@@ -0,0 +1,91 @@
+from .model import TimeVaryingHypergraph, CompactTimeVaryingHypergraph, np
+
+WORD_SIZE = 64
+DEFAULT_BATCH_SIZE = 64 * WORD_SIZE
+
+
+def _compact(hypergraph: TimeVaryingHypergraph) -> CompactTimeVaryingHypergraph:
+    if isinstance(hypergraph, CompactTimeVaryingHypergraph):
+        return hypergraph
+    return CompactTimeVaryingHypergraph.from_hypergraph(hypergraph)
+
+
+def _members_in_time_order(hypergraph: CompactTimeVaryingHypergraph):
+    hedge_order = hypergraph.hedge_order
+    sizes = np.diff(hypergraph.hedge_offsets)[hedge_order]
+    member_offsets = np.zeros(len(hedge_order) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=member_offsets[1:])
+    starts = hypergraph.hedge_offsets[hedge_order]
+    members = hypergraph.hedge_vertices[np.repeat(starts - member_offsets[:-1], sizes) + np.arange(member_offsets[-1])]
+    sorted_epochs = hypergraph.epochs[hedge_order]
+    group_starts = np.flatnonzero(np.r_[True, sorted_epochs[1:] != sorted_epochs[:-1]])
+    return members, member_offsets, np.r_[group_starts, len(hedge_order)]
+
+
+def _propagate(hypergraph: CompactTimeVaryingHypergraph, source_indices, time_ordered_members):
+    """
+    Propagates one bitset per vertex through the hyperedges in time order; bit i of vertex v is set if source i
+    reaches v. Hyperedges with the same timing see only the bitsets from before their timing.
+    """
+    members, member_offsets, group_bounds = time_ordered_members
+    reach = np.zeros((hypergraph.num_vertices, -(-len(source_indices) // WORD_SIZE)), dtype=np.uint64)
+    bits = np.arange(len(source_indices))
+    # the source itself counts as reached before all timings, so all of its hyperedges are reached
+    reach[source_indices, bits // WORD_SIZE] |= np.left_shift(np.uint64(1), (bits % WORD_SIZE).astype(np.uint64))
+
+    for first_hedge, last_hedge in zip(group_bounds[:-1].tolist(), group_bounds[1:].tolist()):
+        lower, upper = member_offsets[first_hedge], member_offsets[last_hedge]
+        group_members = members[lower:upper]
+        if last_hedge - first_hedge == 1:
+            reach[group_members] |= np.bitwise_or.reduce(reach[group_members], axis=0)
+        else:
+            local_offsets = member_offsets[first_hedge:last_hedge] - lower
+            hedge_bits = np.bitwise_or.reduceat(reach[group_members], local_offsets, axis=0)
+            sizes = np.diff(member_offsets[first_hedge:last_hedge + 1])
+            np.bitwise_or.at(reach, group_members, np.repeat(hedge_bits, sizes, axis=0))
+    return reach
+
+
+def _reachability_batches(hypergraph: TimeVaryingHypergraph, source_vertices, batch_size):
+    if np is None:
+        raise ImportError('Bit-parallel reachability requires numpy')
+    hypergraph = _compact(hypergraph)
+    if source_vertices is None:
+        source_vertices = sorted(hypergraph.vertices(), key=hypergraph.vertex_index)  # of the window on a window view
+    source_vertices = list(dict.fromkeys(source_vertices))
+    batch_size = max(WORD_SIZE, batch_size - batch_size % WORD_SIZE)
+    time_ordered_members = _members_in_time_order(hypergraph)
+
+    for start in range(0, len(source_vertices), batch_size):
+        sources = source_vertices[start:start + batch_size]
+        source_indices = np.array([hypergraph.vertex_index(source) for source in sources], dtype=np.int64)
+        reach = _propagate(hypergraph, source_indices, time_ordered_members)
+        reached = np.unpackbits(reach.astype('<u8', copy=False).view(np.uint8), axis=1, count=len(sources), bitorder='little').astype(bool)
+        reached[source_indices, np.arange(len(sources))] = False
+        yield hypergraph, sources, reached
+
+
+def reachable_counts(hypergraph: TimeVaryingHypergraph, source_vertices=None, batch_size=DEFAULT_BATCH_SIZE) -> dict:
+    """
+    Counts the vertices reachable from each source vertex (all vertices by default).
+
+    The sources are processed in batches of `batch_size`, packed into uint64 words, so a single pass over the
+    hyperedges in time order answers the reachability of a whole batch.
+    """
+    counts: dict = {}
+    for _, sources, reached in _reachability_batches(hypergraph, source_vertices, batch_size):
+        counts.update(zip(sources, reached.sum(axis=0).tolist()))
+    return counts
+
+
+def reachable_targets(hypergraph: TimeVaryingHypergraph, source_vertices=None, batch_size=DEFAULT_BATCH_SIZE) -> dict:
+    """
+    Returns the set of vertices reachable from each source vertex (all vertices by default).
+
+    The reachable sets equal the keys of single_source_dijkstra_hyperedges for any distance type.
+    """
+    targets: dict = {}
+    for compact_hypergraph, sources, reached in _reachability_batches(hypergraph, source_vertices, batch_size):
+        for column, source in enumerate(sources):
+            targets[source] = {compact_hypergraph.vertex_id(vertex) for vertex in np.flatnonzero(reached[:, column]).tolist()}
+    return targets
@@ -0,0 +1,347 @@
+import json
+import os
+import pickle
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+from .model import CompactTimeVaryingHypergraph, np
+from .minimal_paths import DistanceType, UNREACHED, initial_path_state, minimal_path_state
+
+MANIFEST = 'manifest.jsonl'
+VERTICES = 'vertices.pickle'
+COLUMNS = ('source', 'target') + tuple(distance_type.name.lower() for distance_type in DistanceType)
+STATE_COLUMNS = COLUMNS + ('start', )  # with the latest starts, the shards hold the full state of minimal_path_state
+SUMMARY_STATISTICS = ('min', 'median', 'max')
+SUMMARY_COLUMNS = ('source', 'reachable') + tuple(f'{distance_type.name.lower()}_{statistic}' for distance_type in DistanceType
+                                                  for statistic in SUMMARY_STATISTICS + ('histogram', ))
+MAX_HOPS = 64
+
+
+def distance_columns(hypergraph: CompactTimeVaryingHypergraph, source_vertices, state=None, after=None, counters=None) -> dict:
+    """
+    Computes the minimal distances of distinct source vertices as typed columns.
+
+    Sources and targets are integer-coded by their vertex index; the distances are raw int64 hop counts, durations,
+    and epochs. The reachable targets are the same for all distance types, so each (source, target) is one row. The
+    latest start of the paths to each target is kept as well, so the distances can be updated later. A given
+    state, epoch `after`, and counters are passed on to minimal_path_state.
+    """
+    state = minimal_path_state(hypergraph, source_vertices, state, after, counters)
+    source_indices = np.array([hypergraph.vertex_index(source_vertex) for source_vertex in source_vertices], dtype=np.int32)
+    reached = state['arrivals'] != UNREACHED
+    reached[np.arange(len(source_indices)), source_indices] = False
+    rows, targets = np.nonzero(reached)
+    return {'source': source_indices[rows], 'target': targets.astype(np.int32), 'shortest': state['hops'][rows, targets],
+            'fastest': state['durations'][rows, targets], 'foremost': state['arrivals'][rows, targets],
+            'start': state['starts'][rows, targets]}
+
+
+def updated_distance_columns(hypergraph: CompactTimeVaryingHypergraph, source_vertices, columns: dict, after: int) -> dict:
+    """
+    Updates the distance columns of distinct source vertices, computed when the hypergraph ended at epoch `after`,
+    with the hyperedges appended since.
+
+    Only sources that belong to an appended hyperedge or reach one of its vertices can reach further; their state is
+    restored from the columns and swept over the appended hyperedges only. The rows of other sources stay as they are.
+    """
+    appended = np.repeat(hypergraph.epochs > after, np.diff(hypergraph.hedge_offsets))
+    touched = np.zeros(hypergraph.num_vertices, dtype=bool)
+    touched[hypergraph.hedge_vertices[appended]] = True
+    source_indices = np.array([hypergraph.vertex_index(source_vertex) for source_vertex in source_vertices], dtype=np.int64)
+    affected = touched[source_indices]
+    affected[np.isin(source_indices, columns['source'][touched[columns['target']]])] = True
+    if not affected.any():
+        return columns
+
+    affected_rows = np.isin(columns['source'], source_indices[affected])
+    affected_sources = [source_vertex for source_vertex, is_affected in zip(source_vertices, affected.tolist()) if is_affected]
+    state = initial_path_state(hypergraph, affected_sources)
+    positions = np.full(hypergraph.num_vertices, -1, dtype=np.int64)
+    positions[source_indices[affected]] = np.arange(len(affected_sources))
+    cells = (positions[columns['source'][affected_rows]], columns['target'][affected_rows])
+    for name, column in (('hops', 'shortest'), ('starts', 'start'), ('durations', 'fastest'), ('arrivals', 'foremost')):
+        state[name][cells] = columns[column][affected_rows]
+    updated = distance_columns(hypergraph, affected_sources, state, after)
+    return {column: np.concatenate([columns[column][~affected_rows], updated[column]]) for column in STATE_COLUMNS}
+
+
+def histogram_edges(hypergraph: CompactTimeVaryingHypergraph, bin_width: int) -> dict:
+    """
+    Returns the lower edges of the histogram bins of each distance type: one bin per hop count up to MAX_HOPS, and
+    bins of `bin_width` (a raw duration) over the durations and the epochs of the hypergraph. The last bin of each
+    distance type is open-ended.
+    """
+    first, last = (int(hypergraph.epochs.min()), int(hypergraph.epochs.max())) if hypergraph.num_hyperedges else (0, 0)
+    return {DistanceType.SHORTEST: np.arange(1, MAX_HOPS + 1, dtype=np.int64),
+            DistanceType.FASTEST: np.arange(0, last - first + 1, bin_width, dtype=np.int64),
+            DistanceType.FOREMOST: np.arange(first, last + 1, bin_width, dtype=np.int64)}
+
+
+def summary_columns(columns: dict, source_indices, edges: dict) -> dict:
+    """
+    Reduces the distance columns of distinct sources, given as vertex indices, to one row per source: the number of
+    reachable targets, and per distance type the minimum, (lower) median, and maximum distance, UNREACHED if no
+    target is reachable, and the histogram of the distances over the bins with the lower `edges`.
+    """
+    source_indices = np.asarray(source_indices, dtype=np.int32)
+    positions = np.full(int(source_indices.max(initial=-1)) + 1, -1, dtype=np.int64)
+    positions[source_indices] = np.arange(len(source_indices))
+    rows = positions[columns['source']]
+    reachable = np.bincount(rows, minlength=len(source_indices))
+    offsets = np.zeros(len(source_indices) + 1, dtype=np.int64)
+    np.cumsum(reachable, out=offsets[1:])
+    reached = reachable > 0
+
+    summary = {'source': source_indices, 'reachable': reachable.astype(np.int64)}
+    for distance_type in DistanceType:
+        name = distance_type.name.lower()
+        values = columns[name][np.lexsort((columns[name], rows))]
+        for statistic, indices in zip(SUMMARY_STATISTICS, (offsets[:-1], offsets[:-1] + (reachable - 1) // 2, offsets[1:] - 1)):
+            summary[f'{name}_{statistic}'] = np.full(len(source_indices), UNREACHED, dtype=np.int64)
+            summary[f'{name}_{statistic}'][reached] = values[indices[reached]]
+        num_bins = len(edges[distance_type])
+        bins = np.clip(edges[distance_type].searchsorted(columns[name], side='right') - 1, 0, num_bins - 1)
+        summary[f'{name}_histogram'] = np.bincount(rows * num_bins + bins, minlength=len(source_indices) * num_bins).reshape(len(source_indices), num_bins)
+    return summary
+
+
+def distance_columns_from_matrices(hypergraph: CompactTimeVaryingHypergraph, source_vertices, matrices: dict) -> dict:
+    """
+    Converts the raw distance matrices of distinct source vertices, as from minimal_distance_matrices or
+    vertex_dijkstra_matrices, to typed columns.
+    """
+    source_indices = np.array([hypergraph.vertex_index(source_vertex) for source_vertex in source_vertices], dtype=np.int32)
+    rows, targets = np.nonzero(matrices[DistanceType.FOREMOST] != UNREACHED)
+    columns = {'source': source_indices[rows], 'target': targets.astype(np.int32)}
+    for distance_type in DistanceType:
+        columns[distance_type.name.lower()] = matrices[distance_type][rows, targets]
+    return columns
+
+
+def distance_columns_from_dicts(hypergraph: CompactTimeVaryingHypergraph, results: dict) -> dict:
+    """
+    Converts per-source results, mapping each source to its distances by DistanceType, to typed columns.
+    """
+    sources, targets = [], []
+    distances: dict = {distance_type: [] for distance_type in DistanceType}
+    encoders = {DistanceType.SHORTEST: int, DistanceType.FASTEST: hypergraph.codec.encode_delta, DistanceType.FOREMOST: hypergraph.codec.encode}
+    for source, distances_by_type in results.items():
+        source_index = hypergraph.vertex_index(source)
+        for target in distances_by_type[DistanceType.FOREMOST]:
+            sources += [source_index]
+            targets += [hypergraph.vertex_index(target)]
+            for distance_type in DistanceType:
+                distances[distance_type] += [encoders[distance_type](distances_by_type[distance_type][target])]
+    columns = {'source': np.array(sources, dtype=np.int32), 'target': np.array(targets, dtype=np.int32)}
+    for distance_type in DistanceType:
+        columns[distance_type.name.lower()] = np.array(distances[distance_type], dtype=np.int64)
+    return columns
+
+
+def write_shard(directory, key, columns: dict) -> int:
+    """Writes columns as shard `key` into a shard directory; the shard appears atomically. Returns the row count."""
+    directory = Path(directory)
+    np.savez(directory/f'{key}.partial.npz', **columns)
+    os.replace(directory/f'{key}.partial.npz', directory/f'{key}.npz')
+    return len(columns['source'])
+
+
+def read_shard(directory, key, hypergraph: CompactTimeVaryingHypergraph = None) -> dict:
+    """
+    Reads a shard of a completed run with all its columns. Given a hypergraph, e.g., the network of the run with
+    channels appended since, the vertex indices are translated to those of the hypergraph.
+    """
+    directory = Path(directory)
+    with np.load(directory/f'{key}.npz') as shard:
+        columns = {column: shard[column] for column in shard.files}
+    if hypergraph is not None:
+        with (directory/VERTICES).open('rb') as file:
+            vertex_ids = pickle.load(file)
+        indices = np.array([hypergraph.vertex_index(vertex) for vertex in vertex_ids], dtype=np.int32)
+        columns['source'], columns['target'] = indices[columns['source']], indices[columns['target']]
+    return columns
+
+
+class ResultShards:
+    """
+    Stores the results of a simulation run as columnar .npz shards in a directory, one shard per chunk of sources.
+
+    Workers write their shards directly via write_shard, so only shard names cross the process boundary, and the
+    results are kept as typed arrays instead of Python objects until they are merged into a data frame. A manifest
+    records the completed shards with their sources and distance types, so an interrupted run can be resumed.
+    """
+
+    def __init__(self, directory, fingerprint=None, resume=False):
+        self.directory = Path(directory)
+        self.manifest_path = self.directory/MANIFEST
+        if not resume:
+            self.remove()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        header = self._read_manifest()
+        if self.manifest_path.exists():  # drops an entry that has been cut off, so later entries start on a line of their own
+            os.truncate(self.manifest_path, self._manifest_size)
+        if header and header['fingerprint'] != fingerprint:
+            raise SystemExit(f'Cannot resume from {self.directory}: the network has changed since. Run without --resume.')
+        if not header:
+            with self.manifest_path.open('w') as file:
+                file.write(json.dumps({'fingerprint': fingerprint}) + '\n')
+        # shards written after the last manifest entry are incomplete work of an interrupted run
+        for path in self.directory.glob('*.npz'):
+            if path.name.split('.')[0] not in self.completed:
+                path.unlink()
+
+    @classmethod
+    def completed_run(cls, directory):
+        """Opens the shards of a completed run, e.g., to update them, without changing them."""
+        shards = cls.__new__(cls)
+        shards.directory = Path(directory)
+        shards.manifest_path = shards.directory/MANIFEST
+        shards._read_manifest()
+        if shards.as_of is None:
+            raise SystemExit(f'Cannot update {shards.directory}: there are no results of a completed run. Run without --update.')
+        return shards
+
+    def _read_manifest(self) -> dict:
+        self.completed: dict = {}
+        self.as_of = self.num_hyperedges = None
+        self._manifest_size = 0
+        if not self.manifest_path.exists():
+            return {}
+        with self.manifest_path.open('rb') as file:
+            lines = file.readlines()
+        entries: list = []
+        for number, line in enumerate(lines):
+            try:
+                if not line.endswith(b'\n'):  # even a complete entry, as the next entry would be appended to its line
+                    raise ValueError(f'Unterminated manifest entry {line!r}')
+                if line.strip():
+                    entries += [json.loads(line)]
+            except ValueError:
+                if number < len(lines) - 1:
+                    raise
+                break  # the last entry has been cut off by an interruption while being written, so its shard is not recorded
+            self._manifest_size += len(line)
+        if not entries:
+            return {}
+        header, *entries = entries
+        for entry in entries:
+            if 'shard' in entry:
+                self.completed[entry['shard']] = entry
+            else:
+                self.as_of, self.num_hyperedges = entry['as_of'], entry['num_hyperedges']
+        return header
+
+    def _append_to_manifest(self, entry: dict):
+        with self.manifest_path.open('a') as file:
+            file.write(json.dumps(entry) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+
+    def write(self, key, columns: dict) -> int:
+        return write_shard(self.directory, key, columns)
+
+    def record(self, key, sources, distance_types=tuple(DistanceType)):
+        """Records a written shard as completed in the manifest."""
+        entry = {'shard': key, 'sources': list(sources), 'distance_types': [distance_type.name.lower() for distance_type in distance_types]}
+        self._append_to_manifest(entry)
+        self.completed[key] = entry
+
+    def complete(self, hypergraph: CompactTimeVaryingHypergraph):
+        """
+        Records the run as completed, together with the vertex IDs and the latest epoch of the hypergraph, so the
+        results can be updated when later hyperedges are appended.
+        """
+        with (self.directory/VERTICES).open('wb') as file:
+            pickle.dump(tuple(map(hypergraph.vertex_id, range(hypergraph.num_vertices))), file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.as_of = int(hypergraph.epochs.max()) if hypergraph.num_hyperedges else -2**63
+        self.num_hyperedges = hypergraph.num_hyperedges
+        self._append_to_manifest({'as_of': self.as_of, 'num_hyperedges': self.num_hyperedges})
+
+    def has_state(self) -> bool:
+        """Tells if all shards hold the state of minimal_path_state, which updates require."""
+        for key in self.keys():
+            with np.load(self.directory/f'{key}.npz') as shard:
+                if not set(STATE_COLUMNS) <= set(shard.files):
+                    return False
+        return True
+
+    def replace(self, shards: 'ResultShards'):
+        """Replaces other shards with these, e.g., the shards of a completed run with their update."""
+        stale_directory = shards.directory.with_name(f'{shards.directory.name}.stale')
+        shards.directory.rename(stale_directory)
+        self.directory.rename(shards.directory)
+        shutil.rmtree(stale_directory)
+        self.directory, self.manifest_path = shards.directory, shards.manifest_path
+
+    def completed_sources(self, distance_types=tuple(DistanceType)) -> set:
+        names = {distance_type.name.lower() for distance_type in distance_types}
+        return {source for entry in self.completed.values() if names <= set(entry['distance_types']) for source in entry['sources']}
+
+    def next_index(self) -> int:
+        return max((int(key) for key in self.completed), default=-1) + 1
+
+    def keys(self):
+        return sorted(self.completed)
+
+    def read(self, columns=COLUMNS) -> dict:
+        arrays: dict = {column: [] for column in columns}
+        for key in self.keys():
+            # closed right away, as open shards cannot be removed on Windows
+            with np.load(self.directory/f'{key}.npz') as shard:
+                for column in columns:
+                    arrays[column].append(shard[column])
+        return {column: np.concatenate(arrays[column]) if arrays[column] else np.empty(0, dtype=np.int64) for column in columns}
+
+    def remove(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def to_frame(self, hypergraph: CompactTimeVaryingHypergraph, participants) -> pd.DataFrame:
+        """
+        Merges the shards into the result data frame: minimal distances indexed by categorical (source, target),
+        sorted, with one column per distance type.
+        """
+        columns = self.read()
+        codes = np.empty(hypergraph.num_vertices, dtype=np.int32)
+        codes[[hypergraph.vertex_index(participant) for participant in participants]] = np.arange(len(participants), dtype=np.int32)
+        source_codes, target_codes = codes[columns['source']], codes[columns['target']]
+        order = np.lexsort((target_codes, source_codes))
+
+        category = pd.api.types.CategoricalDtype(categories=participants, ordered=False)
+        index = pd.MultiIndex.from_arrays([
+            pd.Categorical.from_codes(source_codes[order], dtype=category),
+            pd.Categorical.from_codes(target_codes[order], dtype=category)], names=['source', 'target'])
+        return pd.DataFrame({
+            DistanceType.SHORTEST.name.lower(): columns['shortest'][order],
+            DistanceType.FASTEST.name.lower(): hypergraph.codec.decode_delta_array(columns['fastest'][order]),
+            DistanceType.FOREMOST.name.lower(): hypergraph.codec.decode_array(columns['foremost'][order]),
+        }, index=index)
+
+    def to_summary_frames(self, hypergraph: CompactTimeVaryingHypergraph, participants, edges: dict):
+        """
+        Merges shards of summary_columns into data frames indexed by categorical source, sorted: the summaries with
+        one column per statistic, missing if no target is reachable, and a histogram frame per distance type with one
+        column per bin, labeled by its lower edge.
+        """
+        columns = self.read(SUMMARY_COLUMNS)
+        codes = np.empty(hypergraph.num_vertices, dtype=np.int32)
+        codes[[hypergraph.vertex_index(participant) for participant in participants]] = np.arange(len(participants), dtype=np.int32)
+        source_codes = codes[columns['source']]
+        order = np.argsort(source_codes, kind='stable')
+        index = pd.CategoricalIndex(pd.Categorical.from_codes(source_codes[order], dtype=pd.api.types.CategoricalDtype(categories=participants, ordered=False)), name='source')
+        reached = columns['reachable'][order] > 0
+
+        decoders = {DistanceType.SHORTEST: lambda values: values, DistanceType.FASTEST: hypergraph.codec.decode_delta_array,
+                    DistanceType.FOREMOST: hypergraph.codec.decode_array}
+        summary = pd.DataFrame({'reachable': columns['reachable'][order]}, index=index)
+        histograms: dict = {}
+        for distance_type in DistanceType:
+            name = distance_type.name.lower()
+            for statistic in SUMMARY_STATISTICS:
+                summary[f'{name}_{statistic}'] = pd.Series(decoders[distance_type](columns[f'{name}_{statistic}'][order]), index=index).where(reached)
+            num_bins = len(edges[distance_type])
+            histograms[distance_type] = pd.DataFrame(columns[f'{name}_histogram'].reshape(-1, num_bins)[order], index=index,
+                                                     columns=pd.Index(decoders[distance_type](edges[distance_type]), name='bin'))
+        return summary, histograms
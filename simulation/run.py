@@ -1,66 +1,395 @@
 import argparse
+import time
+from datetime import timedelta
 from pathlib import Path
 import multiprocessing as mp
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 import pandas as pd
 from tqdm import tqdm
 
-from .model import CommunicationNetwork
-from .minimal_paths import single_source_dijkstra_hyperedges, single_source_dijkstra_vertices, DistanceType
+from .cache import ResultCache, cached_columns
+from .model import AVAILABLE_DATA_SETS, load_network, reduction
+from .minimal_paths import ALGORITHM_VERSION, BATCH_SIZE, single_source_dijkstra_hyperedges, single_source_dijkstra_vertices, vertex_dijkstra_matrices
+from .reachability import reachable_counts
+from .results import (ResultShards, distance_columns, distance_columns_from_matrices, histogram_edges, read_shard,
+                      summary_columns, updated_distance_columns, write_shard)
+from .sampling import ROUND_SIZE, converged, decode_estimates, degree_strata, estimate_distributions, stratified_rounds
+from .shared import SharedHypergraph, worker_hypergraph
+from .telemetry import Telemetry, describe_slowest, source_counters, source_metrics
 
-AVAILABLE_DATA_SETS = ('microsoft', )  # other data sets have not been published yet
+CHUNKS_PER_WORKER = 4
+MAX_CHUNK_SIZE = BATCH_SIZE
+CHUNK_MEMORY = 1 << 30  # bytes of traversal state per chunk; each source of a chunk holds four int64 rows per participant
+
+
+def schedule_chunks(sources, costs: dict, num_workers: int, chunks_per_worker=CHUNKS_PER_WORKER, max_chunk_size=MAX_CHUNK_SIZE):
+    """
+    Splits the sources into chunks of work, the most expensive sources first.
+
+    Each chunk covers a share of the remaining cost that shrinks as the work runs out (guided self-scheduling), so
+    expensive sources start early, cheap sources are batched, and the last chunks are small enough to avoid stragglers.
+    """
+    chunks: list = []
+    chunk: list = []
+    chunk_cost = 0
+    remaining_cost = sum(costs[source] for source in sources)
+    for source in sorted(sources, key=costs.__getitem__, reverse=True):
+        chunk += [source]
+        chunk_cost += costs[source]
+        if chunk_cost * chunks_per_worker * num_workers >= remaining_cost or len(chunk) == max_chunk_size:
+            chunks += [chunk]
+            remaining_cost -= chunk_cost
+            chunk, chunk_cost = [], 0
+    if chunk:
+        chunks += [chunk]
+    return chunks
+
+
+def chunk_size_limit(num_vertices: int) -> int:
+    """Returns the most sources per chunk, up to MAX_CHUNK_SIZE, whose traversal state fits into CHUNK_MEMORY."""
+    return max(1, min(MAX_CHUNK_SIZE, CHUNK_MEMORY // (4 * 8 * max(1, num_vertices))))
+
+
+def sliding_windows(first, last, size, step=None) -> list:
+    """
+    Returns the [start, end) windows of length `size` that cover the timings from `first` to `last`, starting at
+    `first` and every `step` (by default `size`, i.e., disjoint windows) after.
+    """
+    step = size if step is None else step
+    if step <= step - step:
+        raise ValueError('The step of sliding windows must be positive')
+    windows: list = []
+    start = first
+    while start <= last:
+        windows += [(start, start + size)]
+        start += step
+    return windows
+
+
+def _search_chunk(shared_network, sources, single_source_dijkstra, shard_directory, key, window=None, edges=None, telemetry=False, cache=None):
+    hypergraph = worker_hypergraph(shared_network)
+    if window is not None:  # a zero-copy view of the shared network
+        if cache is not None:
+            hypergraph.fingerprint()  # hashed once per worker, as the views of the windows copy its digest
+        hypergraph = hypergraph.window(*window)
+    counters = source_counters(len(sources)) if telemetry else None
+    rows = {source: row for row, source in enumerate(sources)}
+
+    def search(chunk):  # the sources of the chunk that are not cached
+        chunk_counters = None if counters is None else source_counters(len(chunk))
+        if single_source_dijkstra is single_source_dijkstra_hyperedges:
+            # all three distance types of the whole chunk in one traversal
+            chunk_columns = distance_columns(hypergraph, chunk, counters=chunk_counters)
+        else:
+            # raw int64 distances, which are only converted to datetimes and timedeltas in the result data frame
+            chunk_columns = distance_columns_from_matrices(hypergraph, chunk, vertex_dijkstra_matrices(hypergraph, chunk, chunk_counters))
+        if counters is not None:
+            for name, values in chunk_counters.items():
+                counters[name][[rows[source] for source in chunk]] = values
+        return chunk_columns
+
+    started = time.perf_counter()
+    if cache is None:
+        columns = search(sources)
+    else:
+        algorithm = 'distance_columns' if single_source_dijkstra is single_source_dijkstra_hyperedges else 'vertex_dijkstra_matrices'
+        columns = cached_columns(cache, hypergraph, sources, f'{algorithm}:{ALGORITHM_VERSION}', search)
+    metrics = source_metrics(hypergraph, sources, columns, counters, time.perf_counter() - started, key) if telemetry else None
+    if edges is not None:  # only the per-source summaries leave the worker
+        columns = summary_columns(columns, [hypergraph.vertex_index(source) for source in sources], edges)
+    num_rows = write_shard(shard_directory, key, columns)
+    return num_rows if metrics is None else metrics
+
+
+def _update_chunk(shared_network, sources, previous_directory, previous_key, after, shard_directory, key):
+    hypergraph = worker_hypergraph(shared_network)
+    if previous_key is None:  # new participants, all of whose channels are later than `after`
+        columns = distance_columns(hypergraph, sources, after=after)
+    else:
+        columns = updated_distance_columns(hypergraph, sources, read_shard(previous_directory, previous_key, hypergraph), after)
+    return write_shard(shard_directory, key, columns)
 
 
 def run_simulation():
     parser = argparse.ArgumentParser(description='Simulating information diffusion in code review communication networks')
     parser.add_argument('--select', type=str, nargs='+', choices=AVAILABLE_DATA_SETS, help='Load a subset of the available data', default=AVAILABLE_DATA_SETS)
     parser.add_argument('--num_processes', type=int, default=mp.cpu_count(), help='Number of parallel processes (default # of CPUs)')
+    parser.add_argument('--resume', action='store_true', help='Resume an interrupted simulation and skip the sources whose results have been saved already')
+    parser.add_argument('--update', action='store_true', help='Update the results of the last simulation with the channels appended to the networks since, instead of simulating from scratch')
+    parser.add_argument('--horizon', action='store_true', help='Only count the reachable participants per source (RQ1) via bit-parallel reachability (requires numpy)')
+    parser.add_argument('--sample', type=int, metavar='MAX_SOURCES', help='Estimate the reachability and distance distributions from a random sample of about MAX_SOURCES sources, stratified by degree, instead of simulating all sources')
+    parser.add_argument('--tolerance', type=float, default=0.01, help='Stop sampling once all confidence intervals are at most this fraction of the range of their metric wide (default 0.01)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the random sample (default 0)')
+    parser.add_argument('--aggregate', type=float, nargs='?', const=1.0, metavar='BIN_DAYS',
+                        help='Only save per-source summaries: the number of reachable participants, the minimal, median, and maximal distances, '
+                             'and histograms of the distances in bins of BIN_DAYS days (default 1)')
+    parser.add_argument('--windows', type=float, nargs='+', metavar=('DAYS', 'STEP_DAYS'), help='Simulate time windows of DAYS days instead of the whole networks, one every STEP_DAYS days (default DAYS)')
+    parser.add_argument('--prune', action='store_true',
+                        help='Remove the channels that are redundant for minimal paths before simulating: channels with a single participant '
+                             'and channels whose participants all belong to another channel with the same timing')
+    parser.add_argument('--cache', type=Path, nargs='?', const=Path('./data/minimal_paths/.cache'), metavar='DIRECTORY',
+                        help='Reuse the results of earlier runs on the same networks from an on-disk cache (default directory data/minimal_paths/.cache), '
+                             'and add the new results to it')
+    parser.add_argument('--cache_size', type=float, default=8, help='Maximal size of the cache in GB; the least recently used results are evicted beyond it (default 8)')
+    parser.add_argument('--telemetry', action='store_true',
+                        help='Record the wall time, heap operations, relaxed hyperedges, reachable participants, and worker memory of each source, '
+                             'and estimate the remaining time from the degrees of the pending sources')
 
     group = parser.add_mutually_exclusive_group()
-    group.add_argument('--hyperedge_dijkstra', action='store_false', help='Use single-source Dikstra algorithm via hyperedges; tend to be faster than --vertex_dijkstra (default)')
-    group.add_argument('--vertex_dijkstra', action='store_true', help='Use single-source Dikstra algorithm via vertices')
+    group.add_argument('--hyperedge_dijkstra', action='store_true', help='Use single-source Dikstra algorithm via hyperedges; tend to be faster than --vertex_dijkstra (default)')
+    group.add_argument('--vertex_dijkstra', action='store_true', help='Use single-source Dikstra algorithm via vertices, e.g., to cross-check the results')
 
     args = parser.parse_args()
+    if args.windows and (len(args.windows) > 2 or min(args.windows) <= 0):
+        parser.error('--windows takes a positive number of days and optionally a positive step in days')
+    if args.windows and args.update:
+        parser.error('--windows cannot be combined with --update')
+    if args.aggregate is not None and (args.aggregate <= 0 or args.windows or args.update or args.horizon or args.sample is not None):
+        parser.error('--aggregate takes a positive number of days and cannot be combined with --windows, --update, --horizon, or --sample')
+    if args.sample is not None and (args.sample <= 0 or args.windows or args.update or args.horizon):
+        parser.error('--sample takes a positive number of sources and cannot be combined with --windows, --update, or --horizon')
+    if args.telemetry and (args.windows or args.update or args.horizon):
+        parser.error('--telemetry cannot be combined with --windows, --update, or --horizon')
+    if args.cache is not None and (args.update or args.horizon):
+        parser.error('--cache cannot be combined with --update or --horizon')
+    if args.cache is not None and args.cache_size <= 0:
+        parser.error('--cache_size must be positive')
+    cache = ResultCache(args.cache, int(args.cache_size * (1 << 30))) if args.cache is not None else None
 
     result_dir_path = Path('./data/minimal_paths/')
     result_dir_path.mkdir(parents=True, exist_ok=True)
 
-    if args.hyperedge_dijkstra:
-        single_source_dijkstra = single_source_dijkstra_hyperedges
-    else:
+    if args.vertex_dijkstra:
         single_source_dijkstra = single_source_dijkstra_vertices
+    else:
+        single_source_dijkstra = single_source_dijkstra_hyperedges
+
+    # one pool serves all data sets; the workers attach to each shared network on their first chunk of it
+    with ProcessPoolExecutor(mp_context=mp.get_context('spawn'), max_workers=args.num_processes) as executor, ThreadPoolExecutor(max_workers=1) as loader:
+        # the next data set is loaded, parsed by the workers on a cache miss, while the current one is simulated, so
+        # that at most two networks are in memory at once
+        load = loader.submit(load_network, args.select[0], executor)
+        for position, name in enumerate(args.select):
+            digest, communication_network = load.result()
+            load = loader.submit(load_network, args.select[position + 1], executor) if position + 1 < len(args.select) else None
+            if args.prune:
+                pruned = communication_network.pruned()
+                report = reduction(communication_network, pruned)
+                print(f'Pruned {report["hyperedges"] - report["pruned_hyperedges"]} of {report["hyperedges"]} channels at {name.capitalize()} '
+                      f'(reduction ratio {report["reduction_ratio"]:.2%}, {report["incidences"] - report["pruned_incidences"]} participations)')
+                communication_network = pruned
+                digest = f'{digest}:pruned'
+
+            if args.aggregate is not None:
+                _simulate_aggregates(executor, name, digest, communication_network, single_source_dijkstra, args, result_dir_path, cache)
+                continue
+
+            if args.sample is not None:
+                _simulate_sample(executor, name, digest, communication_network, single_source_dijkstra, args, result_dir_path, cache)
+                continue
+
+            if args.windows:
+                _simulate_windows(executor, name, digest, communication_network, single_source_dijkstra, args, result_dir_path, cache)
+                continue
+
+            if args.horizon:
+                horizon = pd.Series(reachable_counts(communication_network), name='reachable').rename_axis('source').sort_index()
+                horizon.to_csv(result_dir_path/f'{name}_horizon.csv.bz2', compression='bz2')
+                continue
+
+            participants = tuple(sorted(communication_network.participants()))
+            degrees = {participant: len(communication_network.channels(participant)) for participant in participants}
+            if args.update:
+                previous = ResultShards.completed_run(result_dir_path/f'{name}.shards')
+                if not previous.has_state():
+                    raise SystemExit(f'Cannot update {previous.directory}: its results have been found via --vertex_dijkstra. Run without --update.')
+                if (communication_network.epochs <= previous.as_of).sum() != previous.num_hyperedges:
+                    raise SystemExit(f'Cannot update {previous.directory}: the network has changed other than by appending later channels. Run without --update.')
+                shards = ResultShards(result_dir_path/f'{name}.shards.update', fingerprint=digest, resume=args.resume)
+            else:
+                shards = ResultShards(result_dir_path/f'{name}.shards', fingerprint=digest, resume=args.resume)
+            completed = shards.completed_sources()
+            remaining = [participant for participant in participants if participant not in completed]
+            telemetry = Telemetry(result_dir_path/f'{name}_metrics.jsonl', degrees, remaining, args.num_processes, args.resume) if args.telemetry else None
+            max_chunk_size = chunk_size_limit(communication_network.num_vertices)
+            with SharedHypergraph(communication_network) as shared_network:
+                if args.update:
+                    # the shards of the last run are updated one by one, the sources of new participants are added
+                    futures = {executor.submit(_update_chunk, shared_network, previous.completed[key]['sources'], previous.directory, key, previous.as_of, shards.directory, key): (key, previous.completed[key]['sources'])
+                               for key in previous.keys() if key not in shards.completed}
+                    new_participants = [participant for participant in remaining if participant not in previous.completed_sources()]
+                    chunks = schedule_chunks(new_participants, degrees, args.num_processes, max_chunk_size=max_chunk_size)
+                    futures.update({executor.submit(_update_chunk, shared_network, chunk, previous.directory, None, previous.as_of, shards.directory, f'{index:06d}'): (f'{index:06d}', chunk)
+                                    for index, chunk in enumerate(chunks, start=max(previous.next_index(), shards.next_index()))})
+                else:
+                    chunks = schedule_chunks(remaining, degrees, args.num_processes, max_chunk_size=max_chunk_size)
+                    futures = {executor.submit(_search_chunk, shared_network, chunk, single_source_dijkstra, shards.directory, f'{index:06d}', telemetry=args.telemetry, cache=cache): (f'{index:06d}', chunk)
+                               for index, chunk in enumerate(chunks, start=shards.next_index())}
+                with tqdm(total=len(participants), initial=len(participants) - len(remaining), desc=f'Find all distances at {name.capitalize()}'.ljust(36)) as progress_bar:
+                    for future in as_completed(futures):
+                        if future.exception():
+                            raise future.exception()
+                        key, chunk = futures[future]
+                        shards.record(key, chunk)
+                        if telemetry is not None:
+                            telemetry.record(future.result())
+                            progress_bar.set_postfix_str(telemetry.postfix())
+                        progress_bar.update(len(chunk))
+            if telemetry is not None:
+                tqdm.write(describe_slowest(telemetry.write_summary(result_dir_path/f'{name}_telemetry.json')))
+
+            result = shards.to_frame(communication_network, participants)
+            result.info(verbose=True, memory_usage=True, show_counts=True)
+            result.to_csv(result_dir_path/f'{name}.csv.bz2', compression='bz2')
+            result.to_pickle(result_dir_path/f'{name}.pickle.bz2', compression='bz2')
+            # the shards are kept as the state of the simulation for later updates
+            shards.complete(communication_network)
+            if args.update:
+                shards.replace(previous)
+
+    if cache is not None:
+        cache.evict()
+
+
+def _simulate_windows(executor, name, digest, communication_network, single_source_dijkstra, args, result_dir_path, cache=None):
+    """
+    Simulates each time window of a network on zero-copy views of one shared network: the network is shared with the
+    workers once, and each window only costs a bisection of its time index.
+    """
+    window_dir_path = result_dir_path/f'{name}_windows'
+    window_dir_path.mkdir(parents=True, exist_ok=True)
+    size, step = (timedelta(days=days) for days in (args.windows + args.windows)[:2])
+    epochs = communication_network.epochs
+    windows = sliding_windows(communication_network.codec.decode(int(epochs.min())), communication_network.codec.decode(int(epochs.max())), size, step) if len(epochs) else []
+    max_chunk_size = chunk_size_limit(communication_network.num_vertices)  # the windows are views of the whole network
+    with SharedHypergraph(communication_network) as shared_network:
+        for window in tqdm(windows, desc=f'Simulate windows at {name.capitalize()}'.ljust(36)):
+            label = '_'.join(f'{timing:%Y%m%dT%H%M%S}' for timing in window)
+            window_network = communication_network.window(*window)
+            if args.horizon:
+                horizon = pd.Series(reachable_counts(window_network), name='reachable', dtype='int64').rename_axis('source').sort_index()
+                horizon.to_csv(window_dir_path/f'{label}_horizon.csv.bz2', compression='bz2')
+                continue
+
+            shards = ResultShards(window_dir_path/f'{label}.shards', fingerprint=f'{digest}:{label}', resume=args.resume)
+            if args.resume and (window_dir_path/f'{label}.pickle.bz2').exists() and not shards.completed:
+                shards.remove()  # the window has been written and its shards removed before the interruption
+                continue
+            participants = tuple(sorted(window_network.participants()))
+            degrees = {participant: len(window_network.channels(participant)) for participant in participants}
+            completed = shards.completed_sources()
+            remaining = [participant for participant in participants if participant not in completed]
+            chunks = schedule_chunks(remaining, degrees, args.num_processes, max_chunk_size=max_chunk_size)
+            futures = {executor.submit(_search_chunk, shared_network, chunk, single_source_dijkstra, shards.directory, f'{index:06d}', window, cache=cache): (f'{index:06d}', chunk)
+                       for index, chunk in enumerate(chunks, start=shards.next_index())}
+            for future in as_completed(futures):
+                if future.exception():
+                    raise future.exception()
+                key, chunk = futures[future]
+                shards.record(key, chunk)
+
+            result = shards.to_frame(window_network, participants)
+            result.to_csv(window_dir_path/f'{label}.csv.bz2', compression='bz2')
+            result.to_pickle(window_dir_path/f'{label}.pickle.bz2', compression='bz2')
+            # windows cannot be updated, so their shards are not kept
+            shards.remove()
+
+
+def _simulate_aggregates(executor, name, digest, communication_network, single_source_dijkstra, args, result_dir_path, cache=None):
+    """
+    Simulates all sources of a network, but saves per-source summaries instead of the distances of all pairs; the
+    workers reduce their results before writing them.
+    """
+    participants = tuple(sorted(communication_network.participants()))
+    degrees = {participant: len(communication_network.channels(participant)) for participant in participants}
+    edges = histogram_edges(communication_network, communication_network.codec.encode_delta(timedelta(days=args.aggregate)))
+    shards = ResultShards(result_dir_path/f'{name}_summary.shards', fingerprint=f'{digest}:{args.aggregate}', resume=args.resume)
+    completed = shards.completed_sources()
+    remaining = [participant for participant in participants if participant not in completed]
+    telemetry = Telemetry(result_dir_path/f'{name}_summary_metrics.jsonl', degrees, remaining, args.num_processes, args.resume) if args.telemetry else None
+    chunks = schedule_chunks(remaining, degrees, args.num_processes, max_chunk_size=chunk_size_limit(communication_network.num_vertices))
+    with SharedHypergraph(communication_network) as shared_network:
+        futures = {executor.submit(_search_chunk, shared_network, chunk, single_source_dijkstra, shards.directory, f'{index:06d}', None, edges, args.telemetry, cache): (f'{index:06d}', chunk)
+                   for index, chunk in enumerate(chunks, start=shards.next_index())}
+        with tqdm(total=len(participants), initial=len(participants) - len(remaining), desc=f'Summarize distances at {name.capitalize()}'.ljust(36)) as progress_bar:
+            for future in as_completed(futures):
+                if future.exception():
+                    raise future.exception()
+                key, chunk = futures[future]
+                shards.record(key, chunk)
+                if telemetry is not None:
+                    telemetry.record(future.result())
+                    progress_bar.set_postfix_str(telemetry.postfix())
+                progress_bar.update(len(chunk))
+    if telemetry is not None:
+        tqdm.write(describe_slowest(telemetry.write_summary(result_dir_path/f'{name}_summary_telemetry.json')))
+
+    summary, histograms = shards.to_summary_frames(communication_network, participants, edges)
+    summary.info(verbose=True, memory_usage=True, show_counts=True)
+    summary.to_csv(result_dir_path/f'{name}_summary.csv.bz2', compression='bz2')
+    summary.to_pickle(result_dir_path/f'{name}_summary.pickle.bz2', compression='bz2')
+    for distance_type, histogram in histograms.items():
+        histogram.to_csv(result_dir_path/f'{name}_{distance_type.name.lower()}_histogram.csv.bz2', compression='bz2')
+        histogram.to_pickle(result_dir_path/f'{name}_{distance_type.name.lower()}_histogram.pickle.bz2', compression='bz2')
+    shards.remove()
+
+
+def _simulate_sample(executor, name, digest, communication_network, single_source_dijkstra, args, result_dir_path, cache=None):
+    """
+    Estimates the distributions of a network from a stratified random sample of sources, drawn in rounds until the
+    confidence intervals of all estimates are tight enough or the sample is exhausted.
+    """
+    participants = tuple(sorted(communication_network.participants()))
+    degrees = {participant: len(communication_network.channels(participant)) for participant in participants}
+    strata = degree_strata(degrees)
+    stratum_sizes: dict = {}
+    for stratum in strata.values():
+        stratum_sizes[stratum] = stratum_sizes.get(stratum, 0) + 1
+    rounds = stratified_rounds(strata, args.sample, max(ROUND_SIZE, args.num_processes * CHUNKS_PER_WORKER), args.seed)
+
+    # the rounds depend on the sample size and seed, and where they stop on the tolerance
+    shards = ResultShards(result_dir_path/f'{name}_sample.shards', fingerprint=f'{digest}:{args.sample}:{args.seed}:{args.tolerance}', resume=args.resume)
+    completed = shards.completed_sources()
+    telemetry = Telemetry(result_dir_path/f'{name}_sample_metrics.jsonl', degrees, [source for sample_round in rounds for source in sample_round if source not in completed],
+                          args.num_processes, args.resume) if args.telemetry else None
+    sampled: list = []
+    estimates = None
+    max_chunk_size = chunk_size_limit(communication_network.num_vertices)
+    with SharedHypergraph(communication_network) as shared_network, tqdm(total=sum(map(len, rounds)), desc=f'Sample distances at {name.capitalize()}'.ljust(36)) as progress_bar:
+        for sample_round in rounds:
+            completed = shards.completed_sources()
+            remaining = [participant for participant in sample_round if participant not in completed]
+            chunks = schedule_chunks(remaining, degrees, args.num_processes, max_chunk_size=max_chunk_size)
+            futures = {executor.submit(_search_chunk, shared_network, chunk, single_source_dijkstra, shards.directory, f'{index:06d}', telemetry=args.telemetry, cache=cache): (f'{index:06d}', chunk)
+                       for index, chunk in enumerate(chunks, start=shards.next_index())}
+            progress_bar.update(len(sample_round) - len(remaining))
+            for future in as_completed(futures):
+                if future.exception():
+                    raise future.exception()
+                key, chunk = futures[future]
+                shards.record(key, chunk)
+                if telemetry is not None:
+                    telemetry.record(future.result())
+                    progress_bar.set_postfix_str(telemetry.postfix())
+                progress_bar.update(len(chunk))
+
+            sampled += sample_round
+            estimates = estimate_distributions(shards.read(), [communication_network.vertex_index(source) for source in sampled],
+                                               [strata[source] for source in sampled], stratum_sizes, seed=args.seed)
+            if converged(estimates, args.tolerance):
+                break
 
-    for name in args.select:
-        communication_network = CommunicationNetwork.from_json(f'./data/networks/{name}.json.bz2', name=name)
-
-        participants = tuple(sorted(communication_network.participants()))
-        category = pd.api.types.CategoricalDtype(categories=participants, ordered=False)
-        data_frames = []
-        for distance_type in DistanceType:
-            distance_type_name = distance_type.name.lower()
-            min_distances = []
-            with ProcessPoolExecutor(mp_context=mp.get_context('spawn'), max_workers=9) as executor:
-                futures = {executor.submit(
-                    single_source_dijkstra, communication_network, p, distance_type): p for p in participants}
-                for future in tqdm(as_completed(futures), total=len(futures), desc=f'Find all {distance_type_name} distances at {name.capitalize()}'.ljust(36)):
-                    source = futures[future]
-                    if future.exception():
-                        raise future.exception()
-                    for target, distance in future.result().items():
-                        min_distances += [(source, target, distance)]
-            min_distances_df = pd.DataFrame(
-                min_distances, columns=['source', 'target', 'distance'])
-            min_distances = None
-            min_distances_df.source = min_distances_df.source.astype(
-                category)
-            min_distances_df.target = min_distances_df.target.astype(
-                category)
-            data_frames += [min_distances_df.set_index(['source', 'target']).distance.rename(distance_type_name).sort_index()]
-        result = pd.concat(data_frames, axis=1).sort_index()
-        result.info(verbose=True, memory_usage=True, show_counts=True)
-        result.to_csv(result_dir_path/f'{name}.csv.bz2', compression='bz2')
-        result.to_pickle(result_dir_path/f'{name}.pickle.bz2', compression='bz2')
+    if telemetry is not None:
+        tqdm.write(describe_slowest(telemetry.write_summary(result_dir_path/f'{name}_sample_telemetry.json')))
+    if estimates is None:
+        shards.remove()
+        return
+    print(f'Estimated from {len(sampled)} of {len(participants)} sources:')
+    result = decode_estimates(estimates, communication_network.codec)
+    print(result.to_string())
+    result.to_csv(result_dir_path/f'{name}_sample.csv')
+    shards.remove()
 
 
 if __name__ == '__main__':
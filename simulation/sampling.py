@@ -0,0 +1,136 @@
+import pandas as pd
+
+from .model import TimingCodec, np
+from .minimal_paths import DistanceType
+
+ROUND_SIZE = 64
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+BOOTSTRAP_RESAMPLES = 200
+CONFIDENCE = 0.95
+MAX_GRID_SIZE = 1024  # distinct distances that the bootstrap distinguishes per distance type
+
+
+def degree_strata(degrees: dict) -> dict:
+    """Assigns each source to a stratum by the binary order of magnitude of its degree, as degrees follow a power law."""
+    return {source: int(degree).bit_length() for source, degree in degrees.items()}
+
+
+def stratified_rounds(strata: dict, sample_size: int, round_size=ROUND_SIZE, seed=0) -> list:
+    """
+    Draws a stratified random sample of `sample_size` sources in rounds of about `round_size` sources.
+
+    Every stratum contributes to the rounds in proportion to its size, and at least one source, so the sources of the
+    first k rounds are a stratified sample themselves and the sampling can stop after any round. The rounds depend
+    only on the strata and the seed.
+    """
+    rng = np.random.default_rng(seed)
+    by_stratum: dict = {}
+    for source, stratum in strata.items():
+        by_stratum.setdefault(stratum, []).append(source)
+    by_stratum = {stratum: [sources[index] for index in rng.permutation(len(sources)).tolist()]
+                  for stratum, sources in sorted(by_stratum.items())}
+    population = len(strata)
+    sample_size = min(sample_size, population)
+    taken = dict.fromkeys(by_stratum, 0)
+    rounds: list = []
+    for drawn in range(round_size, sample_size + round_size, round_size):
+        drawn = min(drawn, sample_size)
+        sample_round: list = []
+        for stratum, sources in by_stratum.items():
+            stop = min(len(sources), max(1, round(len(sources) * drawn / population)))
+            sample_round += sources[taken[stratum]:stop]
+            taken[stratum] = max(taken[stratum], stop)
+        if sample_round:
+            rounds += [sample_round]
+    return rounds
+
+
+def _weighted_quantiles(values, weights, quantiles):
+    """Returns the quantiles of sorted values for each row of a weights matrix, as a quantiles x rows matrix."""
+    cumulative = np.cumsum(weights, axis=1)
+    totals = cumulative[:, -1:]
+    return np.stack([values[np.minimum((cumulative < quantile * totals).sum(axis=1), len(values) - 1)] for quantile in quantiles])
+
+
+def _cumulative_counts(rows, values, num_rows):
+    """Counts the values of each row up to each point of a grid of the values; returns the grid and a rows x grid matrix."""
+    grid = np.unique(values)
+    if len(grid) > MAX_GRID_SIZE:
+        grid = np.unique(np.quantile(values, np.linspace(0, 1, MAX_GRID_SIZE), method='inverted_cdf'))
+    bins = grid.searchsorted(values, side='left')
+    counts = np.bincount(rows * len(grid) + bins, minlength=num_rows * len(grid)).reshape(num_rows, len(grid))
+    return grid, np.cumsum(counts, axis=1)
+
+
+def estimate_distributions(columns: dict, source_indices, source_strata, stratum_sizes: dict, quantiles=QUANTILES,
+                           resamples=BOOTSTRAP_RESAMPLES, confidence=CONFIDENCE, seed=0) -> pd.DataFrame:
+    """
+    Estimates the reachability and distance distributions of all sources from the distance columns of a stratified
+    sample of sources, with bootstrap confidence intervals.
+
+    The sources are given as vertex indices with their strata; `stratum_sizes` maps each stratum to its number of
+    sources in the whole population. Each sampled source stands for the sources of its stratum, and the bootstrap
+    resamples the sources within each stratum. Returns a data frame indexed by (metric, statistic) with the raw
+    estimate, the bounds of its confidence interval, and the spread (the range of the metric in the sample): the
+    mean and quantiles of the number of reachable targets per source, and the quantiles of each distance type over
+    all reachable (source, target) pairs, as hop counts, durations, and epochs. The distances of other sources in
+    the columns are ignored.
+    """
+    source_indices = np.asarray(source_indices, dtype=np.int64)
+    source_strata = np.asarray(source_strata)
+    sampled = np.isin(columns['source'], source_indices)
+    if not sampled.all():  # e.g., the shards of later rounds of a resumed run
+        columns = {column: values[sampled] for column, values in columns.items()}
+    positions = np.full(int(source_indices.max(initial=-1)) + 1, -1, dtype=np.int64)
+    positions[source_indices] = np.arange(len(source_indices))
+    rows = positions[columns['source']]
+
+    # the point estimate and then the bootstrap resamples as multiplicities of the sampled sources
+    rng = np.random.default_rng(seed)
+    multiplicities = np.ones((resamples + 1, len(source_indices)))
+    weights = np.empty(len(source_indices))
+    for stratum in np.unique(source_strata).tolist():
+        members = np.flatnonzero(source_strata == stratum)
+        draws = rng.integers(0, len(members), size=(resamples, len(members))) + len(members) * np.arange(resamples)[:, None]
+        multiplicities[1:, members] = np.bincount(draws.ravel(), minlength=resamples * len(members)).reshape(resamples, len(members))
+        weights[members] = stratum_sizes[stratum] / len(members)
+    weights = multiplicities * weights
+
+    statistics: dict = {}
+    reachable = np.bincount(rows, minlength=len(source_indices)).astype(np.float64)
+    spread = float(np.ptp(reachable)) if len(reachable) else 0.0
+    statistics[('reachable', 'mean')] = (weights @ reachable / weights.sum(axis=1), spread)
+    order = np.argsort(reachable, kind='stable')
+    for quantile, values in zip(quantiles, _weighted_quantiles(reachable[order], weights[:, order], quantiles)):
+        statistics[('reachable', f'q{quantile:g}')] = (values, spread)
+    if len(rows):
+        reached = weights @ reachable
+        for distance_type in DistanceType:
+            values = columns[distance_type.name.lower()]
+            grid, counts = _cumulative_counts(rows, values, len(source_indices))
+            distribution = (weights @ counts) / reached[:, None]
+            for quantile in quantiles:
+                indices = np.minimum((distribution < quantile).sum(axis=1), len(grid) - 1)
+                statistics[(distance_type.name.lower(), f'q{quantile:g}')] = (grid[indices].astype(np.float64), float(np.ptp(values)))
+
+    alpha = 1 - confidence
+    frame = pd.DataFrame([(values[0], *np.quantile(values[1:], (alpha / 2, 1 - alpha / 2)), spread) for values, spread in statistics.values()],
+                         columns=['estimate', 'lower', 'upper', 'spread'], dtype=np.float64)
+    frame.index = pd.MultiIndex.from_tuples(list(statistics), names=['metric', 'statistic'])
+    return frame
+
+
+def converged(estimates: pd.DataFrame, tolerance: float) -> bool:
+    """Tells if every confidence interval is at most `tolerance` times the spread of its metric wide."""
+    return bool(((estimates['upper'] - estimates['lower']) <= tolerance * estimates['spread'].clip(lower=1)).all())
+
+
+def decode_estimates(estimates: pd.DataFrame, codec: TimingCodec) -> pd.DataFrame:
+    """Converts the raw estimates to the output types of the distances: hop counts, timedeltas, and datetimes."""
+    decoded = estimates[['estimate', 'lower', 'upper']].astype(object)
+    metrics = estimates.index.get_level_values('metric')
+    for metric, decode in (('fastest', codec.decode_delta_array), ('foremost', codec.decode_array)):
+        selected = metrics == metric
+        for column in decoded.columns:
+            decoded.loc[selected, column] = pd.Series(decode(np.rint(estimates.loc[selected, column].to_numpy()).astype(np.int64))).tolist()
+    return decoded
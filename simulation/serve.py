@@ -0,0 +1,206 @@
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import signal
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from .model import AVAILABLE_DATA_SETS, CompactTimeVaryingHypergraph, EntityNotFound, load_network
+from .minimal_paths import single_source_dijkstra_hyperedges, DistanceType
+from .shared import SharedHypergraph, worker_hypergraph
+
+MAX_RESULTS = 128
+MAX_HEADER_LINES = 100
+
+
+def _query(shared_network, source_vertex, distance_type: DistanceType, until=None) -> dict:
+    hypergraph = worker_hypergraph(shared_network)
+    min_timing = datetime.min if hypergraph.codec.is_datetime else 0
+    return single_source_dijkstra_hyperedges(hypergraph, source_vertex, distance_type, min_timing=min_timing,
+                                             window=None if until is None else (None, until))
+
+
+def _encode(value):
+    """Encodes the distances for JSON: timings as ISO 8601 strings, durations in seconds."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+class QueryService:
+    """
+    Answers single-source and source-target queries on a memory-resident network.
+
+    The network is shared with the worker processes of `executor` once, and each query runs the hyperedge-based
+    Dijkstra in a worker, so the event loop stays responsive. Concurrent queries for the same source, distance type,
+    and time bound are coalesced into one search, and the results of the `max_results` most recently used queries
+    are kept, so source-target queries from the same source are answered without a search.
+    """
+
+    def __init__(self, hypergraph: CompactTimeVaryingHypergraph, executor, max_results=MAX_RESULTS):
+        self.hypergraph = hypergraph
+        self.executor = executor
+        self.shared_network = SharedHypergraph(hypergraph)
+        self.max_results = max_results
+        self.results: OrderedDict = OrderedDict()
+        self.pending: dict = {}  # the searches in progress by query
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        self.shared_network.close()
+
+    def parse_timing(self, value: str):
+        """Parses a timing of the network: an ISO 8601 date or datetime (in the time zone of the network), or an integer."""
+        if not self.hypergraph.codec.is_datetime:
+            return int(value)
+        timing = datetime.fromisoformat(value)
+        if timing.tzinfo is None:
+            timing = timing.replace(tzinfo=self.hypergraph.codec.epoch.tzinfo)
+        return timing
+
+    async def distances(self, source_vertex, distance_type: DistanceType, until=None) -> dict:
+        """
+        Returns the minimal distances from a source to all reachable participants via the channels before `until`
+        (all channels if None).
+        """
+        self.hypergraph.vertex_index(source_vertex)  # raises EntityNotFound before dispatching
+        query = (source_vertex, distance_type, until)
+        if query in self.results:
+            self.stats['hits'] += 1
+            self.results.move_to_end(query)
+            return self.results[query]
+        if query in self.pending:
+            self.stats['coalesced'] += 1
+        else:
+            self.stats['misses'] += 1
+            self.pending[query] = asyncio.ensure_future(self._search(query))
+        # a client that disconnects does not cancel the search of the others
+        return await asyncio.shield(self.pending[query])
+
+    async def _search(self, query) -> dict:
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self.executor, _query, self.shared_network, *query)
+        finally:
+            del self.pending[query]
+        self.results[query] = result
+        while len(self.results) > self.max_results:
+            self.results.popitem(last=False)
+        return result
+
+    def status(self) -> dict:
+        return {'network': getattr(self.hypergraph, 'name', None), 'participants': self.hypergraph.num_vertices,
+                'channels': self.hypergraph.num_hyperedges, 'results': len(self.results), 'pending': len(self.pending), **self.stats}
+
+    async def respond(self, method: str, target: str) -> tuple:
+        """
+        Answers an HTTP request; returns its status and JSON body. The endpoints are
+
+        - GET /distances?source=X&type=T[&until=Y]: the distances of type T (shortest, fastest, or foremost) from
+          participant X to all participants reachable via the channels before Y, and their number,
+        - GET /distance?source=X&target=Z&type=T[&until=Y]: the distance from X to Z, null if unreachable, and
+        - GET /status: the size of the network and the statistics of the result cache.
+        """
+        if method != 'GET':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': f'Method {method} not allowed'}
+        url = urlsplit(target)
+        parameters = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        if url.path == '/status':
+            return HTTPStatus.OK, self.status()
+        if url.path not in ('/distances', '/distance'):
+            return HTTPStatus.NOT_FOUND, {'error': f'Unknown endpoint {url.path}'}
+        try:
+            source_vertex = parameters['source']
+            distance_type = DistanceType[parameters['type'].upper()]
+            until = self.parse_timing(parameters['until']) if 'until' in parameters else None
+            target_vertex = parameters['target'] if url.path == '/distance' else None
+        except (KeyError, ValueError) as error:
+            return HTTPStatus.BAD_REQUEST, {'error': f'Invalid or missing parameter {error}'}
+        try:
+            if target_vertex is not None:
+                self.hypergraph.vertex_index(target_vertex)
+            distances = await self.distances(source_vertex, distance_type, until)
+        except EntityNotFound as error:
+            return HTTPStatus.NOT_FOUND, {'error': str(error)}
+        body = {'source': source_vertex, 'type': distance_type.name.lower(), 'until': parameters.get('until')}
+        if target_vertex is None:
+            body.update(reachable=len(distances), distances=distances)
+        else:
+            body.update(target=target_vertex, distance=distances.get(target_vertex))
+        return HTTPStatus.OK, body
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serves one HTTP/1.1 request per connection."""
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            for _ in range(MAX_HEADER_LINES):  # the headers are not needed
+                if (await reader.readline()).strip() == b'':
+                    break
+            if len(request_line) != 3:
+                status, body = HTTPStatus.BAD_REQUEST, {'error': 'Malformed request'}
+            else:
+                try:
+                    status, body = await self.respond(*request_line[:2])
+                except Exception as error:  # pylint: disable=broad-except
+                    status, body = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': repr(error)}
+            content = json.dumps(body, default=_encode).encode()
+            writer.write(f'HTTP/1.1 {status.value} {status.phrase}\r\nContent-Type: application/json\r\n'
+                         f'Content-Length: {len(content)}\r\nConnection: close\r\n\r\n'.encode('latin-1') + content)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8000, unix_socket=None):
+        """Serves HTTP on a TCP port, or on a Unix socket if given, until cancelled or terminated."""
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        except NotImplementedError:  # the event loops on Windows have no signal handlers, Ctrl+C still stops the service
+            pass
+        if unix_socket is None:
+            server = await asyncio.start_server(self.handle, host, port)
+        else:
+            server = await asyncio.start_unix_server(self.handle, unix_socket)
+        async with server:
+            for socket in server.sockets:
+                print(f'Serving {getattr(self.hypergraph, "name", None) or "the network"} on {socket.getsockname()}')
+            await server.serve_forever()
+
+
+def serve():
+    parser = argparse.ArgumentParser(description='Serving on-demand minimal path queries on a code review communication network')
+    parser.add_argument('--select', type=str, choices=AVAILABLE_DATA_SETS, default=AVAILABLE_DATA_SETS[0], help=f'The network to serve (default {AVAILABLE_DATA_SETS[0]})')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Host to listen on (default 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on (default 8000)')
+    parser.add_argument('--unix_socket', type=str, help='Listen on a Unix socket at this path instead of a port')
+    parser.add_argument('--num_processes', type=int, default=mp.cpu_count(), help='Number of worker processes for the searches (default # of CPUs)')
+    parser.add_argument('--max_results', type=int, default=MAX_RESULTS, help=f'Number of recent results kept in memory (default {MAX_RESULTS})')
+    args = parser.parse_args()
+    if args.max_results < 0:
+        parser.error('--max_results must not be negative')
+    if args.unix_socket is not None and not hasattr(asyncio, 'start_unix_server'):
+        parser.error('--unix_socket is not supported on this platform')
+
+    with ProcessPoolExecutor(mp_context=mp.get_context('spawn'), max_workers=args.num_processes) as executor:
+        _, communication_network = load_network(args.select, executor)
+        with QueryService(communication_network, executor, args.max_results) as service:
+            try:
+                asyncio.run(service.serve(args.host, args.port, args.unix_socket))
+            except (KeyboardInterrupt, asyncio.CancelledError):
+                pass
+
+
+if __name__ == '__main__':
+    serve()
@@ -0,0 +1,55 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from .model import CompactTimeVaryingHypergraph, load_hypergraph
+
+SHARED_MEMORY_DIR = Path('/dev/shm')
+
+_worker_hypergraph = None  # (directory, hypergraph) of the current worker process
+
+
+class SharedHypergraph:
+    """
+    Shares a compact hypergraph with worker processes through memory-mapped arrays.
+
+    The arrays are written once to a temporary directory, in shared memory where available, and each worker maps them
+    read-only, so all processes use the same physical pages. The IDs are stored next to the arrays, so this handle
+    is just a path and cheap to pickle with every task.
+    """
+
+    def __init__(self, hypergraph: CompactTimeVaryingHypergraph):
+        if not isinstance(hypergraph, CompactTimeVaryingHypergraph):
+            raise TypeError('Only compact hypergraphs can be shared')
+        self.directory = Path(tempfile.mkdtemp(prefix='hypergraph-', dir=SHARED_MEMORY_DIR if SHARED_MEMORY_DIR.is_dir() else None))
+        hypergraph.save(self.directory)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def attach(self) -> CompactTimeVaryingHypergraph:
+        return load_hypergraph(self.directory)
+
+
+def attach_worker(shared_hypergraph: SharedHypergraph):
+    """Initializer for worker processes; attaches to the shared hypergraph."""
+    global _worker_hypergraph  # pylint: disable=global-statement
+    _worker_hypergraph = (shared_hypergraph.directory, shared_hypergraph.attach())
+
+
+def worker_hypergraph(shared_hypergraph: SharedHypergraph = None) -> CompactTimeVaryingHypergraph:
+    """
+    Returns the hypergraph the current worker process is attached to. If another shared hypergraph is given, the
+    worker attaches to it first, so one pool can serve several networks in turn.
+    """
+    if shared_hypergraph is not None and (_worker_hypergraph is None or _worker_hypergraph[0] != shared_hypergraph.directory):
+        attach_worker(shared_hypergraph)
+    if _worker_hypergraph is None:
+        raise RuntimeError('The worker process is not attached to a shared hypergraph')
+    return _worker_hypergraph[1]
@@ -0,0 +1,190 @@
+import json
+import os
+import platform
+from datetime import timedelta
+from pathlib import Path
+
+from .model import np
+from .minimal_paths import COUNTERS, SWEEP_COUNTERS
+
+try:
+    import resource
+except ImportError:  # resource is Unix-only
+    resource = None
+
+SLOWEST = 10
+EXPONENTS = (-1.0, 4.0)  # the range of exponents of the power law
+
+
+def peak_rss() -> int:
+    """Returns the peak resident set size of this process in bytes, or None where it is not available, e.g., on Windows."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if platform.system() == 'Darwin' else peak * 1024
+
+
+def source_counters(num_sources: int) -> dict:
+    """Returns zeroed counters with one entry per source: the wall time in 'seconds', and the counts of COUNTERS."""
+    counters = {'seconds': np.zeros(num_sources)}
+    counters.update((counter, np.zeros(num_sources, dtype=np.int64)) for counter in COUNTERS)
+    return counters
+
+
+def source_metrics(hypergraph, source_vertices, columns: dict, counters: dict, seconds: float, chunk=None) -> list:
+    """
+    Returns one metrics record per source of a chunk: its wall time, heap pushes and pops, relaxed hyperedges, number
+    of reachable targets in the distance columns, the `chunk`, e.g., the key of its shard, and the process ID and peak
+    memory of the worker.
+
+    Sources that have been searched together in one sweep have no wall time of their own, so the `seconds` of the
+    whole chunk are split among them by their relaxed hyperedges, and their records are marked as not `measured`. A
+    sweep uses no heap, so their records only hold the SWEEP_COUNTERS.
+    """
+    source_indices = np.array([hypergraph.vertex_index(source_vertex) for source_vertex in source_vertices], dtype=np.int64)
+    positions = np.full(int(source_indices.max(initial=-1)) + 1, -1, dtype=np.int64)
+    positions[source_indices] = np.arange(len(source_indices))
+    reachable = np.bincount(positions[columns['source']], minlength=len(source_indices))
+    times = counters['seconds']
+    measured = bool(times.any())
+    if not measured:
+        relaxed = counters['relaxed']
+        times = seconds * (relaxed / relaxed.sum() if relaxed.sum() else np.full(len(source_indices), 1 / max(1, len(source_indices))))
+    pid, memory = os.getpid(), peak_rss()
+    counted = COUNTERS if measured else SWEEP_COUNTERS
+    return [{'source': source_vertex, 'seconds': float(times[row]), 'measured': measured, **{counter: int(counters[counter][row]) for counter in counted},
+             'reachable': int(reachable[row]), 'chunk': chunk, 'pid': pid, 'peak_rss_bytes': memory}
+            for row, source_vertex in enumerate(source_vertices)]
+
+
+class Telemetry:
+    """
+    Collects the per-source metrics of a simulation in a JSON lines file, and models the wall time of a source from
+    its degree to estimate the remaining time of the pending sources.
+
+    The model is a power law, seconds = coefficient * degree ** exponent, fitted on a log scale and corrected for the
+    bias of the back-transformation by the mean of the exponentiated residuals. It is fitted to the measured sources
+    and to the chunks of sources whose wall times have only been estimated: the wall time of such a chunk is modelled
+    as the sum of the power law over its sources, so the estimated wall times of its sources are not taken as
+    measurements.
+    """
+
+    def __init__(self, file_path, degrees: dict, pending, num_workers=1, resume=False):
+        self.file_path = Path(file_path)
+        self.degrees = degrees
+        self.num_workers = num_workers
+        self.records: list = []
+        if resume and self.file_path.exists():
+            with open(self.file_path, encoding='utf-8') as file:
+                self.records = [json.loads(line) for line in file if line.strip()]
+        else:
+            self.file_path.write_text('', encoding='utf-8')
+        self.pending = set(pending)
+
+    def record(self, records: list):
+        """Appends the metrics records of a completed chunk to the file."""
+        with open(self.file_path, 'a', encoding='utf-8') as file:
+            file.writelines(json.dumps(record, default=str) + '\n' for record in records)
+        self.records += records
+        self.pending.difference_update(record['source'] for record in records)
+
+    def model(self):
+        """Returns the (coefficient, exponent) of the power law, or None if no source has been measured yet."""
+        # the observations: each measured source and each chunk of estimated sources, with their wall time
+        degrees: list = []
+        observations: list = []
+        seconds: list = []
+        chunks: dict = {}
+        for record in self.records:
+            if record['measured']:
+                observation = len(seconds)
+                seconds += [record['seconds']]
+            else:
+                observation = chunks.get(record['chunk'])
+                if observation is None:
+                    observation = chunks[record['chunk']] = len(seconds)
+                    seconds += [0.0]
+                seconds[observation] += record['seconds']
+            degrees += [max(1, self.degrees.get(record['source'], 1))]
+            observations += [observation]
+        timed = np.array(seconds) > 0
+        if not timed.any():
+            return None
+        degrees, observations = np.array(degrees, dtype=np.float64), np.array(observations, dtype=np.int64)
+        log_seconds = np.log(np.array(seconds)[timed])
+
+        def fit(exponent):  # the intercept and the residuals of the least squares fit for an exponent
+            log_sizes = np.log(np.bincount(observations, weights=degrees ** exponent, minlength=len(seconds))[timed])
+            intercept = float((log_seconds - log_sizes).mean())
+            return intercept, log_seconds - log_sizes - intercept
+
+        exponent = 0.0
+        if len(np.unique(degrees[timed[observations]])) > 1:
+            # the squared residuals are minimized by a golden-section search over the exponents
+            lower, upper = EXPONENTS
+            ratio = (5 ** 0.5 - 1) / 2
+            while upper - lower > 1e-9:
+                left, right = upper - ratio * (upper - lower), lower + ratio * (upper - lower)
+                if (fit(left)[1] ** 2).sum() <= (fit(right)[1] ** 2).sum():
+                    upper = right
+                else:
+                    lower = left
+            exponent = (lower + upper) / 2
+        intercept, residuals = fit(exponent)
+        return float(np.exp(intercept) * np.exp(residuals).mean()), exponent
+
+    def predict(self, sources) -> float:
+        """Returns the modelled wall time of the sources in seconds, or None without a model."""
+        model = self.model()
+        if model is None:
+            return None
+        coefficient, exponent = model
+        return float(coefficient * (np.maximum(1, np.array([self.degrees.get(source, 1) for source in sources], dtype=np.float64)) ** exponent).sum())
+
+    def eta(self) -> float:
+        """Returns the estimated remaining time of the run in seconds, with the pending sources spread over the workers."""
+        remaining = self.predict(self.pending)
+        return None if remaining is None else remaining / self.num_workers
+
+    def postfix(self) -> str:
+        """Returns the estimated remaining time for a progress bar."""
+        eta = self.eta()
+        return '' if eta is None else f'ETA {timedelta(seconds=round(eta))} by degree'
+
+    def slowest(self, count=SLOWEST) -> list:
+        """Returns the records of the `count` slowest sources with their degrees."""
+        return [{**record, 'degree': self.degrees.get(record['source'])}
+                for record in sorted(self.records, key=lambda record: record['seconds'], reverse=True)[:count]]
+
+    def summary(self) -> dict:
+        """
+        Summarizes the run: the number of measured sources, their total wall time and counts, the peak memory of the
+        workers, the fitted model with its predicted wall time of all sources and the remaining time, and the slowest
+        sources.
+        """
+        model = self.model()
+        summary = {'sources': len(self.records), 'seconds': sum(record['seconds'] for record in self.records)}
+        for counter in COUNTERS:  # None if not counted, e.g., the heap operations of a sweep
+            counts = [record[counter] for record in self.records if counter in record]
+            summary[counter] = sum(counts) if counts else None
+        summary['max_peak_rss_bytes'] = max((record['peak_rss_bytes'] for record in self.records if record['peak_rss_bytes'] is not None), default=None)
+        summary['model'] = None if model is None else dict(zip(('coefficient', 'exponent'), model))
+        summary['predicted_seconds'] = self.predict(self.degrees)
+        summary['eta_seconds'] = self.eta()
+        summary['slowest'] = self.slowest()
+        return summary
+
+    def write_summary(self, file_path) -> dict:
+        """Writes the summary as JSON and returns it."""
+        summary = self.summary()
+        Path(file_path).write_text(json.dumps(summary, indent=2, default=str) + '\n', encoding='utf-8')
+        return summary
+
+
+def describe_slowest(summary: dict) -> str:
+    """Describes the slowest sources of a summary, one per line, with the wall times split from their chunk marked as estimated."""
+    lines = [f'Slowest of {summary["sources"]} sources ({summary["seconds"]:.1f} s in total):']
+    for record in summary['slowest']:
+        seconds = f'{record["seconds"]:.3f} s' if record['measured'] else f'about {record["seconds"]:.3f} s (estimated from its chunk)'
+        lines += [f'  {record["source"]}: {seconds}, degree {record["degree"]}, {record["relaxed"]} relaxed hyperedges, {record["reachable"]} reachable']
+    return '\n'.join(lines)
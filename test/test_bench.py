@@ -0,0 +1,62 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+try:
+    from simulation.bench import generate_channels, run_benchmarks, write_network
+    from simulation.model import CommunicationNetwork
+except ImportError as error:  # numpy or pandas are not installed
+    if error.name not in ("numpy", "pandas"):
+        raise
+    generate_channels = None
+
+
+@unittest.skipIf(generate_channels is None, "the simulation requirements are not installed")
+class TestBench(unittest.TestCase):
+    """
+    A test case for the benchmark suite and its synthetic networks.
+    """
+
+    def setUp(self):
+        """
+        Creating a temporary directory
+        """
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_generate_channels(self):
+        """
+        Testing if the synthetic channels are in time order, reproducible, and have distinct participants
+        """
+        channels = list(generate_channels(500, 50, seed=1))
+        self.assertEqual(len(channels), 500)
+        self.assertEqual([end for _, _, end in channels], sorted(end for _, _, end in channels))
+        self.assertTrue(all(participants and len(participants) == len(set(participants)) for _, participants, _ in channels))
+        self.assertTrue(any(len(participants) > 2 for _, participants, _ in channels))
+        self.assertEqual(channels, list(generate_channels(500, 50, seed=1)))
+
+    def test_write_network(self):
+        """
+        Testing if a written network is loaded by from_json with all its channels
+        """
+        for file_name in ("network.json", "network.json.bz2"):
+            file_path = Path(self.directory.name)/file_name
+            channels = list(generate_channels(100, 20))
+            self.assertEqual(write_network(file_path, channels), 100)
+            com_net = CommunicationNetwork.from_json(file_path)
+            self.assertEqual(com_net.timings(), {chan_id: end for chan_id, _, end in channels})
+            self.assertEqual(com_net.participants("7"), set(channels[7][1]))
+
+    def test_run_benchmarks(self):
+        """
+        Testing if every benchmark step is recorded with its time and throughput
+        """
+        file_path = Path(self.directory.name)/"network.json"
+        write_network(file_path, generate_channels(200, 30))
+        records = run_benchmarks(file_path, num_sources=4, num_hubs=1)
+        self.assertEqual([record["name"] for record in records],
+                         ["from_json"] * 2 + ["dijkstra_hyperedges"] * 3 + ["dijkstra_vertices"] * 3 + ["multi_source_minimal_distances", "distance_columns", "to_frame"])
+        self.assertTrue(all(record["seconds"] >= 0 for record in records))
+        self.assertTrue(all(record["sources"] == 4 for record in records[2:]))
@@ -0,0 +1,127 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+try:
+    from simulation.cache import ResultCache, cached_columns, use_cache
+    from simulation.model import CommunicationNetwork, CompactCommunicationNetwork, np
+    from simulation.minimal_paths import ALGORITHM_VERSION, DistanceType, single_source_dijkstra_hyperedges, single_source_dijkstra_vertices
+    from simulation.results import distance_columns
+except ImportError:  # numpy is not installed
+    np = None
+
+
+@unittest.skipIf(np is None, "the simulation requirements are not installed")
+class TestResultCache(unittest.TestCase):
+    """
+    A test case for the on-disk cache of single-source results.
+    """
+
+    def setUp(self):
+        """
+        Creating a network and a cache in a temporary directory
+        """
+        self.hedges = {f"h{index}": [f"v{index % 15}", f"v{(index * 7 + 1) % 15}"] for index in range(60)}
+        self.timings = {hedge: index % 25 for index, hedge in enumerate(self.hedges)}
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(Path(self.directory.name)/"cache")
+
+    def tearDown(self):
+        use_cache(None)
+        self.directory.cleanup()
+
+    def test_get_put(self):
+        """
+        Testing if entries are read back by their key and missing entries give the default
+        """
+        key = self.cache.key("network", "v1", "SHORTEST", "search:1")
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, {"v2": 1})
+        self.assertEqual(self.cache.get(key), {"v2": 1})
+        self.assertEqual(ResultCache(self.cache.directory).get(key), {"v2": 1})
+        self.assertNotEqual(key, self.cache.key("network", "v1", "SHORTEST", "search:2"))
+
+    def test_evict(self):
+        """
+        Testing if eviction removes the least recently used entries beyond the maximal size
+        """
+        keys = [self.cache.key(index) for index in range(4)]
+        for age, key in enumerate(keys):
+            self.cache.put(key, bytes(1000))
+            os.utime(self.cache._path(key), (age, age))
+        self.cache.get(keys[0])  # recently used now
+        self.cache.max_bytes = 2500
+        self.assertEqual(self.cache.evict(), 2)
+        self.assertEqual([self.cache.get(key) is not None for key in keys], [True, False, False, True])
+
+    def test_fingerprint(self):
+        """
+        Testing if fingerprints depend on the content and the window, but not on hyperedge IDs
+        """
+        for network_class in (CommunicationNetwork, CompactCommunicationNetwork):
+            network = network_class(self.hedges, self.timings)
+            renamed = network_class({f"x{hedge}": vertices for hedge, vertices in self.hedges.items()},
+                                    {f"x{hedge}": timing for hedge, timing in self.timings.items()})
+            self.assertEqual(network.fingerprint(), renamed.fingerprint())
+            self.assertNotEqual(network.fingerprint(), network_class({**self.hedges, "h0": ["v1", "v3"]}, self.timings).fingerprint())
+            self.assertNotEqual(network.window(3, 10).fingerprint(), network.fingerprint())
+            fingerprint = network.fingerprint()
+            network.append({"new": ["v1", "v2"]}, {"new": 100})
+            self.assertNotEqual(network.fingerprint(), fingerprint)
+
+    def test_transparent_searches(self):
+        """
+        Testing if the single-source searches consult the active cache and give the same results with it
+        """
+        for network in (CommunicationNetwork(self.hedges, self.timings), CompactCommunicationNetwork(self.hedges, self.timings)):
+            for single_source_dijkstra in (single_source_dijkstra_hyperedges, single_source_dijkstra_vertices):
+                expected = {distance_type: single_source_dijkstra(network, "v1", distance_type, min_timing=0) for distance_type in DistanceType}
+                use_cache(self.cache)
+                for _ in range(2):
+                    for distance_type in DistanceType:
+                        self.assertEqual(single_source_dijkstra(network, "v1", distance_type, min_timing=0), expected[distance_type])
+                key = self.cache.key(network.fingerprint(), "v1", "SHORTEST", f"{single_source_dijkstra.__name__}:{ALGORITHM_VERSION}", 0)
+                self.cache.put(key, {"cached": 1})
+                self.assertEqual(single_source_dijkstra(network, "v1", DistanceType.SHORTEST, min_timing=0), {"cached": 1})
+                self.assertEqual(single_source_dijkstra(network, "v1", DistanceType.SHORTEST, min_timing=0, counters={}), expected[DistanceType.SHORTEST])
+                use_cache(None)
+
+    def test_window_fingerprint(self):
+        """
+        Testing if windowed cached searches hash the hypergraph only once
+        """
+        for network in (CommunicationNetwork(self.hedges, self.timings), CompactCommunicationNetwork(self.hedges, self.timings)):
+            expected = single_source_dijkstra_hyperedges(network, "v1", DistanceType.FOREMOST, min_timing=0, window=(3, 10))
+            use_cache(self.cache)
+            with patch("simulation.model.hashlib", wraps=hashlib) as model_hashlib:
+                for _ in range(3):
+                    self.assertEqual(single_source_dijkstra_hyperedges(network, "v1", DistanceType.FOREMOST, min_timing=0, window=(3, 10)), expected)
+            self.assertEqual(model_hashlib.sha256.call_count, 1)
+            self.assertEqual(network.window(3, 10).fingerprint(), f"{network.fingerprint()}:3:10")
+            use_cache(None)
+
+    def test_cached_columns(self):
+        """
+        Testing if the cached columns equal the computed ones when only some sources are cached
+        """
+        network = CompactCommunicationNetwork(self.hedges, self.timings)
+        sources = sorted(network.participants())
+        expected = distance_columns(network, sources)
+        computed: list = []
+
+        def compute(chunk):
+            computed.extend(chunk)
+            return distance_columns(network, chunk)
+
+        cached_columns(self.cache, network, sources[3:9], "distance_columns", compute)
+        columns = cached_columns(self.cache, network, sources, "distance_columns", compute)
+        self.assertEqual(computed, sources[3:9] + sources[:3] + sources[9:])
+        self.assertEqual(set(columns), set(expected))
+        for column, values in expected.items():
+            np.testing.assert_array_equal(columns[column], values)
+            self.assertEqual(columns[column].dtype, values.dtype)
+        columns = cached_columns(self.cache, network, sources, "distance_columns", compute)
+        self.assertEqual(len(computed), len(sources))
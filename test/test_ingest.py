@@ -0,0 +1,161 @@
+import bz2
+import io
+import json
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from simulation.ingest import iter_json_object, read_channels, read_part, split_network
+from simulation.model import CommunicationNetwork, CompactCommunicationNetwork, np
+
+
+class TestIterJsonObject(unittest.TestCase):
+    """
+    A test case for streaming the items of a JSON object.
+    """
+
+    def test_small_chunks(self):
+        """
+        Testing if items are parsed correctly when values and numbers span several chunks
+        """
+        data = {"1": {"end": "2020-02-05T12:49:39", "participants": [12345, "a b", 0.5]}, "2": 678901, "3": [], "4": "}"}
+        document = json.dumps(data, indent=2)
+        for chunk_size in (1, 2, 3, 7, 1 << 20):
+            self.assertEqual(dict(iter_json_object(io.StringIO(document), chunk_size=chunk_size)), data)
+
+    def test_empty_object(self):
+        """
+        Testing if an empty object yields no items
+        """
+        self.assertEqual(list(iter_json_object(io.StringIO(" { } "), chunk_size=1)), [])
+
+    def test_malformed(self):
+        """
+        Testing if malformed documents raise a JSONDecodeError
+        """
+        for document in ('[]', '{"1": 2', '{"1" 2}', '{"1": 2,}', '{1: 2}'):
+            with self.assertRaises(json.JSONDecodeError):
+                list(iter_json_object(io.StringIO(document), chunk_size=2))
+
+
+class TestReadChannels(unittest.TestCase):
+    """
+    A test case for reading network files channel by channel.
+    """
+
+    def setUp(self):
+        """
+        Creating a temporary directory and the data of a network
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.data = {
+            "00": {"end": "2020-02-05T12:49:39", "participants": [0, 1]},
+            "01": {"end": "2020-02-05T12:49:49", "participants": [2, 3, 1]},
+            "02": {"end": "2020-02-05T12:49:19", "participants": [3]},
+        }
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, file_name, content: str) -> Path:
+        file_path = Path(self.directory.name)/file_name
+        file_path.write_bytes(bz2.compress(content.encode()) if file_name.endswith(".bz2") else content.encode())
+        return file_path
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_formats(self):
+        """
+        Testing if JSON and newline-delimited JSON, compressed or not, load the same network as from_json
+        """
+        expected = CommunicationNetwork.from_json(self.write("network.json", json.dumps(self.data)))
+        ndjson = "\n".join(json.dumps({chan_id: channel}) for chan_id, channel in self.data.items()) + "\n"
+        for file_path in (self.write("network.json.bz2", json.dumps(self.data)), self.write("network.ndjson", ndjson),
+                          self.write("network.jsonl.bz2", ndjson)):
+            com_net = CompactCommunicationNetwork.from_json(file_path, name="test")
+            self.assertEqual(com_net.name, "test")
+            self.assertEqual(com_net.timings(), expected.timings())
+            for channel in expected.channels():
+                self.assertEqual(com_net.participants(channel), expected.participants(channel))
+
+    def test_empty_participants(self):
+        """
+        Testing if a channel without participants stops the loading like in from_json
+        """
+        self.data["01"]["participants"] = []
+        with self.assertRaises(SystemExit) as context:
+            list(read_channels(self.write("network.json", json.dumps(self.data))))
+        self.assertEqual("Line: 1, Chan_id: 01. Participants column empty.", str(context.exception))
+
+    def test_wrong_datetime(self):
+        """
+        Testing if a channel with an incompatible end stops the loading like in from_json
+        """
+        self.data["02"]["end"] = "hejsan"
+        with self.assertRaises(SystemExit) as context:
+            list(read_channels(self.write("network.json", json.dumps(self.data))))
+        self.assertEqual("Line: 2, Chan_id: 02. End column not compatible datetime format.", str(context.exception))
+
+
+class TestSplitNetwork(unittest.TestCase):
+    """
+    A test case for splitting network files into parts that are read independently.
+    """
+
+    def setUp(self):
+        """
+        Creating a temporary directory and the lines of a newline-delimited network
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.lines = [
+            json.dumps({f"c{index}": {"end": f"2020-02-05T12:{index % 60:02d}:00", "participants": [index % 7, "ä" * (index % 5), index % 3]}})
+            for index in range(200)
+        ]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assertSplitEqual(self, file_path, part_size):
+        parts = split_network(file_path, part_size=part_size)
+        self.assertEqual([channel for part in parts for channel in read_part(part)], list(read_channels(file_path)))
+        return parts
+
+    def test_plain(self):
+        """
+        Testing if the parts of a plain file hold each line exactly once, for any part size
+        """
+        file_path = Path(self.directory.name)/"network.ndjson"
+        file_path.write_text("\n".join(self.lines) + "\n")
+        for part_size in (1, 17, len(self.lines[0]) + 1, 1000):
+            self.assertGreater(len(self.assertSplitEqual(file_path, part_size)), 1)
+
+    def test_multi_stream_bz2(self):
+        """
+        Testing if a bz2 file of several streams is split at the streams, which need not end with a line
+        """
+        content = ("\n".join(self.lines) + "\n").encode()
+        file_path = Path(self.directory.name)/"network.ndjson.bz2"
+        file_path.write_bytes(b"".join(bz2.compress(content[start:start + 500]) for start in range(0, len(content), 500)))
+        for part_size in (1, 300, 2000):
+            self.assertGreater(len(self.assertSplitEqual(file_path, part_size)), 1)
+        single_stream_path = Path(self.directory.name)/"single.ndjson.bz2"
+        single_stream_path.write_bytes(bz2.compress(content))
+        self.assertEqual(len(self.assertSplitEqual(single_stream_path, 1)), 1)
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_parallel_from_json(self):
+        """
+        Testing if a directory of shards loaded by an executor equals the network loaded sequentially
+        """
+        shards = Path(self.directory.name)/"network"
+        shards.mkdir()
+        for index in range(0, len(self.lines), 30):
+            (shards/f"{index:03d}.jsonl").write_text("\n".join(self.lines[index:index + 30]))
+        expected = CompactCommunicationNetwork.from_json(shards)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            com_net = CompactCommunicationNetwork.from_json(shards, name="test", executor=executor)
+        self.assertEqual(com_net.name, "test")
+        self.assertEqual(com_net._vertex_ids, expected._vertex_ids)
+        self.assertEqual(com_net._hedge_ids, expected._hedge_ids)
+        for name, array in expected.arrays().items():
+            self.assertTrue(np.array_equal(com_net.arrays()[name], array))
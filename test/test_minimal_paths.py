@@ -1,10 +1,17 @@
 import unittest
 from random import randint
 
-from simulation.model import CommunicationNetwork
+from simulation.model import CommunicationNetwork, CompactCommunicationNetwork, CompactTimeVaryingHypergraph, np
 from simulation.minimal_paths import (
     single_source_dijkstra_vertices,
     single_source_dijkstra_hyperedges,
+    single_source_foremost_sweep,
+    multi_source_foremost_sweep,
+    single_source_minimal_distances,
+    multi_source_minimal_distances,
+    multi_source_dijkstra_hyperedges,
+    vertex_dijkstra_matrices,
+    bidirectional_shortest,
     DistanceType,
 )
 
@@ -154,3 +161,259 @@ class TestMinimalPath(unittest.TestCase):
             ),
             {"v3": 57, "v8": 163},
         )
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_compact_same_output(self):
+        """
+        Testing if the hyperedge djikstra algorithm gives the same output on the compact backend.
+        """
+        compact_net = CompactCommunicationNetwork(self.fuzzed_input[0], self.fuzzed_input[1])
+        for distance_type in DistanceType:
+            self.assertEqual(
+                single_source_dijkstra_hyperedges(self.com_net, "v1", distance_type, min_timing=0),
+                single_source_dijkstra_hyperedges(compact_net, "v1", distance_type, min_timing=0),
+                f"Single-source Dijkstra {distance_type.name.lower()} differs on the compact backend",
+            )
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_compact_vertices_same_output(self):
+        """
+        Testing if the vertex djikstra algorithm gives the same output on the compact backend.
+        """
+        compact_net = CompactCommunicationNetwork(self.fuzzed_input[0], self.fuzzed_input[1])
+        for vertex in ("v1", "v2"):
+            if vertex in self.com_net.participants():
+                for distance_type in DistanceType:
+                    self.assertEqual(
+                        single_source_dijkstra_vertices(self.com_net, vertex, distance_type, min_timing=0),
+                        single_source_dijkstra_vertices(compact_net, vertex, distance_type, min_timing=0),
+                        f"Single-source Dijkstra via vertices {distance_type.name.lower()} differs on the compact backend",
+                    )
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_compact_vertices_multiparty_same_output(self):
+        """
+        Testing if the vertex djikstra algorithm on the compact backend gives the same output on multi-party
+        hyperedges with many equal timings.
+        """
+        hedges = {f"h{i}": [f"v{(i * 7 + j * j) % 13}" for j in range(1 + i % 4)] for i in range(60)}
+        timings = {f"h{i}": (i * 5) % 9 for i in range(60)}
+        com_net, compact_net = CommunicationNetwork(hedges, timings), CompactCommunicationNetwork(hedges, timings)
+        for vertex in sorted(com_net.participants()):
+            for distance_type in DistanceType:
+                self.assertEqual(
+                    single_source_dijkstra_vertices(com_net, vertex, distance_type, min_timing=0),
+                    single_source_dijkstra_vertices(compact_net, vertex, distance_type, min_timing=0),
+                    f"Single-source Dijkstra via vertices {distance_type.name.lower()} from {vertex} differs on the compact backend",
+                )
+
+    def test_foremost_sweep_same_output(self):
+        """
+        Testing if the foremost sweep gives the same output as the hyperedge djikstra algorithm.
+        """
+        for vertex in ("v1", "v2", "v5"):
+            if vertex in self.com_net.participants():
+                self.assertEqual(
+                    single_source_foremost_sweep(self.com_net, vertex),
+                    single_source_dijkstra_hyperedges(self.com_net, vertex, DistanceType.FOREMOST),
+                )
+        self.assertEqual(single_source_foremost_sweep(self.com_net_dummy, "v4"), {"v3": 57, "v8": 163})
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_multi_source_foremost_sweep_same_output(self):
+        """
+        Testing if the multi-source foremost sweep gives the same output as the hyperedge djikstra algorithm.
+        """
+        compact_net = CompactCommunicationNetwork(self.fuzzed_input[0], self.fuzzed_input[1])
+        sources = sorted(self.com_net.participants())
+        results = multi_source_foremost_sweep(compact_net, sources)
+        self.assertEqual(set(results), set(sources))
+        for source in sources:
+            self.assertEqual(
+                results[source], single_source_dijkstra_hyperedges(self.com_net, source, DistanceType.FOREMOST)
+            )
+
+    def test_minimal_distances_same_output(self):
+        """
+        Testing if the fused traversal gives the same output as the hyperedge djikstra algorithm for every distance type.
+        """
+        for com_net in (self.com_net, self.com_net_dummy):
+            for vertex in ("v1", "v4"):
+                if vertex in com_net.participants():
+                    results = single_source_minimal_distances(com_net, vertex, min_timing=0)
+                    for distance_type in DistanceType:
+                        self.assertEqual(
+                            results[distance_type],
+                            single_source_dijkstra_hyperedges(com_net, vertex, distance_type, min_timing=0),
+                        )
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_multi_source_minimal_distances_same_output(self):
+        """
+        Testing if the multi-source fused traversal gives the same output as the hyperedge djikstra algorithm.
+        """
+        compact_net = CompactCommunicationNetwork(self.fuzzed_input[0], self.fuzzed_input[1])
+        sources = sorted(self.com_net.participants())[:20]
+        results = multi_source_minimal_distances(compact_net, sources, min_timing=0)
+        for source in sources:
+            for distance_type in DistanceType:
+                self.assertEqual(
+                    results[source][distance_type],
+                    single_source_dijkstra_hyperedges(self.com_net, source, distance_type, min_timing=0),
+                )
+
+    def test_window_same_output(self):
+        """
+        Testing if both djikstra algorithms on a window give the same output as on the network of the window's channels.
+        """
+        hedges, timings = self.fuzzed_input
+        window_hedges = {hedge: vertices for hedge, vertices in hedges.items() if 50 <= timings[hedge] < 150}
+        window_net = CommunicationNetwork(window_hedges, timings)
+        com_nets = (self.com_net, CompactCommunicationNetwork(hedges, timings)) if np is not None else (self.com_net, )
+        for vertex in ("v1", "v2", "v5"):
+            in_window = vertex in window_net.participants()
+            for distance_type in DistanceType:
+                expected = single_source_dijkstra_hyperedges(window_net, vertex, distance_type, min_timing=0) if in_window else {}
+                for com_net in com_nets:
+                    self.assertEqual(single_source_dijkstra_hyperedges(com_net, vertex, distance_type, min_timing=0, window=(50, 150)), expected)
+                    self.assertEqual(single_source_dijkstra_vertices(com_net, vertex, distance_type, min_timing=0, window=(50, 150)), expected)
+            expected = single_source_minimal_distances(window_net, vertex, min_timing=0) if in_window else {distance_type: {} for distance_type in DistanceType}
+            for com_net in com_nets:
+                if vertex in com_net.participants():
+                    self.assertEqual(single_source_minimal_distances(com_net.window(50, 150), vertex, min_timing=0), expected)
+
+    def test_multi_source_dijkstra_same_output(self):
+        """
+        Testing if the batched hyperedge djikstra algorithm gives the same output as running it for each source.
+        """
+        compact_net = CompactCommunicationNetwork(self.fuzzed_input[0], self.fuzzed_input[1]) if np is not None else self.com_net
+        sources = sorted(self.com_net.participants())[:30]
+        for distance_type in DistanceType:
+            results = multi_source_dijkstra_hyperedges(compact_net, sources + sources[:3], distance_type, min_timing=0, batch_size=7)
+            self.assertEqual(list(results), sources)
+            for source in sources:
+                self.assertEqual(results[source], single_source_dijkstra_hyperedges(self.com_net, source, distance_type, min_timing=0))
+
+    def test_counters(self):
+        """
+        Testing if the searches count their heap operations and relaxed hyperedges without changing their output.
+        """
+        networks = [self.com_net] + ([CompactCommunicationNetwork(self.fuzzed_input[0], self.fuzzed_input[1])] if np is not None else [])
+        source = sorted(self.com_net.participants())[0]
+        for network in networks:
+            for single_source_dijkstra in (single_source_dijkstra_hyperedges, single_source_dijkstra_vertices):
+                for distance_type in DistanceType:
+                    counters: dict = {}
+                    result = single_source_dijkstra(network, source, distance_type, min_timing=0, counters=counters)
+                    self.assertEqual(result, single_source_dijkstra(network, source, distance_type, min_timing=0))
+                    self.assertEqual(counters["pushes"], counters["pops"])
+                    self.assertGreater(counters["pops"], 0)
+                    first = dict(counters)
+                    single_source_dijkstra(network, source, distance_type, min_timing=0, counters=counters)
+                    self.assertEqual(counters, {counter: 2 * count for counter, count in first.items()})
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_vertex_dijkstra_matrices_counters(self):
+        """
+        Testing if the vertex djikstra matrices count the searches of each source.
+        """
+        compact_net = CompactCommunicationNetwork(self.fuzzed_input[0], self.fuzzed_input[1])
+        sources = sorted(compact_net.participants())[:5]
+        counters = {"seconds": np.zeros(len(sources)), "pushes": np.zeros(len(sources), dtype=np.int64),
+                    "pops": np.zeros(len(sources), dtype=np.int64), "relaxed": np.zeros(len(sources), dtype=np.int64)}
+        vertex_dijkstra_matrices(compact_net, sources, counters)
+        for row, source in enumerate(sources):
+            expected: dict = {}
+            for distance_type in DistanceType:
+                single_source_dijkstra_vertices(compact_net, source, distance_type, counters=expected)
+            self.assertEqual({counter: int(counters[counter][row]) for counter in expected}, expected)
+        self.assertTrue((counters["seconds"] > 0).all())
+
+    def test_pruned_same_output(self):
+        """
+        Testing if pruning redundant hyperedges keeps all distances of both djikstra algorithms.
+        """
+        hedges, timings = dict(self.fuzzed_input[0]), dict(self.fuzzed_input[1])
+        for index, (hedge, vertices) in enumerate(list(hedges.items())[:50]):
+            hedges[f"{hedge}_subset"], timings[f"{hedge}_subset"] = vertices[:1 + index % 2], timings[hedge]
+            hedges[f"{hedge}_superset"], timings[f"{hedge}_superset"] = vertices + [f"v{index}"], timings[hedge] + index % 3
+        networks = [CommunicationNetwork(hedges, timings)] + ([CompactCommunicationNetwork(hedges, timings)] if np is not None else [])
+        for network in networks:
+            pruned = network.pruned()
+            self.assertLess(len(pruned.hyperedges()), len(network.hyperedges()))
+            self.assertEqual(pruned.vertices(), network.vertices())
+            for source in sorted(network.vertices()):
+                for distance_type in DistanceType:
+                    for single_source_dijkstra in (single_source_dijkstra_hyperedges, single_source_dijkstra_vertices):
+                        self.assertEqual(single_source_dijkstra(pruned, source, distance_type, min_timing=0),
+                                         single_source_dijkstra(network, source, distance_type, min_timing=0))
+
+    def test_target_same_output(self):
+        """
+        Testing if both djikstra algorithms stopping at a target find its distance of the full search.
+        """
+        networks = [self.com_net] + ([CompactCommunicationNetwork(self.fuzzed_input[0], self.fuzzed_input[1])] if np is not None else [])
+        source = sorted(self.com_net.participants())[0]
+        for network in networks:
+            for distance_type in DistanceType:
+                expected = single_source_dijkstra_hyperedges(self.com_net, source, distance_type, min_timing=0)
+                for target in sorted(self.com_net.participants()):
+                    for single_source_dijkstra in (single_source_dijkstra_hyperedges, single_source_dijkstra_vertices):
+                        self.assertEqual(
+                            single_source_dijkstra(network, source, distance_type, min_timing=0, target_vertex=target),
+                            {target: expected[target]} if target in expected else {},
+                        )
+
+    def test_max_distance_same_output(self):
+        """
+        Testing if both djikstra algorithms within a bound find the distances of the full search within it.
+        """
+        networks = [self.com_net] + ([CompactCommunicationNetwork(self.fuzzed_input[0], self.fuzzed_input[1])] if np is not None else [])
+        source = sorted(self.com_net.participants())[0]
+        for network in networks:
+            for distance_type in DistanceType:
+                expected = single_source_dijkstra_hyperedges(self.com_net, source, distance_type, min_timing=0)
+                for max_distance in sorted(set(expected.values()))[:3]:
+                    for single_source_dijkstra in (single_source_dijkstra_hyperedges, single_source_dijkstra_vertices):
+                        self.assertEqual(
+                            single_source_dijkstra(network, source, distance_type, min_timing=0, max_distance=max_distance),
+                            {target: distance for target, distance in expected.items() if distance <= max_distance},
+                        )
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_bidirectional_shortest_same_output(self):
+        """
+        Testing if the bidirectional search finds the shortest distances on multi-party hyperedges with equal timings.
+        """
+        hedges = {f"h{i}": [f"v{(i * 7 + j * j) % 13}" for j in range(1 + i % 4)] for i in range(60)}
+        timings = {f"h{i}": (i * 5) % 9 for i in range(60)}
+        com_net = CommunicationNetwork(hedges, timings)
+        compact_net = CompactCommunicationNetwork(hedges, timings)
+        for source in sorted(com_net.participants()):
+            expected = single_source_dijkstra_hyperedges(com_net, source, DistanceType.SHORTEST, min_timing=0)
+            for target in sorted(com_net.participants()):
+                self.assertEqual(bidirectional_shortest(compact_net, source, target), {target: expected[target]} if target in expected else {})
+        compact_dummy = CompactTimeVaryingHypergraph.from_hypergraph(self.com_net_dummy)
+        self.assertEqual(bidirectional_shortest(compact_dummy, "v4", "v8", window=(0, 100)), {})
+        self.assertEqual(bidirectional_shortest(compact_dummy, "v4", "v8"), {"v8": 2})
+        with self.assertRaises(TypeError):
+            bidirectional_shortest(self.com_net_dummy, "v4", "v8")
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_pruned_isolated_participant(self):
+        """
+        Testing if participants whose channels have all been pruned reach no one on the compact backend.
+        """
+        hedges, timings = {"h0": ["v0", "v1"], "h1": ["v2"], "h2": ["v1", "v3"], "h3": ["v4"]}, {"h0": 1, "h1": 2, "h2": 3, "h3": 0}
+        com_net = CommunicationNetwork(hedges, timings).pruned()
+        compact_net = CompactCommunicationNetwork(hedges, timings).pruned()
+        self.assertEqual(compact_net.participants(), {"v0", "v1", "v2", "v3", "v4"})
+        for source in ("v2", "v4"):
+            self.assertEqual(single_source_foremost_sweep(compact_net, source), {})
+            self.assertEqual(single_source_minimal_distances(compact_net, source, min_timing=0), {distance_type: {} for distance_type in DistanceType})
+        results = multi_source_minimal_distances(compact_net, ["v0", "v2", "v4"], min_timing=0)
+        foremost = multi_source_foremost_sweep(compact_net, ["v0", "v2", "v4"])
+        for source in ("v0", "v2", "v4"):
+            self.assertEqual(foremost[source], single_source_dijkstra_hyperedges(com_net, source, DistanceType.FOREMOST))
+            for distance_type in DistanceType:
+                self.assertEqual(results[source][distance_type], single_source_dijkstra_hyperedges(com_net, source, distance_type, min_timing=0))
@@ -1,7 +1,12 @@
 import unittest
 from unittest.mock import patch
-from simulation.model import CommunicationNetwork, TimeVaryingHypergraph
+from datetime import datetime
+from simulation.model import CommunicationNetwork, TimeVaryingHypergraph, CompactTimeVaryingHypergraph, CompactCommunicationNetwork, EntityNotFound, CACHE_FORMAT_VERSION, file_digest, load_hypergraph, load_network, np, reduction
+import bz2
+import json
 import os
+import tempfile
+from pathlib import Path
 
 
 class TestTimeVaryingHypergraph(unittest.TestCase):
@@ -76,6 +81,99 @@ class TestTimeVaryingHypergraph(unittest.TestCase):
             self.graph.hyperedges("x1")
         self.assertTrue("Unknown vertex x1" in str(context.exception))
 
+    def test_hyperedges_after(self):
+        """
+        Testing if the hyperedges of a vertex later than a timing are found in timing order
+        """
+        graph = TimeVaryingHypergraph(
+            {"h1": ["v1", "v2"], "h2": ["v1", "v3"], "h3": ["v1", "v4"], "h4": ["v1"]},
+            {"h1": 3, "h2": 1, "h3": 2, "h4": 2},
+        )
+        self.assertEqual(graph.hyperedges_after("v1", 0), ["h2", "h3", "h4", "h1"])
+        self.assertEqual(graph.hyperedges_after("v1", 1), ["h3", "h4", "h1"])
+        self.assertEqual(graph.hyperedges_after("v1", 1, until=2), ["h3", "h4"])
+        self.assertEqual(graph.hyperedges_after("v1", 3), [])
+
+    def test_append(self):
+        """
+        Testing if appending later hyperedges gives the same hypergraph as creating it with them
+        """
+        hedges = {"h1": ["v1", "v2"], "h2": ["v1", "v3"], "h3": ["v3", "v4"], "h4": ["v5", "v1"]}
+        timings = {"h1": 3, "h2": 1, "h3": 4, "h4": 5}
+        graph = TimeVaryingHypergraph({"h1": hedges["h1"], "h2": hedges["h2"]}, timings)
+        graph.append({"h4": hedges["h4"], "h3": hedges["h3"]}, timings)
+        expected = TimeVaryingHypergraph(hedges, timings)
+        self.assertEqual(graph.timings(), expected.timings())
+        self.assertEqual(graph.hyperedges_by_timing(), expected.hyperedges_by_timing())
+        for vertex in expected.vertices():
+            self.assertEqual(graph.hyperedges_after(vertex, 0), expected.hyperedges_after(vertex, 0))
+
+        with self.assertRaises(ValueError):
+            graph.append({"h5": ["v1"]}, {"h5": 5})
+        with self.assertRaises(ValueError):
+            graph.append({"h1": ["v1"]}, {"h1": 6})
+        with self.assertRaises(EntityNotFound):
+            graph.append({"h5": ["v1"]}, {})
+
+    def test_append_keeps_views(self):
+        """
+        Testing if the views of windows taken before appending keep their hyperedges and fingerprints
+        """
+        graph = TimeVaryingHypergraph({"h1": ["v1", "v2"], "h2": ["v2", "v3"], "h3": ["v3", "v4"]}, {"h1": 1, "h2": 2, "h3": 3})
+        window = graph.window(2, None)
+        fingerprint = window.fingerprint()
+        graph.append({"h4": ["v3", "v5"]}, {"h4": 4})
+        self.assertEqual(window.timings(), {"h2": 2, "h3": 3})
+        self.assertEqual(window.hyperedges("v3"), {"h2", "h3"})
+        self.assertEqual(window.hyperedges_after("v3", 0), ["h2", "h3"])
+        with self.assertRaises(EntityNotFound):
+            window.hyperedges("v5")
+        self.assertEqual(window.fingerprint(), fingerprint)
+        self.assertEqual(graph.window(2, None).hyperedges_after("v3", 0), ["h2", "h3", "h4"])
+        self.assertNotEqual(graph.window(2, None).fingerprint(), fingerprint)
+
+    def test_window(self):
+        """
+        Testing if a window answers like the hypergraph of the hyperedges in the window, and nested windows intersect
+        """
+        window = self.graph.window(2, None).window(None, 3)
+        expected = TimeVaryingHypergraph({"h2": ["v2", "v3"]}, {"h2": 2})
+        self.assertEqual(window.timings(), expected.timings())
+        self.assertEqual(window.vertices(), expected.vertices())
+        self.assertEqual(window.hyperedges(), expected.hyperedges())
+        self.assertEqual(window.hyperedges_by_timing(), expected.hyperedges_by_timing())
+        self.assertEqual(window.hyperedges("v3"), {"h2"})
+        self.assertEqual(window.hyperedges("v1"), set())
+        self.assertEqual(window.hyperedges_after("v3", 0), ["h2"])
+        with self.assertRaises(EntityNotFound):
+            window.timings("h3")
+        with self.assertRaises(ValueError):
+            window.append({"h4": ["v1"]}, {"h4": 4})
+        self.assertEqual(self.graph.timings(), {"h1": 1, "h2": 2, "h3": 3})
+
+    def test_pruned(self):
+        """
+        Testing if pruning removes exactly the single-vertex and the dominated hyperedges, and keeps all vertices
+        """
+        hedges = {"a": ["v1", "v2", "v3"], "b": ["v1", "v2"], "c": ["v3", "v2", "v1"], "d": ["v2", "v4"], "e": ["v1", "v2"],
+                  "f": ["v5"], "g": ["v1", "v4"]}
+        timings = {"a": 1, "b": 1, "c": 1, "d": 1, "e": 2, "f": 2, "g": 3}
+        for graph_class in (CommunicationNetwork, CompactCommunicationNetwork) if np is not None else (CommunicationNetwork, ):
+            graph = graph_class(hedges, timings, name="net")
+            pruned = graph.pruned()
+            self.assertEqual(pruned.timings(), {"a": 1, "d": 1, "e": 2, "g": 3})
+            self.assertEqual(pruned.vertices(), graph.vertices())
+            self.assertEqual(pruned.hyperedges("v5"), set())
+            self.assertEqual(pruned.hyperedges_after("v2", 1), ["e"])
+            self.assertEqual(pruned.name, "net")
+            self.assertEqual(graph.timings(), timings)
+            report = reduction(graph, pruned)
+            self.assertAlmostEqual(report.pop("reduction_ratio"), 3 / 7)
+            self.assertEqual(report, {"hyperedges": 7, "pruned_hyperedges": 4, "incidences": 15, "pruned_incidences": 9})
+            window = graph.window(2, None).pruned()
+            self.assertEqual(window.timings(), {"e": 2, "g": 3})
+            self.assertEqual(window.vertices(), {"v1", "v2", "v4", "v5"})
+
 
 class TestCommunicationNetwork(unittest.TestCase):
     """
@@ -270,3 +368,209 @@ class TestCommunicationNetworkIntegration(unittest.TestCase):
             self.assertSetEqual(com_net.participants("00"), {0, 1})
             self.assertSetEqual(com_net.participants("04"), {7, 8, 9})
             self.assertSetEqual(com_net.participants("08"), {3})
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestCompactTimeVaryingHypergraph(unittest.TestCase):
+    """
+    A test case for the CompactTimeVaryingHypergraph class.
+    """
+
+    def setUp(self):
+        """
+        Creating a compact hypergraph and its dict-based counterpart from the same data
+        """
+        hedges = {"h1": ["v1", "v2"], "h2": ["v2", "v3"], "h3": ["v3", "v4", "v2"]}
+        timings = {"h1": datetime(2020, 2, 5, 12), "h2": datetime(2020, 2, 5, 13), "h3": datetime(2020, 2, 5, 14, 0, 1)}
+        self.graph = TimeVaryingHypergraph(hedges, timings)
+        self.compact_graph = CompactTimeVaryingHypergraph(hedges, timings)
+
+    def test_facade_equivalence(self):
+        """
+        Testing if the compact backend answers the public API like the dict-based one
+        """
+        self.assertEqual(self.compact_graph.timings(), self.graph.timings())
+        self.assertEqual(self.compact_graph.vertices(), self.graph.vertices())
+        self.assertEqual(self.compact_graph.hyperedges(), self.graph.hyperedges())
+        for hedge in self.graph.hyperedges():
+            self.assertEqual(self.compact_graph.timings(hedge), self.graph.timings(hedge))
+            self.assertEqual(self.compact_graph.vertices(hedge), self.graph.vertices(hedge))
+        for vertex in self.graph.vertices():
+            self.assertEqual(self.compact_graph.hyperedges(vertex), self.graph.hyperedges(vertex))
+
+    def test_csr_incidence(self):
+        """
+        Testing if the CSR arrays are consistent in both directions and the neighbor views do not copy
+        """
+        v2 = self.compact_graph.vertex_index("v2")
+        h3 = self.compact_graph.hedge_index("h3")
+        self.assertEqual(len(self.compact_graph.vertex_incidence(v2)), 3)
+        self.assertIn(v2, self.compact_graph.hedge_members(h3).tolist())
+        self.assertIs(self.compact_graph.hedge_members(h3).base, self.compact_graph.hedge_vertices)
+        self.assertEqual(self.compact_graph.epochs.dtype, np.int64)
+
+    def test_hyperedges_after(self):
+        """
+        Testing if the compact backend finds later hyperedges like the dict-based one
+        """
+        for vertex in self.graph.vertices():
+            for hedge in self.graph.hyperedges():
+                timing = self.graph.timings(hedge)
+                self.assertEqual(
+                    self.compact_graph.hyperedges_after(vertex, timing), self.graph.hyperedges_after(vertex, timing)
+                )
+
+    def test_incorrect_parameter(self):
+        """
+        Testing if the compact backend raises the same errors for unknown entities
+        """
+        with self.assertRaises(EntityNotFound):
+            self.compact_graph.timings("x1")
+        with self.assertRaises(EntityNotFound):
+            self.compact_graph.vertices("x1")
+        with self.assertRaises(EntityNotFound):
+            self.compact_graph.hyperedges("x1")
+
+    def test_save_and_load(self):
+        """
+        Testing if a saved hypergraph is loaded back as memory-mapped arrays with the same content
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            self.compact_graph.save(directory)
+            loaded = load_hypergraph(directory)
+            self.assertIsInstance(loaded, CompactTimeVaryingHypergraph)
+            self.assertIsInstance(loaded.epochs, np.memmap)
+            self.assertEqual(loaded.timings(), self.graph.timings())
+            for name, array in self.compact_graph.arrays().items():
+                self.assertTrue(np.array_equal(loaded.arrays()[name], array))
+            del loaded
+
+    def test_append(self):
+        """
+        Testing if appending later hyperedges to the compact backend keeps the indices and matches the dict-based one
+        """
+        v2 = self.compact_graph.vertex_index("v2")
+        hedges = {"h4": ["v0", "v2"], "h5": ["v5", "v3"]}
+        timings = {"h4": datetime(2020, 2, 6), "h5": datetime(2020, 2, 7)}
+        self.compact_graph.append(hedges, timings)
+        self.graph.append(hedges, timings)
+        self.assertEqual(self.compact_graph.vertex_index("v2"), v2)
+        self.assertEqual(self.compact_graph.vertex_index("v0"), 4)
+        self.test_facade_equivalence()
+        self.test_hyperedges_after()
+        with self.assertRaises(ValueError):
+            self.compact_graph.append({"h6": ["v1"]}, {"h6": datetime(2020, 2, 6)})
+        with self.assertRaises(TypeError):
+            self.compact_graph.append({"h6": ["v1"]}, {"h6": 7})
+
+    def test_append_keeps_views(self):
+        """
+        Testing if the views of windows of the compact backend taken before appending keep their hyperedges and fingerprints
+        """
+        window = self.compact_graph.window(datetime(2020, 2, 5, 13))
+        timings, fingerprint = window.timings(), window.fingerprint()
+        self.compact_graph.append({"h4": ["v0", "v2"]}, {"h4": datetime(2020, 2, 6)})
+        self.assertEqual(window.timings(), timings)
+        self.assertEqual(window.hyperedges("v2"), self.graph.window(datetime(2020, 2, 5, 13)).hyperedges("v2"))
+        with self.assertRaises(EntityNotFound):
+            window.hyperedges("v0")
+        with self.assertRaises(EntityNotFound):
+            window.timings("h4")
+        self.assertEqual(window.fingerprint(), fingerprint)
+        self.assertNotEqual(self.compact_graph.window(datetime(2020, 2, 5, 13)).fingerprint(), fingerprint)
+
+    def test_window(self):
+        """
+        Testing if a window of the compact backend shares the arrays and answers like a window of the dict-based one
+        """
+        for start, end in ((None, None), (datetime(2020, 2, 5, 13), None), (None, datetime(2020, 2, 5, 13)),
+                           (datetime(2020, 2, 5, 12, 30), datetime(2020, 2, 5, 14)), (datetime(2020, 2, 6), None)):
+            window, compact_window = self.graph.window(start, end), self.compact_graph.window(start, end)
+            self.assertIs(compact_window.hedge_vertices, self.compact_graph.hedge_vertices)
+            self.assertEqual(compact_window.timings(), window.timings())
+            self.assertEqual(compact_window.vertices(), window.vertices())
+            self.assertEqual(compact_window.hyperedges(), window.hyperedges())
+            for vertex in self.graph.vertices():
+                self.assertEqual(compact_window.hyperedges(vertex), window.hyperedges(vertex))
+                for hedge in self.graph.hyperedges():
+                    timing = self.graph.timings(hedge)
+                    self.assertEqual(compact_window.hyperedges_after(vertex, timing), window.hyperedges_after(vertex, timing))
+        with self.assertRaises(EntityNotFound):
+            self.compact_graph.window(datetime(2020, 2, 5, 13)).timings("h1")
+        with self.assertRaises(ValueError):
+            self.compact_graph.window().append({"h4": ["v1"]}, {"h4": datetime(2020, 2, 6)})
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestCompactCommunicationNetworkCache(unittest.TestCase):
+    """
+    A test case for loading communication networks via the binary cache.
+    """
+
+    def setUp(self):
+        """
+        Writing a network file into a temporary directory
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.directory.name)/"network.json"
+        self.data = {
+            "00": {"end": "2020-02-05T12:49:39", "participants": ["a", "b"]},
+            "01": {"end": "2020-02-05T12:49:49", "participants": ["b", "c"]},
+            "02": {"end": "2020-02-05T12:49:19", "participants": ["c", "d", "a"]},
+        }
+        self.file_path.write_text(json.dumps(self.data))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_from_cache(self):
+        """
+        Testing if the cached network equals the parsed one and a cache hit does not parse the file again
+        """
+        expected = CommunicationNetwork.from_json(self.file_path)
+        com_net = CompactCommunicationNetwork.from_cache(self.file_path, name="test")
+        self.assertEqual(com_net.name, "test")
+        self.assertEqual(com_net.timings(), expected.timings())
+        with patch.object(CompactCommunicationNetwork, "from_json") as from_json:
+            cached = CompactCommunicationNetwork.from_cache(self.file_path, name="cached")
+            from_json.assert_not_called()
+        self.assertEqual(cached.name, "cached")
+        self.assertEqual(cached.timings(), expected.timings())
+        for participant in expected.participants():
+            self.assertEqual(cached.channels(participant), expected.channels(participant))
+
+    def test_changed_file(self):
+        """
+        Testing if the cache is rebuilt and the stale cache removed when the network file changes
+        """
+        CompactCommunicationNetwork.from_cache(self.file_path)
+        self.data["03"] = {"end": "2020-02-05T12:50:00", "participants": ["d", "e"]}
+        self.file_path.write_text(json.dumps(self.data))
+        com_net = CompactCommunicationNetwork.from_cache(self.file_path)
+        self.assertEqual(com_net.participants("03"), {"d", "e"})
+        self.assertEqual(len(list((Path(self.directory.name)/".cache").iterdir())), 1)
+
+    def test_changed_format(self):
+        """
+        Testing if the cache is rebuilt and the stale cache removed when the format of the cache changes
+        """
+        with patch("simulation.model.CACHE_FORMAT_VERSION", 0):
+            CompactCommunicationNetwork.from_cache(self.file_path)
+        with patch.object(CompactCommunicationNetwork, "from_json", wraps=CompactCommunicationNetwork.from_json) as from_json:
+            com_net = CompactCommunicationNetwork.from_cache(self.file_path)
+            from_json.assert_called_once()
+        self.assertEqual(com_net.participants("02"), {"a", "c", "d"})
+        self.assertEqual([path.name.split(".")[2] for path in (Path(self.directory.name)/".cache").iterdir()], [f"v{CACHE_FORMAT_VERSION}"])
+
+    def test_load_network(self):
+        """
+        Testing if a data set is loaded by its name from a compressed network file or a directory of network files
+        """
+        file_path = Path(self.directory.name)/"single.json.bz2"
+        file_path.write_bytes(bz2.compress(self.file_path.read_bytes()))
+        (Path(self.directory.name)/"sharded").mkdir()
+        self.file_path.rename(Path(self.directory.name)/"sharded"/"network.json")
+        for name in ("single", "sharded"):
+            digest, com_net = load_network(name, network_dir=self.directory.name)
+            self.assertEqual(digest, file_digest(Path(self.directory.name)/("single.json.bz2" if name == "single" else "sharded")))
+            self.assertEqual(com_net.name, name)
+            self.assertEqual(com_net.participants("02"), {"a", "c", "d"})
@@ -0,0 +1,52 @@
+import unittest
+
+from simulation.model import CommunicationNetwork, CompactCommunicationNetwork, np
+from simulation.minimal_paths import single_source_dijkstra_hyperedges, DistanceType
+from simulation.reachability import reachable_counts, reachable_targets
+from test.test_minimal_paths import generate_random_network
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestReachability(unittest.TestCase):
+    """
+    A test case for the bit-parallel reachability.
+    """
+
+    def setUp(self):
+        """
+        Creating a communication network with the random funcion and one with simultaneous channels.
+        """
+        self.fuzzed_input = generate_random_network()
+        self.com_net = CommunicationNetwork(self.fuzzed_input[0], self.fuzzed_input[1])
+        self.com_net_simultaneous = CompactCommunicationNetwork(
+            {"h0": ["v0", "v1"], "h1": ["v1", "v2"], "h2": ["v2", "v3"], "h3": ["v3", "v4", "v0"]},
+            {"h0": 1, "h1": 1, "h2": 2, "h3": 3},
+        )
+
+    def test_same_targets_as_dijkstra(self):
+        """
+        Testing if the reachable targets are the vertices found by the hyperedge djikstra algorithm.
+        """
+        targets = reachable_targets(self.com_net, batch_size=64)
+        for source in self.com_net.participants():
+            self.assertEqual(
+                targets[source],
+                set(single_source_dijkstra_hyperedges(self.com_net, source, DistanceType.SHORTEST, min_timing=0)),
+            )
+
+    def test_counts(self):
+        """
+        Testing if the reachable counts match the reachable targets.
+        """
+        counts = reachable_counts(self.com_net)
+        targets = reachable_targets(self.com_net)
+        self.assertEqual(counts, {source: len(reached) for source, reached in targets.items()})
+
+    def test_simultaneous_channels(self):
+        """
+        Testing if channels at the same time do not pass information to each other.
+        """
+        self.assertEqual(
+            reachable_targets(self.com_net_simultaneous, ["v0", "v2"]),
+            {"v0": {"v1", "v3", "v4"}, "v2": {"v1", "v3", "v4", "v0"}},
+        )
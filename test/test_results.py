@@ -0,0 +1,239 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+try:
+    import numpy as np
+    import pandas as pd
+    from simulation.results import (
+        ResultShards,
+        distance_columns,
+        distance_columns_from_dicts,
+        distance_columns_from_matrices,
+        histogram_edges,
+        read_shard,
+        summary_columns,
+        updated_distance_columns,
+    )
+except ImportError:  # pandas or numpy are not installed
+    pd = None
+
+from simulation.model import CompactCommunicationNetwork
+from simulation.minimal_paths import single_source_dijkstra_hyperedges, vertex_dijkstra_matrices, DistanceType
+from test.test_minimal_paths import generate_random_network
+
+
+@unittest.skipIf(pd is None, "the simulation requirements are not installed")
+class TestResultShards(unittest.TestCase):
+    """
+    A test case for the columnar result shards.
+    """
+
+    def setUp(self):
+        """
+        Creating a compact communication network with datetime timings and a shard directory.
+        """
+        hedges, timings = generate_random_network()
+        timings = {hedge: datetime(2020, 1, 1) + timedelta(minutes=timing) for hedge, timing in timings.items()}
+        self.hedges, self.timings = hedges, timings
+        self.com_net = CompactCommunicationNetwork(hedges, timings)
+        self.participants = tuple(sorted(self.com_net.participants()))
+        self.directory = tempfile.TemporaryDirectory()
+        self.shards = ResultShards(self.directory.name)
+
+    def tearDown(self):
+        """
+        Removing the shard directory.
+        """
+        self.directory.cleanup()
+
+    def expected_frame(self):
+        """
+        Building the result data frame from Python tuples, as the simulation used to do.
+        """
+        category = pd.api.types.CategoricalDtype(categories=self.participants, ordered=False)
+        data_frames = []
+        for distance_type in DistanceType:
+            min_distances = [
+                (source, target, distance)
+                for source in self.participants
+                for target, distance in single_source_dijkstra_hyperedges(self.com_net, source, distance_type).items()
+            ]
+            df = pd.DataFrame(min_distances, columns=["source", "target", "distance"])
+            df.source = df.source.astype(category)
+            df.target = df.target.astype(category)
+            data_frames += [df.set_index(["source", "target"]).distance.rename(distance_type.name.lower()).sort_index()]
+        return pd.concat(data_frames, axis=1).sort_index()
+
+    def test_same_frame(self):
+        """
+        Testing if merging the shards gives the same data frame as the Python tuples.
+        """
+        for index in range(0, len(self.participants), 7):
+            chunk = self.participants[index:index + 7]
+            self.shards.write(f"{index:06d}", distance_columns(self.com_net, chunk))
+            self.shards.record(f"{index:06d}", chunk)
+        result = self.shards.to_frame(self.com_net, self.participants)
+        pd.testing.assert_frame_equal(result, self.expected_frame())
+        self.assertEqual(result.to_csv(), self.expected_frame().to_csv())
+
+    def test_time_zone(self):
+        """
+        Testing if the foremost distances keep the time zone of the timings in the data frame.
+        """
+        time_zone = timezone(timedelta(hours=2))
+        self.com_net = CompactCommunicationNetwork(self.hedges, {hedge: timing.replace(tzinfo=time_zone) for hedge, timing in self.timings.items()})
+        self.shards.write("000000", distance_columns(self.com_net, self.participants))
+        self.shards.record("000000", self.participants)
+        result = self.shards.to_frame(self.com_net, self.participants)
+        self.assertEqual(result.foremost.dt.tz, time_zone)
+        pd.testing.assert_frame_equal(result, self.expected_frame())
+        self.assertEqual(result.to_csv(), self.expected_frame().to_csv())
+
+    def test_columns_from_dicts(self):
+        """
+        Testing if columns from per-source dictionaries equal the columns from the distance matrices.
+        """
+        sources = self.participants[:5]
+        results = {
+            source: {
+                distance_type: single_source_dijkstra_hyperedges(self.com_net, source, distance_type)
+                for distance_type in DistanceType
+            }
+            for source in sources
+        }
+        self.shards.write("000000", distance_columns_from_dicts(self.com_net, results))
+        self.shards.record("000000", sources)
+        from_dicts = self.shards.to_frame(self.com_net, self.participants)
+        shards = ResultShards(self.directory.name)
+        shards.write("000000", distance_columns(self.com_net, sources))
+        shards.record("000000", sources)
+        pd.testing.assert_frame_equal(from_dicts, shards.to_frame(self.com_net, self.participants))
+
+    def test_columns_from_matrices(self):
+        """
+        Testing if columns from the raw distances of the vertex djikstra algorithm equal the columns of the sweep.
+        """
+        sources = self.participants[:5]
+        columns = distance_columns_from_matrices(self.com_net, sources, vertex_dijkstra_matrices(self.com_net, sources))
+        expected = distance_columns(self.com_net, sources)
+        for column in columns:
+            self.assertEqual(columns[column].tolist(), expected[column].tolist())
+
+    def test_summaries(self):
+        """
+        Testing if the per-source summaries and histograms agree with the full result data frame.
+        """
+        edges = histogram_edges(self.com_net, self.com_net.codec.encode_delta(timedelta(minutes=30)))
+        for index in range(0, len(self.participants), 7):
+            chunk = self.participants[index:index + 7]
+            columns = distance_columns(self.com_net, chunk)
+            self.shards.write(f"{index:06d}", summary_columns(columns, [self.com_net.vertex_index(source) for source in chunk], edges))
+            self.shards.record(f"{index:06d}", chunk)
+        summary, histograms = self.shards.to_summary_frames(self.com_net, self.participants, edges)
+        frame = self.expected_frame()
+        self.assertEqual(list(summary.index), list(self.participants))
+        reachable = frame.groupby(level=0, observed=False).size()
+        self.assertEqual(summary.reachable.tolist(), reachable.tolist())
+        for distance_type in DistanceType:
+            name = distance_type.name.lower()
+            distances = frame[name].groupby(level=0, observed=False)
+            pd.testing.assert_series_equal(summary[f"{name}_min"], distances.min(), check_names=False, check_dtype=False, check_index_type=False)
+            pd.testing.assert_series_equal(summary[f"{name}_max"], distances.max(), check_names=False, check_dtype=False, check_index_type=False)
+            lower_medians = distances.apply(lambda values: values.sort_values().iloc[(len(values) - 1) // 2])
+            pd.testing.assert_series_equal(summary[f"{name}_median"], lower_medians, check_names=False, check_dtype=False, check_index_type=False)
+            self.assertEqual(histograms[distance_type].sum(axis=1).tolist(), reachable.tolist())
+        self.assertEqual(histograms[DistanceType.SHORTEST][1].tolist(), frame.shortest.eq(1).groupby(level=0, observed=False).sum().tolist())
+
+    def test_resume(self):
+        """
+        Testing if resuming keeps the recorded shards, drops unrecorded ones, and rejects a changed network.
+        """
+        shards = ResultShards(self.directory.name, fingerprint="network")
+        shards.write("000000", distance_columns(self.com_net, self.participants[:3]))
+        shards.record("000000", self.participants[:3])
+        shards.write("000001", distance_columns(self.com_net, self.participants[3:6]))
+
+        resumed = ResultShards(self.directory.name, fingerprint="network", resume=True)
+        self.assertEqual(resumed.completed_sources(), set(self.participants[:3]))
+        self.assertEqual(resumed.keys(), ["000000"])
+        self.assertEqual(resumed.next_index(), 1)
+        self.assertFalse((resumed.directory / "000001.npz").exists())
+
+        with self.assertRaises(SystemExit):
+            ResultShards(self.directory.name, fingerprint="other network", resume=True)
+        self.assertEqual(ResultShards(self.directory.name, fingerprint="other network").keys(), [])
+
+    def test_closed_shards(self):
+        """
+        Testing if reading the shards closes their files, so that they can be removed on all platforms.
+        """
+        for index in range(0, 9, 3):
+            self.shards.write(f"{index:06d}", distance_columns(self.com_net, self.participants[index:index + 3]))
+            self.shards.record(f"{index:06d}", self.participants[index:index + 3])
+        opened, load_npz = [], np.load
+
+        def load(*args, **kwargs):
+            opened.append(load_npz(*args, **kwargs))
+            return opened[-1]
+
+        with patch("simulation.results.np.load", side_effect=load):
+            self.shards.read()
+            self.shards.has_state()
+        self.assertEqual(len(opened), 6)
+        self.assertTrue(all(shard.zip is None for shard in opened))
+
+    def test_resume_torn_manifest(self):
+        """
+        Testing if resuming skips a manifest entry that has been cut off while being written, and appends after it.
+        """
+        shards = ResultShards(self.directory.name, fingerprint="network")
+        for key, chunk in (("000000", self.participants[:3]), ("000001", self.participants[3:6])):
+            shards.write(key, distance_columns(self.com_net, chunk))
+            shards.record(key, chunk)
+        manifest = shards.manifest_path.read_bytes()
+        for cut in (-1, -10, manifest.rindex(b"}")):
+            shards.manifest_path.write_bytes(manifest[:cut])
+            resumed = ResultShards(self.directory.name, fingerprint="network", resume=True)
+            self.assertEqual(resumed.keys(), ["000000"])
+            self.assertFalse((resumed.directory / "000001.npz").exists())
+            resumed.write("000001", distance_columns(self.com_net, self.participants[3:6]))
+            resumed.record("000001", self.participants[3:6])
+            self.assertEqual(ResultShards(self.directory.name, fingerprint="network", resume=True).keys(), ["000000", "000001"])
+
+    def test_update(self):
+        """
+        Testing if updating the shards of a completed run with appended channels gives the results of a new run.
+        """
+        cut = sorted(self.timings.values())[len(self.timings) // 2]
+        old_hedges = {hedge: vertices for hedge, vertices in self.hedges.items() if self.timings[hedge] <= cut}
+        old_net = CompactCommunicationNetwork(old_hedges, self.timings)
+        old_participants = tuple(sorted(old_net.participants()))
+        shards = ResultShards(f"{self.directory.name}/old", fingerprint="old network")
+        for index in range(0, len(old_participants), 7):
+            chunk = old_participants[index:index + 7]
+            shards.write(f"{index:06d}", distance_columns(old_net, chunk))
+            shards.record(f"{index:06d}", chunk)
+        shards.complete(old_net)
+
+        previous = ResultShards.completed_run(f"{self.directory.name}/old")
+        self.assertTrue(previous.has_state())
+        self.assertEqual(previous.as_of, old_net.codec.encode(cut))
+        self.assertEqual(previous.num_hyperedges, len(old_hedges))
+        updated = ResultShards(f"{self.directory.name}/new", fingerprint="network")
+        for key in previous.keys():
+            sources = previous.completed[key]["sources"]
+            updated.write(key, updated_distance_columns(self.com_net, sources, read_shard(previous.directory, key, self.com_net), previous.as_of))
+            updated.record(key, sources)
+        new_participants = [participant for participant in self.participants if participant not in old_participants]
+        if new_participants:
+            updated.write("new", distance_columns(self.com_net, new_participants, after=previous.as_of))
+            updated.record("new", new_participants)
+        pd.testing.assert_frame_equal(updated.to_frame(self.com_net, self.participants), self.expected_frame())
+
+        updated.complete(self.com_net)
+        updated.replace(previous)
+        self.assertEqual(ResultShards.completed_run(f"{self.directory.name}/old").num_hyperedges, len(self.hedges))
+        with self.assertRaises(SystemExit):
+            ResultShards.completed_run(f"{self.directory.name}/new")
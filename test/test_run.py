@@ -0,0 +1,101 @@
+import tempfile
+import unittest
+
+try:
+    from simulation.run import CHUNK_MEMORY, MAX_CHUNK_SIZE, _search_chunk, chunk_size_limit, schedule_chunks, sliding_windows
+    from simulation.model import CommunicationNetwork, CompactCommunicationNetwork
+    from simulation.minimal_paths import single_source_dijkstra_hyperedges, single_source_dijkstra_vertices, DistanceType
+    from simulation.results import ResultShards
+    from simulation.shared import SharedHypergraph
+except ImportError as error:  # numpy, pandas, or tqdm are not installed
+    if error.name not in ("numpy", "pandas", "tqdm"):
+        raise
+    schedule_chunks = sliding_windows = None
+
+
+@unittest.skipIf(schedule_chunks is None, "the simulation requirements are not installed")
+class TestScheduleChunks(unittest.TestCase):
+    """
+    A test case for the chunked task scheduling.
+    """
+
+    def setUp(self):
+        """
+        Creating sources with a few expensive and many cheap ones.
+        """
+        self.costs = {f"v{i}": 1 for i in range(100)}
+        self.costs.update({"hub1": 500, "hub2": 300})
+
+    def test_every_source_once(self):
+        """
+        Testing if every source is scheduled exactly once.
+        """
+        chunks = schedule_chunks(list(self.costs), self.costs, num_workers=4)
+        scheduled = [source for chunk in chunks for source in chunk]
+        self.assertEqual(sorted(scheduled), sorted(self.costs))
+
+    def test_expensive_sources_first(self):
+        """
+        Testing if the most expensive sources are scheduled first and alone.
+        """
+        chunks = schedule_chunks(list(self.costs), self.costs, num_workers=4)
+        self.assertEqual(chunks[0], ["hub1"])
+        self.assertEqual(chunks[1], ["hub2"])
+        self.assertGreater(len(chunks[2]), 1)
+
+    def test_max_chunk_size(self):
+        """
+        Testing if chunks do not exceed the maximal chunk size.
+        """
+        chunks = schedule_chunks(list(self.costs), self.costs, num_workers=1, max_chunk_size=8)
+        self.assertTrue(all(len(chunk) <= 8 for chunk in chunks))
+
+    def test_chunk_size_limit(self):
+        """
+        Testing if chunks are as large as possible while their traversal state fits into memory.
+        """
+        self.assertEqual(chunk_size_limit(1000), MAX_CHUNK_SIZE)
+        self.assertEqual(chunk_size_limit(CHUNK_MEMORY // 32 // 10), 10)
+        self.assertEqual(chunk_size_limit(CHUNK_MEMORY), 1)
+
+
+@unittest.skipIf(sliding_windows is None, "the simulation requirements are not installed")
+class TestSlidingWindows(unittest.TestCase):
+    """
+    A test case for the time windows of a windowed simulation.
+    """
+
+    def test_cover(self):
+        """
+        Testing if the windows start at the first timing and cover the last one, disjoint or overlapping.
+        """
+        self.assertEqual(sliding_windows(0, 10, 5), [(0, 5), (5, 10), (10, 15)])
+        self.assertEqual(sliding_windows(0, 9, 5, 3), [(0, 5), (3, 8), (6, 11), (9, 14)])
+        with self.assertRaises(ValueError):
+            sliding_windows(0, 10, 5, 0)
+
+
+@unittest.skipIf(schedule_chunks is None, "the simulation requirements are not installed")
+class TestSearchChunk(unittest.TestCase):
+    """
+    A test case for searching a chunk of sources in a worker.
+    """
+
+    def test_pruned_isolated_participant(self):
+        """
+        Testing if a pruned network whose last participant only had single-participant channels is simulated like the dict backend.
+        """
+        hedges, timings = {"h0": ["v0", "v1"], "h1": ["v1", "v2"], "h2": ["v3"]}, {"h0": 1, "h1": 2, "h2": 3}
+        com_net = CommunicationNetwork(hedges, timings).pruned()
+        compact_net = CompactCommunicationNetwork(hedges, timings).pruned()
+        participants = tuple(sorted(compact_net.participants()))
+        for single_source_dijkstra in (single_source_dijkstra_hyperedges, single_source_dijkstra_vertices):
+            with tempfile.TemporaryDirectory() as directory, SharedHypergraph(compact_net) as shared_network:
+                shards = ResultShards(directory)
+                _search_chunk(shared_network, list(participants), single_source_dijkstra, shards.directory, "000000")
+                shards.record("000000", participants)
+                frame = shards.to_frame(compact_net, participants)
+            for distance_type in DistanceType:
+                expected = {(source, target): distance for source in participants
+                            for target, distance in single_source_dijkstra_hyperedges(com_net, source, distance_type, min_timing=0).items()}
+                self.assertEqual(frame[distance_type.name.lower()].to_dict(), expected)
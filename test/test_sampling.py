@@ -0,0 +1,75 @@
+import tempfile
+import unittest
+
+try:
+    from simulation.model import CompactCommunicationNetwork, np
+    from simulation.results import ResultShards, distance_columns
+    from simulation.sampling import converged, degree_strata, estimate_distributions, stratified_rounds
+except ImportError:  # numpy or pandas are not installed
+    np = None
+
+
+@unittest.skipIf(np is None, "the simulation requirements are not installed")
+class TestSampling(unittest.TestCase):
+    """
+    A test case for estimating distributions from a stratified sample of sources.
+    """
+
+    def setUp(self):
+        """
+        Creating a network with a hub and many participants of low degree
+        """
+        hedges = {f"h{index}": [f"v{index % 40}", f"v{(index * 7 + 1) % 40}", "hub"] if index % 5 == 0 else [f"v{index % 40}", f"v{(index * 3 + 2) % 40}"]
+                  for index in range(200)}
+        self.com_net = CompactCommunicationNetwork(hedges, {hedge: index % 50 for index, hedge in enumerate(hedges)})
+        self.participants = sorted(self.com_net.participants())
+        self.strata = degree_strata({participant: len(self.com_net.channels(participant)) for participant in self.participants})
+        self.stratum_sizes: dict = {}
+        for stratum in self.strata.values():
+            self.stratum_sizes[stratum] = self.stratum_sizes.get(stratum, 0) + 1
+
+    def test_stratified_rounds(self):
+        """
+        Testing if the rounds draw distinct sources, the first round from every stratum, and are reproducible
+        """
+        rounds = stratified_rounds(self.strata, 20, round_size=8, seed=3)
+        sample = [source for sample_round in rounds for source in sample_round]
+        self.assertEqual(len(sample), len(set(sample)))
+        self.assertLessEqual(abs(len(sample) - 20), len(self.stratum_sizes))
+        self.assertEqual({self.strata[source] for source in rounds[0]}, set(self.stratum_sizes))
+        self.assertEqual(rounds, stratified_rounds(self.strata, 20, round_size=8, seed=3))
+        everyone = stratified_rounds(self.strata, 1000, round_size=8)
+        self.assertEqual(sorted(source for sample_round in everyone for source in sample_round), self.participants)
+
+    def test_whole_population(self):
+        """
+        Testing if the estimates from all sources equal the exact distributions and lie in their intervals
+        """
+        columns = distance_columns(self.com_net, self.participants)
+        estimates = estimate_distributions(columns, [self.com_net.vertex_index(source) for source in self.participants],
+                                           [self.strata[source] for source in self.participants], self.stratum_sizes)
+        reachable = np.bincount(columns["source"], minlength=self.com_net.num_vertices)[[self.com_net.vertex_index(source) for source in self.participants]]
+        self.assertAlmostEqual(estimates.loc[("reachable", "mean"), "estimate"], reachable.mean())
+        self.assertEqual(estimates.loc[("reachable", "q0.5"), "estimate"], np.quantile(reachable, 0.5, method="inverted_cdf"))
+        for metric in ("shortest", "fastest", "foremost"):
+            for quantile in (0.1, 0.5, 0.9):
+                self.assertEqual(estimates.loc[(metric, f"q{quantile:g}"), "estimate"], np.quantile(columns[metric], quantile, method="inverted_cdf"))
+        self.assertTrue(((estimates["lower"] <= estimates["estimate"]) & (estimates["estimate"] <= estimates["upper"])).all())
+        self.assertTrue(converged(estimates, 1))
+        self.assertFalse(converged(estimates.assign(upper=estimates["upper"] + 2 * estimates["spread"] + 2), 1))
+
+    def test_resume(self):
+        """
+        Testing if the estimates of the first round ignore the shards of a later round, as after resuming a run
+        """
+        first_round, later_round = stratified_rounds(self.strata, 20, round_size=10)[:2]
+        first_indices = [self.com_net.vertex_index(source) for source in first_round]
+        first_strata = [self.strata[source] for source in first_round]
+        with tempfile.TemporaryDirectory() as directory:
+            shards = ResultShards(directory)
+            for key, sample_round in (("000000", first_round), ("000001", later_round)):
+                shards.write(key, distance_columns(self.com_net, sample_round))
+                shards.record(key, sample_round)
+            estimates = estimate_distributions(shards.read(), first_indices, first_strata, self.stratum_sizes)
+        expected = estimate_distributions(distance_columns(self.com_net, first_round), first_indices, first_strata, self.stratum_sizes)
+        self.assertTrue(estimates.equals(expected))
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import multiprocessing as mp
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from http import HTTPStatus
+from io import StringIO
+from unittest.mock import patch
+
+try:
+    from simulation.model import CompactCommunicationNetwork, np
+    from simulation.minimal_paths import single_source_dijkstra_hyperedges, DistanceType
+    from simulation.serve import QueryService
+except ImportError:  # numpy or pandas is not installed
+    np = None
+
+
+@unittest.skipIf(np is None, "the simulation requirements are not installed")
+class TestQueryService(unittest.TestCase):
+    """
+    A test case for the service answering minimal path queries.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessPoolExecutor(mp_context=mp.get_context("spawn"), max_workers=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def setUp(self):
+        """
+        Creating a network and a service on it
+        """
+        hedges = {f"h{index}": [f"v{index % 15}", f"v{(index * 7 + 1) % 15}"] for index in range(60)}
+        timings = {hedge: index % 25 for index, hedge in enumerate(hedges)}
+        self.network = CompactCommunicationNetwork(hedges, timings, name="test")
+        self.service = QueryService(self.network, self.executor, max_results=2)
+
+    def tearDown(self):
+        self.service.close()
+
+    def test_distances(self):
+        """
+        Testing if the distances and the distance to a target are those of the Dijkstra algorithm.
+        """
+        for distance_type in DistanceType:
+            expected = single_source_dijkstra_hyperedges(self.network, "v1", distance_type, min_timing=0)
+            status, body = asyncio.run(self.service.respond("GET", f"/distances?source=v1&type={distance_type.name.lower()}"))
+            self.assertEqual(status, HTTPStatus.OK)
+            self.assertEqual(body["distances"], expected)
+            self.assertEqual(body["reachable"], len(expected))
+            target = sorted(expected)[0]
+            _, body = asyncio.run(self.service.respond("GET", f"/distance?source=v1&target={target}&type={distance_type.name.lower()}"))
+            self.assertEqual(body["distance"], expected[target])
+
+    def test_until(self):
+        """
+        Testing if only the channels before the time bound are used.
+        """
+        _, body = asyncio.run(self.service.respond("GET", "/distances?source=v1&type=foremost&until=10"))
+        self.assertEqual(body["distances"], single_source_dijkstra_hyperedges(self.network, "v1", DistanceType.FOREMOST, min_timing=0, window=(None, 10)))
+        self.assertTrue(all(timing < 10 for timing in body["distances"].values()))
+
+    def test_coalescing_and_recent_results(self):
+        """
+        Testing if concurrent queries are coalesced and recent results are reused.
+        """
+        async def queries():
+            return await asyncio.gather(*(self.service.distances("v1", DistanceType.SHORTEST) for _ in range(3)))
+
+        first, second, third = asyncio.run(queries())
+        self.assertEqual(first, second)
+        self.assertEqual(first, third)
+        self.assertEqual((self.service.stats["misses"], self.service.stats["coalesced"]), (1, 2))
+        asyncio.run(self.service.distances("v1", DistanceType.SHORTEST))
+        self.assertEqual(self.service.stats["hits"], 1)
+        for distance_type in (DistanceType.FASTEST, DistanceType.FOREMOST):
+            asyncio.run(self.service.distances("v1", distance_type))
+        self.assertEqual(list(self.service.results), [("v1", DistanceType.FASTEST, None), ("v1", DistanceType.FOREMOST, None)])
+        self.assertEqual(self.service.status()["pending"], 0)
+
+    def test_errors(self):
+        """
+        Testing if invalid queries are rejected.
+        """
+        for method, target, status in (("GET", "/distances?source=unknown&type=shortest", HTTPStatus.NOT_FOUND),
+                                       ("GET", "/distance?source=v1&target=unknown&type=shortest", HTTPStatus.NOT_FOUND),
+                                       ("GET", "/distances?source=v1&type=longest", HTTPStatus.BAD_REQUEST),
+                                       ("GET", "/distances?source=v1&type=shortest&until=tomorrow", HTTPStatus.BAD_REQUEST),
+                                       ("GET", "/distance?source=v1&type=shortest", HTTPStatus.BAD_REQUEST),
+                                       ("GET", "/unknown", HTTPStatus.NOT_FOUND),
+                                       ("POST", "/status", HTTPStatus.METHOD_NOT_ALLOWED)):
+            self.assertEqual(asyncio.run(self.service.respond(method, target))[0], status, target)
+
+    def test_http(self):
+        """
+        Testing if queries are answered over HTTP.
+        """
+        async def request():
+            server = await asyncio.start_server(self.service.handle, "127.0.0.1", 0)
+            async with server:
+                reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+                writer.write(b"GET /distance?source=v1&target=v8&type=shortest HTTP/1.1\r\nHost: localhost\r\n\r\n")
+                response = await reader.read()
+                writer.close()
+                return response
+
+        head, content = asyncio.run(request()).split(b"\r\n\r\n", 1)
+        self.assertTrue(head.startswith(b"HTTP/1.1 200 OK"))
+        self.assertEqual(json.loads(content)["distance"],
+                         single_source_dijkstra_hyperedges(self.network, "v1", DistanceType.SHORTEST, min_timing=0).get("v8"))
+
+
+    def test_serve_without_signal_handlers(self):
+        """
+        Testing if the service runs until cancelled on event loops without signal handlers, as on Windows.
+        """
+        async def serve():
+            with patch.object(asyncio.get_running_loop(), "add_signal_handler", side_effect=NotImplementedError):
+                task = asyncio.create_task(self.service.serve("127.0.0.1", 0))
+                await asyncio.sleep(0.1)
+                self.assertFalse(task.done())
+                task.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+
+        with redirect_stdout(StringIO()) as output:
+            asyncio.run(serve())
+        self.assertIn("Serving test on", output.getvalue())
@@ -0,0 +1,55 @@
+import unittest
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+from simulation.model import CompactCommunicationNetwork, np
+from simulation.minimal_paths import single_source_dijkstra_hyperedges, DistanceType
+from simulation.shared import SharedHypergraph, attach_worker, worker_hypergraph
+from test.test_minimal_paths import generate_random_network
+
+
+def _worker_shortest(source):
+    return single_source_dijkstra_hyperedges(worker_hypergraph(), source, DistanceType.SHORTEST, min_timing=0)
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestSharedHypergraph(unittest.TestCase):
+    """
+    A test case for sharing a compact hypergraph with worker processes.
+    """
+
+    def setUp(self):
+        """
+        Creating a compact communication network with the random funcion.
+        """
+        fuzzed_input = generate_random_network()
+        self.com_net = CompactCommunicationNetwork(fuzzed_input[0], fuzzed_input[1], name="fuzzed")
+
+    def test_attach(self):
+        """
+        Testing if an attached hypergraph is equivalent to the shared one and maps its arrays read-only.
+        """
+        with SharedHypergraph(self.com_net) as shared_network:
+            attached = shared_network.attach()
+            self.assertEqual(attached.name, "fuzzed")
+            self.assertEqual(attached.timings(), self.com_net.timings())
+            self.assertFalse(attached.epochs.flags.writeable)
+            for distance_type in DistanceType:
+                self.assertEqual(
+                    single_source_dijkstra_hyperedges(attached, "v1", distance_type, min_timing=0),
+                    single_source_dijkstra_hyperedges(self.com_net, "v1", distance_type, min_timing=0),
+                )
+        self.assertFalse(shared_network.directory.exists())
+
+    def test_worker_processes(self):
+        """
+        Testing if worker processes attached in their initializer find the same distances.
+        """
+        with SharedHypergraph(self.com_net) as shared_network:
+            with ProcessPoolExecutor(
+                mp_context=mp.get_context("spawn"), max_workers=2, initializer=attach_worker, initargs=(shared_network,)
+            ) as executor:
+                self.assertEqual(
+                    executor.submit(_worker_shortest, "v1").result(),
+                    single_source_dijkstra_hyperedges(self.com_net, "v1", DistanceType.SHORTEST, min_timing=0),
+                )
@@ -0,0 +1,127 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+try:
+    from simulation.model import CompactCommunicationNetwork, np
+    from simulation.minimal_paths import minimal_distance_matrices
+    from simulation.results import distance_columns
+    from simulation.telemetry import Telemetry, describe_slowest, peak_rss, source_counters, source_metrics
+except ImportError as error:  # numpy or pandas are not installed
+    if error.name not in ("numpy", "pandas"):
+        raise
+    np = None
+
+
+@unittest.skipIf(np is None, "the simulation requirements are not installed")
+class TestTelemetry(unittest.TestCase):
+    """
+    A test case for the per-source metrics and the remaining time model of a simulation.
+    """
+
+    def setUp(self):
+        """
+        Creating a network with a hub and a temporary directory for the metrics
+        """
+        hedges = {f"h{index}": [f"v{index % 20}", f"v{(index * 3 + 2) % 20}", "hub"] if index % 4 == 0 else [f"v{index % 20}", f"v{(index * 7 + 1) % 20}"]
+                  for index in range(100)}
+        self.com_net = CompactCommunicationNetwork(hedges, {hedge: index % 30 for index, hedge in enumerate(hedges)})
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.directory.name)/"metrics.jsonl"
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_source_metrics(self):
+        """
+        Testing if the sources of a sweep share the wall time of their chunk by their relaxed hyperedges
+        """
+        sources = ["hub", "v3", "v11"]
+        counters = source_counters(len(sources))
+        columns = distance_columns(self.com_net, sources, counters=counters)
+        records = source_metrics(self.com_net, sources, columns, counters, 2.0, "000000")
+        self.assertEqual([record["source"] for record in records], sources)
+        self.assertAlmostEqual(sum(record["seconds"] for record in records), 2.0)
+        self.assertEqual(max(records, key=lambda record: record["relaxed"])["source"], "hub")
+        matrices = minimal_distance_matrices(self.com_net, sources)
+        for row, record in enumerate(records):
+            self.assertEqual(record["reachable"], int((matrices[next(iter(matrices))][row] != 2**63 - 1).sum()))
+            self.assertGreaterEqual(record["relaxed"], len(self.com_net.channels(record["source"])))
+            self.assertNotIn("pushes", record)
+            self.assertNotIn("pops", record)
+            self.assertFalse(record["measured"])
+            self.assertEqual(record["chunk"], "000000")
+            self.assertTrue(record["peak_rss_bytes"] is None if peak_rss() is None else record["peak_rss_bytes"] > 0)
+
+    def test_no_peak_rss(self):
+        """
+        Testing if the metrics and the summary do without the peak memory where it is not available, e.g., on Windows
+        """
+        sources = ["hub", "v3"]
+        counters = source_counters(len(sources))
+        with patch("simulation.telemetry.resource", None):
+            self.assertIsNone(peak_rss())
+            records = source_metrics(self.com_net, sources, distance_columns(self.com_net, sources, counters=counters), counters, 1.0)
+        self.assertEqual([record["peak_rss_bytes"] for record in records], [None, None])
+        metrics = Telemetry(self.file_path, {"hub": 5, "v3": 2}, sources)
+        metrics.record(records)
+        self.assertIsNone(metrics.summary()["max_peak_rss_bytes"])
+
+    def test_model(self):
+        """
+        Testing if the model recovers a power law of the wall time in the degree and estimates the remaining time
+        """
+        degrees = {f"v{index}": index for index in range(1, 101)}
+        telemetry = Telemetry(self.file_path, degrees, degrees, num_workers=2)
+        self.assertIsNone(telemetry.model())
+        self.assertEqual(telemetry.postfix(), "")
+        telemetry.record([{"source": f"v{index}", "seconds": 0.01 * index ** 1.5, "measured": index % 2 == 0, "pushes": 0, "pops": 0, "relaxed": index,
+                           "reachable": 1, "chunk": f"{index:06d}", "pid": 1, "peak_rss_bytes": 1} for index in range(1, 51)])
+        coefficient, exponent = telemetry.model()
+        self.assertAlmostEqual(coefficient, 0.01)
+        self.assertAlmostEqual(exponent, 1.5)
+        self.assertAlmostEqual(telemetry.eta(), sum(0.01 * index ** 1.5 for index in range(51, 101)) / 2)
+        summary = telemetry.summary()
+        self.assertEqual(summary["sources"], 50)
+        self.assertEqual([record["source"] for record in summary["slowest"][:2]], ["v50", "v49"])
+        self.assertEqual(summary["slowest"][0]["degree"], 50)
+        self.assertEqual(telemetry.write_summary(Path(self.directory.name)/"telemetry.json"), summary)
+        self.assertEqual(json.loads((Path(self.directory.name)/"telemetry.json").read_text())["sources"], 50)
+        lines = describe_slowest(summary).splitlines()
+        self.assertEqual(len(lines), 11)
+        self.assertNotIn("estimated", lines[1])
+        self.assertIn("v49: about", lines[2])
+        self.assertIn("estimated", lines[2])
+
+    def test_model_chunks(self):
+        """
+        Testing if the model is fitted to the wall times of chunks, not to the wall times of their sources split from them
+        """
+        degrees = {f"v{index}": index for index in range(1, 101)}
+        telemetry = Telemetry(self.file_path, degrees, degrees)
+        for first in range(1, 101, 5):
+            chunk = range(first, first + 5)
+            seconds = sum(0.01 * index ** 1.5 for index in chunk)
+            telemetry.record([{"source": f"v{index}", "seconds": seconds / 5, "measured": False, "relaxed": 1, "reachable": 1, "chunk": f"{first:06d}",
+                               "pid": 1, "peak_rss_bytes": 1} for index in chunk])
+        coefficient, exponent = telemetry.model()
+        self.assertAlmostEqual(coefficient, 0.01)
+        self.assertAlmostEqual(exponent, 1.5)
+        summary = telemetry.summary()
+        self.assertEqual((summary["pushes"], summary["pops"], summary["relaxed"]), (None, None, 100))
+
+    def test_resume(self):
+        """
+        Testing if the metrics are appended to the file and kept when a run is resumed
+        """
+        degrees = {"a": 1, "b": 2, "c": 3}
+        record = {"source": "a", "seconds": 1.0, "measured": True, "pushes": 1, "pops": 1, "relaxed": 1, "reachable": 2, "pid": 1, "peak_rss_bytes": 1}
+        Telemetry(self.file_path, degrees, degrees).record([record])
+        self.assertEqual([json.loads(line) for line in self.file_path.read_text().splitlines()], [record])
+        resumed = Telemetry(self.file_path, degrees, ["b", "c"], resume=True)
+        self.assertEqual(resumed.records, [record])
+        self.assertEqual(resumed.eta(), 2.0)
+        self.assertEqual(Telemetry(self.file_path, degrees, degrees).records, [])
+        self.assertEqual(self.file_path.read_text(), "")